@@ -3,4 +3,6 @@ from .models import *
 
 # Register your models here.
 admin.site.register(User)
-admin.site.register(SmsAuth)
\ No newline at end of file
+admin.site.register(SmsAuth)
+admin.site.register(SmsOutbox)
+admin.site.register(SmsCampaign)
\ No newline at end of file
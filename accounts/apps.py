@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # BlacklistedToken이 저장되면 token/verify/ 캐시에서 삭제하는 signal 등록
+        from . import tokens  # noqa: F401
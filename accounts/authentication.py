@@ -0,0 +1,89 @@
+'''
+    JWT 인증
+
+    - VersionedJWTAuthentication : 기본 JWT 인증 + 토큰 버전 확인(REST_FRAMEWORK 기본 인증)
+    - StatelessJWTAuthentication : DB 조회 없이 access token의 claim으로 request.user를 만드는 인증
+
+    VersionedRefreshToken으로 만드는 access token에는 TOKEN_CLAIMS의 User 정보가 들어있어서
+    내 정보 보기처럼 읽기만 하는 API는 User를 다시 조회하지 않고 토큰의 값으로 응답할 수 있음
+    (User 정보를 바꾼 뒤(User.claims_updated_at)나 비활성화된 User는 claim을 사용하지 않음)
+    기본 인증(VersionedJWTAuthentication)은 그대로 두고 필요한 View에서만 authentication_classes로 지정해서 사용
+'''
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .routers import read_from_replica
+from .tokens import TOKEN_VERSION_CLAIM, check_token_payload, has_current_claims
+
+# access token에 넣는 User 정보(username은 TokenUser에서 처리)
+TOKEN_CLAIMS = User.TOKEN_CLAIMS
+
+
+class AccountsTokenUser(TokenUser):
+    '''
+        TokenUser에 우리 User 모델의 정보를 추가(SIMPLE_JWT['TOKEN_USER_CLASS'])
+    '''
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def nickname(self):
+        return self.token.get('nickname', '')
+
+    @cached_property
+    def phone_number(self):
+        return self.token.get('phone_number')
+
+    @cached_property
+    def name(self):
+        return self.token.get('name', '')
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    '''
+        JWTAuthentication + 토큰 버전 확인(REST_FRAMEWORK의 기본 인증)
+        User.revoke_tokens()로 무효화한 토큰은 access token도 사용할 수 없음
+        DB에서 User를 조회하기 때문에 버전도 조회한 User의 값과 비교(추가 조회 x)
+    '''
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != user.token_version:
+            raise InvalidToken(_('Token has been revoked'))
+        return user
+
+
+class StatelessJWTAuthentication(VersionedJWTAuthentication):
+    '''
+        GET, HEAD, OPTIONS 요청은 토큰의 claim으로 User를 만들고(DB 조회 x)
+        수정 요청이나 claim이 없는 예전 토큰은 기존처럼 DB에서 User를 조회
+        User 정보를 바꾼 뒤에는 그 전에 발급한 토큰의 claim 대신 DB에서 User를 조회하고
+        비활성화된 User의 토큰은 거절(캐시의 토큰 버전 정보로 확인)
+    '''
+
+    def authenticate(self, request):
+        self.stateless = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.stateless and all(claim in validated_token for claim in TOKEN_CLAIMS):
+            # User 대신 캐시의 토큰 버전으로 무효화 확인
+            try:
+                state = check_token_payload(validated_token)
+            except TokenError as e:
+                raise InvalidToken(e.args[0])
+            if has_current_claims(validated_token, state):
+                return api_settings.TOKEN_USER_CLASS(validated_token)
+        if self.stateless:
+            # claim이 없거나 이전 정보인 토큰으로 조회(GET)하는 경우 User는 읽기 전용 replica에서 조회
+            with read_from_replica(user_id=validated_token.get(api_settings.USER_ID_CLAIM)):
+                return super().get_user(validated_token)
+        return super().get_user(validated_token)
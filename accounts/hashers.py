@@ -0,0 +1,220 @@
+'''
+    비밀번호 해시(Argon2)를 요청 스레드 대신 프로세스 풀에서 계산
+
+    Argon2는 CPU와 메모리를 많이 쓰기 때문에 로그인이 몰리면 요청 스레드가 모두 해시 계산에 묶여서
+    다른 요청까지 느려짐
+    PooledArgon2PasswordHasher는 해시 생성 / 확인을 CPU 코어 수만큼의 프로세스 풀에 넘기고,
+    실행 중인 작업 + 대기열이 가득 차면 바로 503(Retry-After)으로 응답해서 요청이 계속 쌓이지 않도록 함
+
+    PASSWORD_HASHERS에 accounts.hashers.PooledArgon2PasswordHasher를 등록해서 사용
+    (algorithm이 기존과 같은 argon2라서 이미 저장된 비밀번호도 그대로 확인 가능)
+
+    Argon2 비용(TIME_COST, MEMORY_COST, PARALLELISM)은 PASSWORD_HASHING 설정으로 지정하고
+    manage.py calibrate_hasher로 서버 사양에 맞는 값을 측정할 수 있음
+    비용을 바꾸면 기존 비밀번호는 다음 로그인에 성공할 때 must_update()로 새 비용으로 다시 저장됨
+'''
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKERS': None,
+    'QUEUE_SIZE': 16,
+    'QUEUE_TIMEOUT': 0,
+    'RETRY_AFTER': 1,
+    # None이면 Django Argon2PasswordHasher의 기본값 사용
+    'TIME_COST': None,
+    'MEMORY_COST': None,
+    'PARALLELISM': None,
+}
+
+
+def hashing_setting(name):
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(name, DEFAULTS[name])
+
+
+class HashingUnavailable(APIException):
+    '''
+        해시 대기열이 가득 찼을 때 발생
+        DRF exception handler가 wait 값으로 Retry-After 헤더를 붙여서 503으로 응답
+        DRF 밖(관리자 로그인 등)에서는 accounts.middleware.HashingUnavailableMiddleware가 같은 응답으로 변환
+    '''
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.')
+    default_code = 'hashing_unavailable'
+
+    def __init__(self, wait=None, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+def make_argon2_hasher(time_cost, memory_cost, parallelism):
+    '''
+        비용을 지정한 Argon2PasswordHasher(요청 스레드에서 바로 계산)
+    '''
+    hasher = Argon2PasswordHasher()
+    hasher.time_cost, hasher.memory_cost, hasher.parallelism = time_cost, memory_cost, parallelism
+    return hasher
+
+
+def _hash_in_process(costs, method, args):
+    '''
+        풀 프로세스에서 실행되는 함수
+        풀 프로세스는 설정이 바뀌기 전에 만들어졌을 수 있어서 비용은 요청한 프로세스에서 받아서 사용
+    '''
+    start = time.perf_counter()
+    result = getattr(make_argon2_hasher(*costs), method)(*args)
+    return result, time.perf_counter() - start
+
+
+class HashingService:
+    '''
+        크기가 정해진 프로세스 풀과 대기열
+
+        workers : 풀 프로세스 수(CPU 코어 수)
+        queue_size : 실행 중인 작업 외에 기다릴 수 있는 작업 수
+        동시에 받을 수 있는 작업은 workers + queue_size개이고, 자리가 없으면 queue_timeout초 기다린 뒤
+        HashingUnavailable 발생
+    '''
+
+    def __init__(self, workers=None, queue_size=None, queue_timeout=None, retry_after=None):
+        self.workers = workers or hashing_setting('WORKERS') or os.cpu_count() or 1
+        self.queue_size = hashing_setting('QUEUE_SIZE') if queue_size is None else queue_size
+        self.queue_timeout = hashing_setting('QUEUE_TIMEOUT') if queue_timeout is None else queue_timeout
+        self.retry_after = hashing_setting('RETRY_AFTER') if retry_after is None else retry_after
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._lock = threading.Lock()
+        # 지표
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def run(self, hasher, method, *args):
+        acquired = (self._slots.acquire(timeout=self.queue_timeout) if self.queue_timeout
+                    else self._slots.acquire(blocking=False))
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise HashingUnavailable(wait=self.retry_after)
+
+        with self._lock:
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        start = time.perf_counter()
+        try:
+            costs = (hasher.time_cost, hasher.memory_cost, hasher.parallelism)
+            result, seconds = self._executor.submit(_hash_in_process, costs, method, args).result()
+        except BrokenProcessPool:
+            # 풀 프로세스가 비정상 종료되면 풀을 새로 만들고 이번 요청은 다시 시도하도록 응답
+            logger.exception('비밀번호 해시 프로세스 풀 에러')
+            with self._lock:
+                self.failed += 1
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            raise HashingUnavailable(wait=self.retry_after)
+        finally:
+            with self._lock:
+                self.pending -= 1
+            self._slots.release()
+
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds += seconds
+            self.max_hash_seconds = max(self.max_hash_seconds, seconds)
+            self.wait_seconds += time.perf_counter() - start - seconds
+        return result
+
+    def stats(self):
+        '''
+            대기열 깊이, 해시 계산 시간 지표
+            queued : 풀 프로세스를 기다리고 있는 작업 수
+            hash_ms : 풀 프로세스에서 해시를 계산한 시간, wait_ms : 대기열에서 기다린 시간
+        '''
+        with self._lock:
+            completed = self.completed
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'pending': self.pending,
+                'queued': max(0, self.pending - self.workers),
+                'peak_pending': self.peak_pending,
+                'completed': completed,
+                'rejected': self.rejected,
+                'failed': self.failed,
+                'avg_hash_ms': round(self.hash_seconds / completed * 1000, 2) if completed else None,
+                'max_hash_ms': round(self.max_hash_seconds * 1000, 2),
+                'avg_wait_ms': round(self.wait_seconds / completed * 1000, 2) if completed else None,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+class PooledArgon2PasswordHasher(Argon2PasswordHasher):
+    '''
+        encode() / verify()를 HashingService의 프로세스 풀에서 계산하는 Argon2 hasher
+        make_password, check_password, authenticate 등 비밀번호를 다루는 모든 곳에 적용됨
+        비용은 PASSWORD_HASHING 설정 값을 사용하고, 저장된 해시의 비용이 다르면 must_update()가 True
+    '''
+
+    @property
+    def time_cost(self):
+        return hashing_setting('TIME_COST') or Argon2PasswordHasher.time_cost
+
+    @property
+    def memory_cost(self):
+        return hashing_setting('MEMORY_COST') or Argon2PasswordHasher.memory_cost
+
+    @property
+    def parallelism(self):
+        return hashing_setting('PARALLELISM') or Argon2PasswordHasher.parallelism
+
+    def encode(self, password, salt):
+        return get_hashing_service().run(self, 'encode', password, salt)
+
+    def verify(self, password, encoded):
+        return get_hashing_service().run(self, 'verify', password, encoded)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_hashing_service():
+    '''
+        처음 사용할 때 프로세스 풀을 만들어서 재사용
+    '''
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = HashingService()
+    return _service
+
+
+@receiver(setting_changed)
+def reset_service(*, setting, **kwargs):
+    global _service
+    if setting == 'PASSWORD_HASHING':
+        with _service_lock:
+            if _service is not None:
+                _service.shutdown()
+            _service = None
@@ -0,0 +1,293 @@
+'''
+    기존 시스템의 회원을 accounts.User로 가져오기(manage.py import_users)
+
+    - CSV(헤더 포함) 또는 JSONL 파일을 한 행씩 읽어서(streaming) BATCH_SIZE개씩 처리
+      컬럼 : username, email, nickname, name, phone_number, password 또는 password_hash(이미 해시한 값)
+    - 필드 확인은 가입 API(CustomRegisterSerializer)와 같은 규칙(ImportUserSerializer)
+      DB 조회가 필요한 중복 확인(username, email, nickname, phone_number)은 행마다 하지 않고 배치마다 한 번에 조회
+    - 비밀번호는 WORKERS개의 프로세스 풀에서 Argon2로 해시(HASH_CHUNK_SIZE개씩 묶어서 전달)
+      다음 배치를 읽고 확인하는 동안 이전 배치의 해시를 계산하고, 해시가 끝난 배치는 bulk_create로 한 트랜잭션에 저장
+    - 배치를 저장할 때마다 다음 시작 위치(저장을 마친 마지막 행 번호)를 갱신해서
+      실패하거나 중간에 멈추면 --start로 이어서 진행(이미 저장한 행은 중복으로 처리되어 다시 저장되지 않음)
+'''
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, get_hasher, make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import serializers
+
+from .hashers import make_argon2_hasher
+from .models import User
+from .serializers import ImportUserSerializer
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    'WORKERS': None,
+    'HASH_CHUNK_SIZE': 32,
+}
+
+FORMATS = ['csv', 'jsonl']
+# 배치마다 한 번에 중복을 확인하는 필드(가입 API에서 중복을 확인하는 필드)
+UNIQUE_FIELDS = ['username', 'email', 'nickname', 'phone_number']
+DUPLICATE_MESSAGE = _('이미 사용 중인 값입니다.')
+
+
+def import_setting(name):
+    return getattr(settings, 'USER_IMPORT', {}).get(name, DEFAULTS[name])
+
+
+class UserImportError(Exception):
+    '''
+        저장 중 에러로 가져오기를 멈췄을 때 발생
+        next_start : 저장을 마친 마지막 행 번호(--start로 이어서 진행)
+    '''
+
+    def __init__(self, next_start, cause):
+        super().__init__(f'{next_start}번째 행까지 저장했습니다: {cause}')
+        self.next_start = next_start
+        self.cause = cause
+
+
+def detect_format(path):
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+
+def read_rows(file, format='csv', start=0):
+    '''
+        (행 번호, 행) 생성, 행 번호는 1부터 시작하고 start번째 행까지는 건너뛰기
+        빈 줄은 None, 읽을 수 없는 행은 ValueError
+    '''
+    rows = csv.DictReader(file) if format == 'csv' else _jsonl_rows(file)
+    return itertools.islice(enumerate(rows, 1), start, None)
+
+
+def _jsonl_rows(file):
+    for line in file:
+        if not line.strip():
+            yield None
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f'JSON 형식 오류: {e}')
+            continue
+        yield row if isinstance(row, dict) else ValueError('JSON 객체가 아닙니다.')
+
+
+def row_to_data(row):
+    '''
+        행을 ImportUserSerializer 입력으로 변환, 빈 값(CSV의 빈 칸)은 넘기지 않음
+    '''
+    data = {key: value for key, value in row.items() if key and value not in ('', None)}
+    password = data.pop('password', None)
+    if password is not None:
+        data.setdefault('password1', password)
+        data.setdefault('password2', password)
+    return data
+
+
+def _hash_passwords(costs, passwords):
+    '''
+        풀 프로세스에서 실행, 비용은 가져오기를 실행한 프로세스의 설정 값 사용
+    '''
+    hasher = make_argon2_hasher(*costs)
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
+
+
+class Batch:
+    '''
+        확인을 마치고 해시 계산을 기다리는 배치
+        end : 배치의 마지막 행 번호, users : [(행 번호, User)], hashes : [(users의 위치 목록, 해시 결과 future)]
+    '''
+
+    def __init__(self, end):
+        self.end = end
+        self.users = []
+        self.keys = {field: set() for field in UNIQUE_FIELDS}
+        self.hashes = []
+
+
+class UserImporter:
+    '''
+        batch_size : 한 트랜잭션에 저장할 행 수
+        workers : 비밀번호 해시 프로세스 수(None이면 CPU 코어 수)
+        on_error(행 번호, 에러 dict) : 확인에 실패하거나 저장하지 못한 행마다 호출
+        on_batch(진행 상황 dict) : 배치를 저장할 때마다 호출
+    '''
+
+    def __init__(self, batch_size=None, workers=None, hash_chunk_size=None, on_error=None, on_batch=None):
+        self.batch_size = batch_size or import_setting('BATCH_SIZE')
+        self.workers = workers or import_setting('WORKERS') or os.cpu_count() or 1
+        self.hash_chunk_size = hash_chunk_size or import_setting('HASH_CHUNK_SIZE')
+        self.on_error = on_error or (lambda number, errors: None)
+        self.on_batch = on_batch or (lambda progress: None)
+        self._executor = None
+        # 행마다 serializer를 만들면 필드를 매번 복사(deepcopy)하기 때문에 ListSerializer처럼 하나를 재사용
+        self.serializer = ImportUserSerializer()
+        hasher = get_hasher('default')
+        # 기본 hasher가 Argon2면 프로세스 풀에서 같은 비용으로 계산, 다른 hasher면 현재 프로세스에서 계산
+        self.costs = ((hasher.time_cost, hasher.memory_cost, hasher.parallelism)
+                      if isinstance(hasher, Argon2PasswordHasher) else None)
+
+    def run(self, rows, start=0):
+        '''
+            rows : read_rows()의 (행 번호, 행), start : 건너뛴 행 수
+            진행 상황 dict 리턴, 저장 중 에러가 나면 UserImportError
+        '''
+        self.started = time.perf_counter()
+        self.next_start = start
+        self.processed = self.imported = self.failed = 0
+        rows = iter(rows)
+        pending = None
+        try:
+            while True:
+                chunk = list(itertools.islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                # 이전 배치의 해시를 계산하는 동안 다음 배치를 확인
+                batch = self.prepare(chunk, pending)
+                if pending is not None:
+                    self.save(pending)
+                pending = batch
+            if pending is not None:
+                self.save(pending)
+        except Exception as e:
+            raise UserImportError(self.next_start, e) from e
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+        return self.progress()
+
+    def progress(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            'processed': self.processed,
+            'imported': self.imported,
+            'failed': self.failed,
+            'next_start': self.next_start,
+            'seconds': round(seconds, 2),
+            'rows_per_second': round(self.processed / seconds, 1) if seconds else None,
+        }
+
+    def error(self, number, errors):
+        self.failed += 1
+        self.on_error(number, errors)
+
+    def prepare(self, chunk, pending):
+        '''
+            행 확인 -> 중복 확인 -> 해시 계산 요청까지 진행한 Batch 리턴
+        '''
+        batch = Batch(chunk[-1][0])
+        valid = []
+        for number, row in chunk:
+            if row is None:
+                continue
+            if isinstance(row, Exception):
+                self.error(number, {'non_field_errors': [str(row)]})
+                continue
+            try:
+                valid.append((number, self.serializer.run_validation(row_to_data(row))))
+            except serializers.ValidationError as e:
+                self.error(number, e.detail)
+
+        existing = self.get_existing(valid)
+        for number, data in valid:
+            keys = self.get_keys(data)
+            duplicates = {field: [DUPLICATE_MESSAGE] for field, key in keys.items()
+                          if key in existing[field] or key in batch.keys[field]
+                          or (pending is not None and key in pending.keys[field])}
+            if duplicates:
+                self.error(number, duplicates)
+                continue
+            for field, key in keys.items():
+                batch.keys[field].add(key)
+            batch.users.append((number, data))
+        self.hash_passwords(batch)
+        return batch
+
+    @staticmethod
+    def get_keys(data):
+        # allauth처럼 email은 대소문자 구분 없이 비교
+        return {field: data[field].lower() if field == 'email' else data[field] for field in UNIQUE_FIELDS}
+
+    def get_existing(self, valid):
+        '''
+            필드마다 이미 저장된 값을 한 번에 조회(필드마다 쿼리 한 번)
+        '''
+        existing = {field: set() for field in UNIQUE_FIELDS}
+        if not valid:
+            return existing
+        # email은 Lower('email') 인덱스(user_email_lower_idx)로 조회
+        users = User.objects.annotate(email_lower=Lower('email'))
+        rows = [self.get_keys(data) for _, data in valid]
+        for field in UNIQUE_FIELDS:
+            keys = {row[field] for row in rows}
+            column = 'email_lower' if field == 'email' else field
+            existing[field] = set(users.filter(**{f'{column}__in': keys}).values_list(column, flat=True))
+        return existing
+
+    def hash_passwords(self, batch):
+        '''
+            password_hash가 있는 행은 그대로 사용하고, 나머지는 프로세스 풀에 해시 계산 요청
+        '''
+        users = []
+        passwords = []
+        for number, data in batch.users:
+            user = User(username=data['username'], email=data['email'], nickname=data['nickname'],
+                        name=data['name'], phone_number=data['phone_number'],
+                        registration_state=User.STATE_REGISTERED, password=data.get('password_hash', ''))
+            if not user.password:
+                passwords.append((len(users), data['password1']))
+            users.append((number, user))
+        batch.users = users
+
+        for offset in range(0, len(passwords), self.hash_chunk_size):
+            chunk = passwords[offset:offset + self.hash_chunk_size]
+            indexes, values = [index for index, _ in chunk], [value for _, value in chunk]
+            if self.costs is None:
+                batch.hashes.append((indexes, [make_password(value) for value in values]))
+                continue
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            batch.hashes.append((indexes, self._executor.submit(_hash_passwords, self.costs, values)))
+
+    def save(self, batch):
+        for indexes, result in batch.hashes:
+            encoded = result if isinstance(result, list) else result.result()
+            for index, password in zip(indexes, encoded):
+                batch.users[index][1].password = password
+
+        users = [user for _, user in batch.users]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            imported = len(users)
+        except IntegrityError:
+            # 확인한 뒤에 다른 요청(가입 API 등)이 같은 값을 먼저 저장한 경우 행마다 저장해서 나머지는 저장
+            imported = self.save_each(batch.users)
+
+        self.imported += imported
+        self.processed += batch.end - self.next_start
+        self.next_start = batch.end
+        self.on_batch(self.progress())
+
+    def save_each(self, users):
+        imported = 0
+        with transaction.atomic():
+            for number, user in users:
+                try:
+                    with transaction.atomic():
+                        User.objects.bulk_create([user])
+                    imported += 1
+                except IntegrityError as e:
+                    self.error(number, {'non_field_errors': [str(e)]})
+        return imported
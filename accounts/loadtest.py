@@ -0,0 +1,234 @@
+'''
+    회원가입 흐름 부하 테스트(manage.py loadtest)
+
+    가상 사용자(virtual user) N명이 동시에 아래 흐름을 반복하고 API별 응답 시간 분위수(p50/p95/p99)와 처리량을 측정
+    인증번호 발송 -> (가짜 SENS 서버로 받은 문자에서 인증번호 확인) -> 인증번호 확인 -> 회원가입 -> 토큰 발급 -> 회원 정보 조회
+
+    - InProcessTransport : django.test.Client로 같은 프로세스 안의 Django 앱 호출
+    - HttpTransport : httpx로 실행 중인 서버(URL) 호출
+'''
+import itertools
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+import httpx
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+# 흐름 순서대로 측정할 API
+ENDPOINTS = ['sms_send', 'sms_confirm', 'signup', 'token', 'user']
+AUTH_NUMBER_PATTERN = re.compile(r'\[(\d{4})\]')
+PASSWORD = 'Load!test1234'
+
+
+def percentile(values, percent):
+    '''
+        nearest-rank 방식의 분위수(values는 정렬된 리스트)
+    '''
+    if not values:
+        return None
+    return values[max(0, math.ceil(len(values) * percent / 100) - 1)]
+
+
+def parse_json(response):
+    # 에러 페이지처럼 JSON이 아닌 응답은 본문 없이 응답 코드만 사용
+    if 'json' not in response.headers.get('Content-Type', ''):
+        return None
+    return response.json()
+
+
+class InProcessTransport:
+    '''
+        같은 프로세스의 Django 앱을 django.test.Client로 호출
+        가상 사용자(스레드)마다 하나씩 만들어서 사용
+    '''
+
+    def __init__(self):
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if method == 'get':
+            response = self.client.get(path, **headers)
+        else:
+            response = self.client.post(path, data, content_type='application/json', **headers)
+        return response.status_code, parse_json(response)
+
+    def close(self):
+        # 스레드마다 열린 DB 커넥션 정리
+        connections.close_all()
+
+
+class HttpTransport:
+    '''
+        실행 중인 서버를 httpx로 호출
+    '''
+
+    def __init__(self, base_url, timeout=30):
+        self.client = httpx.Client(base_url=base_url, timeout=timeout)
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.client.request(method.upper(), path, json=data, headers=headers)
+        return response.status_code, parse_json(response)
+
+    def close(self):
+        self.client.close()
+
+
+class LoadTestStats:
+    '''
+        API별 응답 시간과 응답 코드 집계(여러 스레드에서 같이 기록)
+    '''
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, status):
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.statuses[name][str(status)] += 1
+
+    def record_flow(self, ok):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def summary(self, name, elapsed):
+        latencies = sorted(self.latencies[name])
+        statuses = dict(self.statuses[name])
+        errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            'count': len(latencies),
+            'errors': errors,
+            'statuses': statuses,
+            'rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+            'p50_ms': ms(percentile(latencies, 50)),
+            'p95_ms': ms(percentile(latencies, 95)),
+            'p99_ms': ms(percentile(latencies, 99)),
+            'max_ms': ms(latencies[-1] if latencies else None),
+        }
+
+
+class LoadTest:
+    '''
+        가상 사용자 users명이 각각 flows번 회원가입 흐름을 실행
+
+        sens : 문자를 받을 FakeSensServer(대상 서버의 SENS_API_URL이 이 서버를 가리켜야 함)
+        transport_factory : 가상 사용자마다 호출해서 InProcessTransport / HttpTransport를 만드는 함수
+    '''
+
+    def __init__(self, sens, transport_factory, users=10, flows=5, sms_timeout=10):
+        self.sens = sens
+        self.transport_factory = transport_factory
+        self.users = users
+        self.flows = flows
+        self.sms_timeout = sms_timeout
+        self.stats = LoadTestStats()
+        # 실행할 때마다 다른 전화번호 / 아이디를 사용하도록 시작 번호를 무작위로 선택
+        self._base = random.randrange(10 ** 7)
+        self._sequence = itertools.count()
+        self._sequence_lock = threading.Lock()
+        self.urls = {
+            'sms_send': reverse('sms_auth_send'),
+            'sms_confirm': reverse('sms_auth_confirm'),
+            'signup': reverse('rest_register'),
+            'token': reverse('token_obtain_pair'),
+            'user': reverse('rest_user_details'),
+        }
+
+    def next_identity(self):
+        with self._sequence_lock:
+            number = self._base + next(self._sequence)
+        return f'010{number % 10 ** 8:08d}', f'load{number}'
+
+    def call(self, transport, name, method, data=None, token=None):
+        start = time.perf_counter()
+        try:
+            status, body = transport.request(method, self.urls[name], data, token)
+        except Exception:
+            # 연결 실패, timeout 등은 응답 코드 대신 error로 기록
+            self.stats.record(name, time.perf_counter() - start, 'error')
+            return None, None
+        self.stats.record(name, time.perf_counter() - start, status)
+        return status, body
+
+    def run_flow(self, transport):
+        '''
+            회원가입 흐름 한 번 실행, 중간에 실패하면 나머지 단계는 건너뜀
+        '''
+        phone_number, username = self.next_identity()
+        status, _ = self.call(transport, 'sms_send', 'post', {'phone_number': phone_number})
+        if status != 200:
+            return False
+
+        # 인증번호 발송 응답 후 가짜 SENS 서버에 문자가 도착할 때까지 걸린 시간도 기록
+        start = time.perf_counter()
+        content = self.sens.wait_message(phone_number, self.sms_timeout)
+        self.stats.record('sms_delivery', time.perf_counter() - start, 200 if content else 'timeout')
+        match = AUTH_NUMBER_PATTERN.search(content or '')
+        if match is None:
+            return False
+
+        data = {'phone_number': phone_number, 'auth_number': int(match.group(1))}
+        status, _ = self.call(transport, 'sms_confirm', 'post', data)
+        if status != 200:
+            return False
+
+        data = {'username': username, 'email': f'{username}@example.com', 'password1': PASSWORD,
+                'password2': PASSWORD, 'nickname': username, 'phone_number': phone_number, 'name': 'Load'}
+        status, _ = self.call(transport, 'signup', 'post', data)
+        if status != 201:
+            return False
+
+        status, body = self.call(transport, 'token', 'post', {'username': username, 'password': PASSWORD})
+        if status != 200:
+            return False
+
+        status, _ = self.call(transport, 'user', 'get', token=body['access'])
+        return status == 200
+
+    def run_user(self):
+        transport = self.transport_factory()
+        try:
+            for _ in range(self.flows):
+                self.stats.record_flow(self.run_flow(transport))
+        finally:
+            transport.close()
+
+    def run(self):
+        threads = [threading.Thread(target=self.run_user) for _ in range(self.users)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        requests = sum(len(self.stats.latencies[name]) for name in ENDPOINTS)
+        return {
+            'users': self.users,
+            'flows': self.users * self.flows,
+            'completed': self.stats.completed,
+            'failed': self.stats.failed,
+            'seconds': round(elapsed, 3),
+            'signups_per_second': round(self.stats.completed / elapsed, 2),
+            'requests_per_second': round(requests / elapsed, 2),
+            'sens_latency': self.sens.latency,
+            'endpoints': {name: self.stats.summary(name, elapsed) for name in ENDPOINTS},
+            'sms_delivery': self.stats.summary('sms_delivery', elapsed),
+        }
@@ -0,0 +1,82 @@
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...hashers import DEFAULTS, hashing_setting, make_argon2_hasher
+
+
+class Command(BaseCommand):
+    help = ('현재 서버에서 Argon2 비용(time_cost, memory_cost, parallelism)별 해시 시간을 측정하고 '
+            '목표 시간 안에서 가장 비용이 큰 값을 PASSWORD_HASHING 설정으로 출력합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=50, help='해시 한 번에 허용할 시간(밀리초)')
+        parser.add_argument('--max-memory', type=int, default=102400,
+                            help='해시 한 번에 사용할 최대 메모리(KiB). 풀 프로세스 수만큼 동시에 사용함')
+        parser.add_argument('--min-memory', type=int, default=8192, help='해시 한 번에 사용할 최소 메모리(KiB)')
+        parser.add_argument('--parallelism', type=int, action='append', default=None,
+                            help='측정할 parallelism(여러 번 지정 가능, 기본값: 1과 CPU 코어 수)')
+        parser.add_argument('--samples', type=int, default=3, help='비용마다 측정할 횟수(중앙값 사용)')
+
+    def handle(self, *args, **options):
+        self.samples = options['samples']
+        target = options['target_ms'] / 1000
+        cpu_count = os.cpu_count() or 1
+        parallelisms = sorted(set(options['parallelism'] or [1, min(cpu_count, 8)]))
+
+        candidates = []
+        for parallelism in parallelisms:
+            candidate = self.calibrate(target, parallelism, options['max_memory'], options['min_memory'])
+            if candidate is not None:
+                candidates.append(candidate)
+        if not candidates:
+            raise CommandError(f'{options["min_memory"]}KiB로도 {options["target_ms"]}ms 안에 해시를 계산할 수 없습니다. '
+                               '--target-ms를 늘리거나 --min-memory를 줄여주세요.')
+
+        # 목표 시간 안에서 계산량(time_cost * memory_cost)이 가장 큰 값, 같으면 스레드를 적게 쓰는 값 선택
+        time_cost, memory_cost, parallelism, seconds = max(
+            candidates, key=lambda candidate: (candidate[0] * candidate[1], -candidate[2]))
+        self.stdout.write(self.render(time_cost, memory_cost, parallelism, seconds, options['target_ms'], cpu_count))
+
+    def measure(self, time_cost, memory_cost, parallelism):
+        hasher = make_argon2_hasher(time_cost, memory_cost, parallelism)
+        salt = hasher.salt()
+        durations = []
+        for _ in range(self.samples):
+            start = time.perf_counter()
+            hasher.encode('calibrate-password', salt)
+            durations.append(time.perf_counter() - start)
+        seconds = statistics.median(durations)
+        self.stderr.write(f't={time_cost} m={memory_cost}KiB p={parallelism}: {seconds * 1000:.1f}ms')
+        return seconds
+
+    def calibrate(self, target, parallelism, max_memory, min_memory):
+        '''
+            parallelism 하나에 대해 목표 시간 안에 들어오는 가장 큰 memory_cost를 찾고(RFC 9106 권장 순서),
+            그 메모리에서 time_cost를 목표 시간까지 늘리기
+        '''
+        memory_cost = max_memory
+        while memory_cost >= max(min_memory, 8 * parallelism):
+            seconds = self.measure(1, memory_cost, parallelism)
+            if seconds <= target:
+                # time_cost에 거의 비례해서 늘어나므로 추정한 값부터 목표 시간 안에 들어올 때까지 줄이기
+                time_cost = max(1, int(target // seconds))
+                while time_cost > 1:
+                    estimated = self.measure(time_cost, memory_cost, parallelism)
+                    if estimated <= target:
+                        return time_cost, memory_cost, parallelism, estimated
+                    time_cost -= 1
+                return 1, memory_cost, parallelism, seconds
+            memory_cost //= 2
+        return None
+
+    def render(self, time_cost, memory_cost, parallelism, seconds, target_ms, cpu_count):
+        values = {name: hashing_setting(name) for name in DEFAULTS}
+        values.update(TIME_COST=time_cost, MEMORY_COST=memory_cost, PARALLELISM=parallelism)
+        lines = [f'# calibrate_hasher: 목표 {target_ms:g}ms, 측정 {seconds * 1000:.1f}ms (CPU {cpu_count}코어)',
+                 'PASSWORD_HASHING = {']
+        lines += [f'    {name!r}: {value!r},' for name, value in values.items()]
+        lines.append('}')
+        return '\n'.join(lines)
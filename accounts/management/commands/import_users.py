@@ -0,0 +1,44 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importing import FORMATS, UserImporter, UserImportError, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = ('CSV 또는 JSONL 파일의 회원을 가입 API와 같은 규칙으로 확인해서 배치마다 bulk_create로 저장합니다. '
+            '실패하거나 중간에 멈추면 출력된 --start 값으로 이어서 진행합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='가져올 파일(CSV는 헤더 포함, JSONL은 한 줄에 회원 한 명)')
+        parser.add_argument('--format', choices=FORMATS, default=None, help='파일 형식(기본값: 확장자로 판단)')
+        parser.add_argument('--batch-size', type=int, default=None, help='한 트랜잭션에 저장할 행 수')
+        parser.add_argument('--workers', type=int, default=None, help='비밀번호 해시 프로세스 수')
+        parser.add_argument('--start', type=int, default=0, help='건너뛸 행 수(이전 실행에서 출력된 다음 시작 위치)')
+        parser.add_argument('--errors', default=None, help='저장하지 못한 행을 JSONL로 기록할 파일(기본값: stderr)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        errors = open(options['errors'], 'a', encoding='utf-8') if options['errors'] else sys.stderr
+
+        def on_error(number, detail):
+            errors.write(json.dumps({'row': number, 'errors': detail}, ensure_ascii=False, default=str) + '\n')
+
+        importer = UserImporter(options['batch_size'], options['workers'], on_error=on_error, on_batch=self.report)
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as file:
+                rows = read_rows(file, options['format'] or detect_format(path), options['start'])
+                self.report(importer.run(rows, start=options['start']), done=True)
+        except UserImportError as e:
+            raise CommandError(f'가져오기 실패: {e.cause} - --start {e.next_start}로 이어서 진행하세요.')
+        except KeyboardInterrupt:
+            raise CommandError(f'중단되었습니다. --start {importer.next_start}로 이어서 진행하세요.')
+        finally:
+            if errors is not sys.stderr:
+                errors.close()
+
+    def report(self, progress, done=False):
+        state = '완료' if done else f"다음 시작 위치 --start {progress['next_start']}"
+        self.stdout.write(f"{progress['processed']}행 처리(저장 {progress['imported']}, 실패 {progress['failed']}), "
+                          f"{progress['seconds']}초, {progress['rows_per_second'] or 0}행/초 - {state}")
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...loadtest import HttpTransport, InProcessTransport, LoadTest
+from ...sms.fake_sens import FakeSensServer
+from ...sms.worker import run_outbox_worker
+
+
+class Command(BaseCommand):
+    help = ('가상 사용자 여러 명이 동시에 회원가입 흐름(인증번호 발송 -> 확인 -> 회원가입 -> 토큰 발급 -> 회원 정보 조회)을 '
+            '반복하고 API별 p50/p95/p99 응답 시간과 처리량을 JSON으로 출력합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None,
+                            help='부하를 줄 서버 주소(예: http://127.0.0.1:8000). 없으면 임시 DB로 같은 프로세스 안에서 실행. '
+                                 '서버의 SENS_API_URL은 --sens-port로 띄운 가짜 SENS 서버를 가리키고 '
+                                 'DEFAULT_THROTTLE_RATES의 sms_send 요청 수 제한을 풀어야 함')
+        parser.add_argument('--users', type=int, default=10, help='동시에 실행할 가상 사용자 수')
+        parser.add_argument('--flows', type=int, default=5, help='가상 사용자마다 반복할 회원가입 흐름 수')
+        parser.add_argument('--sens-host', default='127.0.0.1', help='가짜 SENS 서버 주소')
+        parser.add_argument('--sens-port', type=int, default=0, help='가짜 SENS 서버 포트(0이면 빈 포트 사용)')
+        parser.add_argument('--sens-latency', type=float, default=0.05, help='가짜 SENS 서버 응답 지연(초)')
+        parser.add_argument('--sms-timeout', type=float, default=10, help='인증번호 문자를 기다리는 최대 시간(초)')
+        parser.add_argument('--poll-interval', type=float, default=0.05,
+                            help='같은 프로세스에서 실행할 때 outbox 워커가 보낼 문자가 없을 때 쉬는 시간(초)')
+        parser.add_argument('--output', default=None, help='결과 JSON을 저장할 파일(없으면 표준 출력)')
+
+    def handle(self, *args, **options):
+        with FakeSensServer(options['sens_host'], options['sens_port'], options['sens_latency']) as sens:
+            if options['url']:
+                self.stderr.write(f'가짜 SENS 서버: {sens.url}')
+                result = self.run_http(sens, options)
+            else:
+                result = self.run_in_process(sens, options)
+
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run_http(self, sens, options):
+        loadtest = LoadTest(sens, lambda: HttpTransport(options['url']), options['users'], options['flows'],
+                            options['sms_timeout'])
+        return dict(loadtest.run(), target=options['url'])
+
+    def run_in_process(self, sens, options):
+        '''
+            임시 파일 DB를 만들고 실제 SENS 백엔드가 가짜 SENS 서버로 보내도록 바꾼 뒤
+            outbox 워커를 백그라운드 스레드로 같이 실행
+        '''
+        setup_test_environment()
+        # 가상 사용자(스레드)마다 커넥션을 따로 열기 때문에 메모리 DB 대신 임시 파일 DB 사용
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'loadtest.sqlite3')
+        # SQLite는 쓰기가 직렬화되므로 동시 쓰기 때 잠금을 기다리도록 설정
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 30)
+        old_name = connection.creation.create_test_db(verbosity=0)
+        stop_event = threading.Event()
+        try:
+            # 가상 사용자가 모두 같은 IP로 요청하기 때문에 인증번호 발송 요청 수 제한(throttle)은 끄고 측정
+            rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+            rest_framework = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={scope: None for scope in rates})
+            with override_settings(SMS_BACKEND='accounts.sms.backends.sens.SmsBackend', SENS_API_URL=sens.url,
+                                   REST_FRAMEWORK=rest_framework):
+                worker = threading.Thread(target=run_outbox_worker, args=(stop_event,),
+                                          kwargs={'poll_interval': options['poll_interval']}, daemon=True)
+                worker.start()
+                loadtest = LoadTest(sens, InProcessTransport, options['users'], options['flows'],
+                                    options['sms_timeout'])
+                result = loadtest.run()
+                stop_event.set()
+                worker.join()
+        finally:
+            stop_event.set()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        return dict(result, target='in-process')
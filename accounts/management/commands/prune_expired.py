@@ -0,0 +1,52 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from ...pruning import TARGET_NAMES, Pruner, pruning_setting
+
+
+class Command(BaseCommand):
+    help = ('만료된 OutstandingToken, BlacklistedToken과 유효시간이 지난 sms_auth 행을 '
+            '기본 키 범위마다 나눠서 삭제합니다. 중간에 멈추면 다음 실행에서 이어서 진행합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', choices=TARGET_NAMES, default=None,
+                            help='정리할 대상(여러 번 지정 가능, 기본값: 전체)')
+        parser.add_argument('--batch-size', type=int, default=None, help='한 번에 확인할 기본 키 범위의 행 수')
+        parser.add_argument('--sleep', type=float, default=None, help='범위 사이에 쉬는 시간(초)')
+        parser.add_argument('--max-batches', type=int, default=None, help='이번 실행에서 처리할 최대 범위 수')
+        parser.add_argument('--max-seconds', type=float, default=None, help='이번 실행의 최대 시간(초)')
+        parser.add_argument('--reset', action='store_true', help='저장된 진행 위치를 지우고 처음부터 진행')
+        parser.add_argument('--loop', action='store_true', help='종료 신호를 받을 때까지 --interval초마다 반복')
+        parser.add_argument('--interval', type=float, default=None, help='--loop에서 반복할 간격(초)')
+
+    def handle(self, *args, **options):
+        pruner = Pruner(options['target'], options['batch_size'], options['sleep'])
+        run_options = {'max_batches': options['max_batches'], 'max_seconds': options['max_seconds']}
+        if not options['loop']:
+            self.report(pruner.run(reset=options['reset'], **run_options))
+            return
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('종료 신호를 받았습니다. 진행 중인 범위를 마치고 종료합니다.')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        interval = options['interval'] or pruning_setting('INTERVAL')
+        reset = options['reset']
+        while not stop_event.is_set():
+            self.report(pruner.run(stop_event=stop_event, reset=reset, **run_options))
+            reset = False
+            stop_event.wait(interval)
+
+    def report(self, results):
+        for result in results:
+            deleted = ', '.join(f'{label} {count}' for label, count in result['deleted'].items()) or '-'
+            state = '완료' if result['complete'] else '중단(다음 실행에서 이어서 진행)'
+            self.stdout.write(f"{result['target']}: {result['rows']}건 삭제({deleted}), "
+                              f"{result['batches']}개 범위, {result['seconds']}초, "
+                              f"{result['rows_per_second'] or 0}건/초, 가장 긴 범위 {result['max_batch_ms']}ms - {state}")
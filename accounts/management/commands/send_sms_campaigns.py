@@ -0,0 +1,56 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import SmsCampaign
+from ...sms.campaign import claim_campaign, run_campaign, run_campaign_worker
+
+
+class Command(BaseCommand):
+    help = ('등록된 공지 문자(SmsCampaign)를 조건에 맞는 회원에게 NAVER SENS로 전송합니다. '
+            '배치마다 진행 상황을 저장하기 때문에 중간에 멈춰도 다음 실행에서 이어서 전송합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campaign', type=int, default=None, help='이 캠페인만 전송하고 종료')
+        parser.add_argument('--once', action='store_true', help='전송할 캠페인을 모두 보내고 종료')
+        parser.add_argument('--chunk-size', type=int, default=None, help='SENS 요청 하나에 담을 수신자 수')
+        parser.add_argument('--concurrency', type=int, default=None, help='동시에 보낼 SENS 요청 수')
+        parser.add_argument('--interval', type=float, default=None, help='보낼 캠페인이 없을 때 쉬는 시간(초)')
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('종료 신호를 받았습니다. 진행 중인 배치를 마치고 종료합니다.')
+            stop_event.set()
+
+        handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self.run(stop_event, options)
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def run(self, stop_event, options):
+        run_options = {'chunk_size': options['chunk_size'], 'concurrency': options['concurrency']}
+        if options['campaign'] is None and not options['once']:
+            self.stdout.write('공지 문자 워커 시작')
+            run_campaign_worker(stop_event, poll_interval=options['interval'], **run_options)
+            return
+
+        while not stop_event.is_set():
+            campaign = claim_campaign(options['campaign'])
+            if campaign is None:
+                if options['campaign'] is not None:
+                    raise CommandError(f"{options['campaign']}번 캠페인은 전송할 수 없습니다(완료 또는 다른 워커가 전송 중).")
+                return
+            run_campaign(campaign, stop_event, **run_options)
+            self.report(campaign)
+            if options['campaign'] is not None:
+                return
+
+    def report(self, campaign):
+        state = '완료' if campaign.status == SmsCampaign.STATUS_DONE else f'중단(다음 시작 위치 {campaign.cursor})'
+        self.stdout.write(f'{campaign.pk}번 캠페인: 성공 {campaign.sent}, 실패 {campaign.failed}, '
+                          f'수신자 {campaign.total} - {state}')
@@ -0,0 +1,40 @@
+import asyncio
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from ...sms.worker import arun_outbox_worker, drain_outbox, run_outbox_worker
+
+
+class Command(BaseCommand):
+    help = 'SMS outbox에 쌓인 문자를 NAVER SENS로 전송합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='outbox를 한 번만 비우고 종료')
+        parser.add_argument('--batch-size', type=int, default=None, help='한 번에 선점할 outbox 행 수')
+        parser.add_argument('--workers', type=int, default=None, help='동시에 전송할 스레드 수')
+        parser.add_argument('--interval', type=float, default=None, help='보낼 문자가 없을 때 쉬는 시간(초)')
+        parser.add_argument('--async', action='store_true', dest='use_async',
+                            help='스레드 풀 대신 asyncio 이벤트 루프에서 비동기 HTTP 클라이언트로 전송')
+
+    def handle(self, *args, **options):
+        batch_size, workers = options['batch_size'], options['workers']
+        if options['once']:
+            processed = drain_outbox(batch_size, workers)
+            self.stdout.write(f'{processed}건 처리')
+            return
+
+        stop_event = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('종료 신호를 받았습니다. 진행 중인 전송을 마치고 종료합니다.')
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write('SMS outbox 워커 시작')
+        if options['use_async']:
+            asyncio.run(arun_outbox_worker(stop_event, batch_size, options['interval']))
+        else:
+            run_outbox_worker(stop_event, batch_size, workers, options['interval'])
@@ -0,0 +1,21 @@
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .hashers import HashingUnavailable
+
+
+class HashingUnavailableMiddleware(MiddlewareMixin):
+    '''
+        DRF 밖에서 비밀번호를 확인하는 요청(관리자 로그인, authenticate()를 사용하는 일반 View)도
+        해시 대기열이 가득 차면 500 대신 503(Retry-After)으로 응답
+        DRF View에서 발생한 HashingUnavailable은 DRF exception handler가 먼저 처리함
+        MiddlewareMixin을 사용해서 ASGI의 비동기 View도 동기 스레드를 거치지 않고 호출
+    '''
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingUnavailable):
+            return None
+        response = JsonResponse({'detail': str(exception.detail)}, status=exception.status_code)
+        if exception.wait is not None:
+            response['Retry-After'] = '%d' % exception.wait
+        return response
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.5 on 2026-10-18 07:45
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('phone_number', models.CharField(max_length=11, verbose_name='휴대폰 번호')),
+                ('content', models.TextField(verbose_name='문자 내용')),
+                ('status', models.CharField(choices=[('pending', '전송 대기'), ('sending', '전송 중'), ('sent', '전송 완료'), ('failed', '전송 실패')], default='pending', max_length=10, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='전송 시도 횟수')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='다음 전송 시각')),
+                ('last_error', models.TextField(blank=True, verbose_name='마지막 에러')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='전송 완료 시각')),
+            ],
+            options={
+                'db_table': 'sms_outbox',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='smsoutbox',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='sms_outbox_status_next_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.5 on 2026-10-18 08:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def dedupe_phone_numbers(apps, schema_editor):
+    '''
+        unique 인덱스를 만들기 전에 기존 데이터 정리
+        1. 빈 문자열 전화번호는 NULL로 변경
+        2. 같은 전화번호를 가진 User가 여러 명이면 가입을 완료한(email이 있는) 최근 User만 남기고
+           나머지 User의 전화번호는 NULL로 변경
+    '''
+    User = apps.get_model('accounts', 'User')
+    db_alias = schema_editor.connection.alias
+    users = User.objects.using(db_alias)
+    users.filter(phone_number='').update(phone_number=None)
+
+    duplicates = (users.exclude(phone_number=None).values('phone_number')
+                  .annotate(count=models.Count('id')).filter(count__gt=1).values_list('phone_number', flat=True))
+    for phone_number in duplicates:
+        # email이 있는 User 먼저, 그 다음 최근에 가입한 User 순서
+        ids = list(users.filter(phone_number=phone_number)
+                   .order_by(models.Case(models.When(email='', then=1), default=0), '-date_joined', '-id')
+                   .values_list('id', flat=True))
+        users.filter(id__in=ids[1:]).update(phone_number=None)
+
+
+def restore_empty_phone_numbers(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    User.objects.using(schema_editor.connection.alias).filter(phone_number=None).update(phone_number='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_sms_outbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='phone_number',
+            field=models.CharField(max_length=11, null=True, validators=[django.core.validators.RegexValidator('^010?[0-9]\\d{3}?\\d{4}$')]),
+        ),
+        migrations.RunPython(dedupe_phone_numbers, restore_empty_phone_numbers),
+        migrations.AlterField(
+            model_name='user',
+            name='phone_number',
+            field=models.CharField(max_length=11, null=True, unique=True, validators=[django.core.validators.RegexValidator('^010?[0-9]\\d{3}?\\d{4}$')]),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.5 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+def fill_registration_state(apps, schema_editor):
+    '''
+        기존 User의 가입 상태를 email 유무로 채우기
+        - 전화번호 없음 : pending_verification(기본값 그대로)
+        - 전화번호 있음, email 없음 : verified
+        - 전화번호 있음, email 있음 : registered
+    '''
+    User = apps.get_model('accounts', 'User')
+    users = User.objects.using(schema_editor.connection.alias).exclude(phone_number=None)
+    users.filter(email='').update(registration_state='verified')
+    users.exclude(email='').update(registration_state='registered')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_phone_number_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='registration_state',
+            field=models.CharField(choices=[('pending_verification', '전화번호 인증 전'), ('verified', '전화번호 인증 완료'), ('registered', '회원가입 완료')], default='pending_verification', max_length=20, verbose_name='가입 상태'),
+        ),
+        migrations.RunPython(fill_registration_state, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['phone_number', 'registration_state'], name='user_phone_state_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.5 on 2026-10-18 08:27
+
+from django.db import migrations, models
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PruneCursor',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='정리 대상')),
+                ('position', models.CharField(max_length=255, verbose_name='마지막으로 처리한 기본 키')),
+            ],
+            options={
+                'db_table': 'prune_cursor',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.5 on 2026-10-18 09:00
+
+import accounts.phone
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_prune_cursor'),
+    ]
+
+    # 컬럼(varchar(11))은 그대로이고 정규화는 Python에서만 하기 때문에
+    # SQLite에서 테이블을 다시 만들지 않도록 상태만 변경
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='smsauth',
+                name='phone_number',
+                field=accounts.phone.PhoneNumberField(max_length=11, primary_key=True, serialize=False, verbose_name='휴대폰 번호'),
+            ),
+            migrations.AlterField(
+                model_name='user',
+                name='phone_number',
+                field=accounts.phone.PhoneNumberField(max_length=11, null=True, unique=True),
+            ),
+        ]),
+    ]
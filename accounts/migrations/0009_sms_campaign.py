@@ -0,0 +1,38 @@
+# Generated by Django 3.2.5 on 2026-10-18 09:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_user_email_nickname_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SmsCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('content', models.TextField(verbose_name='문자 내용')),
+                ('filters', models.JSONField(blank=True, default=dict, verbose_name='수신자 조건')),
+                ('status', models.CharField(choices=[('pending', '전송 대기'), ('sending', '전송 중'), ('done', '전송 완료')], default='pending', max_length=10, verbose_name='상태')),
+                ('cursor', models.CharField(blank=True, max_length=11, verbose_name='마지막으로 보낸 휴대폰 번호')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='전송 성공 수')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='전송 실패 수')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='요청할 때의 수신자 수')),
+                ('lease_until', models.DateTimeField(blank=True, null=True, verbose_name='선점 만료 시각')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='전송 완료 시각')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='요청한 관리자')),
+            ],
+            options={
+                'db_table': 'sms_campaign',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.5 on 2026-10-18 09:35
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_sms_campaign'),
+    ]
+
+    # SQLite는 컬럼을 추가할 때 테이블을 다시 만드는데 Django 3.2의 테이블 재생성이
+    # 함수 인덱스(Lower('email'))를 다시 만들지 못하기 때문에 인덱스를 지우고 컬럼 추가 후 다시 만듦
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_email_lower_idx',
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='claims_updated_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='토큰 claim 정보 수정 시각'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='user_email_lower_idx'),
+        ),
+    ]
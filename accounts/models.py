@@ -1,100 +1,284 @@
-import datetime
-import json
-
-import sys
-import uuid
-
-from django.core.validators import RegexValidator
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, router, transaction
 from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Lower
 from django.utils import timezone
 from model_utils.models import TimeStampedModel
 from random import randint
-import hashlib
-import hmac
-import base64
-import requests
-import time
 
-from django.conf import settings
-
-key = settings.NAVER_KEY
+from .otp import get_otp_store
+from .phone import PhoneNumberField
+from .routers import pin_primary
+from .sms import send_sms
+from .sms.client import get_client
 
 
 # Create your models here.
+class SmsAuthManager(models.Manager):
+    # INSERT ... ON CONFLICT DO UPDATE를 지원하는 DB
+    upsert_vendors = ('sqlite', 'postgresql')
+
+    def upsert(self, phone_number):
+        '''
+            인증번호를 새로 만들어서 저장(없으면 INSERT, 있으면 UPDATE)
+            update_or_create()는 SELECT 후 INSERT / UPDATE를 하기 때문에
+            같은 번호로 동시에 요청하면 IntegrityError나 잠금 대기가 생길 수 있어서
+            한 번의 INSERT ... ON CONFLICT DO UPDATE 문으로 처리
+            outbox 저장은 save()와 같이 같은 트랜잭션에서 진행
+        '''
+        sms_auth = self.model(phone_number=phone_number, auth_number=self.model.make_auth_number())
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        if connection.vendor not in self.upsert_vendors:
+            # 지원하지 않는 DB는 기존 방식으로 처리
+            sms_auth, _ = self.update_or_create(phone_number=phone_number)
+            return sms_auth
+
+        now = timezone.now()
+        sms_auth.created = sms_auth.modified = now
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        fields = [opts.get_field(name) for name in ('phone_number', 'auth_number', 'created', 'modified')]
+        columns = ', '.join(qn(field.column) for field in fields)
+        values = [field.get_db_prep_save(getattr(sms_auth, field.attname), connection) for field in fields]
+        # 이미 있는 번호면 인증번호와 수정 시각만 바꾸기
+        updates = ', '.join(f'{qn(field.column)} = excluded.{qn(field.column)}'
+                            for field in (opts.get_field('auth_number'), opts.get_field('modified')))
+        sql = (f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES ({", ".join(["%s"] * len(fields))}) '
+               f'ON CONFLICT ({qn(fields[0].column)}) DO UPDATE SET {updates}')
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, values)
+            SmsOutbox.objects.using(using).create(phone_number=phone_number, content=sms_auth.get_message())
+        pin_primary(phone_number=phone_number)
+        return sms_auth
+
+
 # 유저의 전화번호와 인증번호를 담을 테이블
 class SmsAuth(TimeStampedModel):
-    phone_number = models.CharField(max_length=11, validators=[RegexValidator(r"^010?[0-9]\d{3}?\d{4}$")],
-                                    primary_key=True, verbose_name='휴대폰 번호')
+    # 저장, 조회 전에 구분자 없는 숫자로 정규화(accounts/phone.py)
+    phone_number = PhoneNumberField(primary_key=True, verbose_name='휴대폰 번호')
     auth_number = models.IntegerField(verbose_name='인증 번호')
 
+    objects = SmsAuthManager()
+
     class Meta:
         db_table = 'sms_auth'
 
     def save(self, *args, **kwargs):
-        self.auth_number = randint(1000, 10000)  # 4자리 랜덤 난수 생성
-        super().save(*args, **kwargs)
-        self.send_sms()  # SMS 전송하기(인증번호 포함)
+        self.auth_number = self.make_auth_number()
+        # 인증번호 저장과 문자 발송 요청(outbox)을 하나의 트랜잭션으로 묶기
+        # 실제 발송은 send_sms_outbox 워커가 따로 진행하기 때문에 요청이 SENS 응답을 기다리지 않음
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            SmsOutbox.objects.create(phone_number=self.phone_number, content=self.get_message())
+        pin_primary(phone_number=self.phone_number)
+
+    @staticmethod
+    def make_auth_number():
+        return randint(1000, 9999)  # 4자리 랜덤 난수 생성
 
-    # 인증번호 전송
+    def get_message(self):
+        return f"[테스트] 인증번호 [{self.auth_number}]를 입력해주세요."
+
+    # 인증번호 바로 전송
     def send_sms(self):
-        timestamp = str(int(time.time() * 1000))
-        uri = f'/sms/v2/services/{key["SMS_ACCESS_ID"]}/messages'
-        post_url = f'https://sens.apigw.ntruss.com{uri}'
-
-        message = "POST" + " " + uri + "\n" + timestamp + "\n" + key["ClOUD_ACCESS_KEY"]
-        message = bytes(message, 'UTF-8')
-
-        signature = self.make_signature(message)
-
-        headers = {
-            "Content-Type": "application/json; charset=utf-8",
-            "x-ncp-apigw-timestamp": timestamp,
-            "x-ncp-iam-access-key": key["ClOUD_ACCESS_KEY"],
-            "x-ncp-apigw-signature-v2": signature
-        }
-
-        body = {
-            "type": "SMS",
-            "from": key["SMS_PHONE_NUMBER"],
-            "content": f"[테스트] 인증번호 [{self.auth_number}]를 입력해주세요.",
-            "messages": [
-                {
-                    "to": self.phone_number,
-                }
-            ],
-        }
-
-        requests.post(post_url, data=json.dumps(body), headers=headers)
+        send_sms(self.phone_number, self.get_message())
 
     def make_signature(self, message):
-        secret_key = bytes(key["ClOUD_SECRET_KEY"], 'UTF-8')
-        return base64.b64encode(hmac.new(secret_key, message, digestmod=hashlib.sha256).digest())
+        return get_client().make_signature(message)
 
     @classmethod
     def check_auth_number(cls, phone_number, auth_number):
         '''
-            사용자 입력 인증번호 == db에 저장된 인증번호 확인 함수
-            외부의 값을 받아서 현재 모델에서 filter로 결과 확인
-            해당 값이 있으면 True, 없으면 False 리턴 
+            사용자 입력 인증번호 == 저장된 인증번호 확인 함수
+            settings.OTP['STORE']에 지정한 저장소(db 또는 캐시)에서 유효시간 안의 인증번호와 비교
+            해당 값이 있으면 True, 없으면 False 리턴
         '''
-        time_limit = timezone.now() - datetime.timedelta(minutes=5)
-        result = cls.objects.filter(phone_number=phone_number, auth_number=auth_number, modified__gte=time_limit)
-        if result:
-            return True
-        return False
+        return get_otp_store().check(phone_number, auth_number)
 
     def __str__(self):
         return f'{self.phone_number}'
 
 
+# SMS 발송 대기열(transactional outbox)
+# SmsAuth.save()와 같은 트랜잭션에서 저장되고 send_sms_outbox 워커가 꺼내서 전송
+class SmsOutbox(TimeStampedModel):
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '전송 대기'),
+        (STATUS_SENDING, '전송 중'),
+        (STATUS_SENT, '전송 완료'),
+        (STATUS_FAILED, '전송 실패'),
+    ]
+
+    phone_number = models.CharField(max_length=11, verbose_name='휴대폰 번호')
+    content = models.TextField(verbose_name='문자 내용')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='상태')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='전송 시도 횟수')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='다음 전송 시각')
+    last_error = models.TextField(blank=True, verbose_name='마지막 에러')
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name='전송 완료 시각')
+
+    class Meta:
+        db_table = 'sms_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='sms_outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.phone_number} ({self.status})'
+
+
+# 만료된 행 정리(accounts/pruning.py) 진행 위치
+# 범위마다 마지막으로 처리한 기본 키를 저장해서 중간에 멈춰도 다음 실행에서 이어서 진행
+class PruneCursor(TimeStampedModel):
+    name = models.CharField(max_length=50, primary_key=True, verbose_name='정리 대상')
+    position = models.CharField(max_length=255, verbose_name='마지막으로 처리한 기본 키')
+
+    class Meta:
+        db_table = 'prune_cursor'
+
+    def __str__(self):
+        return f'{self.name} ({self.position})'
+
+
+# 조건에 맞는 회원 전체에게 보내는 공지 문자(accounts/sms/campaign.py, python manage.py send_sms_campaigns)
+# 수신자는 phone_number 순서로 읽고, 배치를 보낼 때마다 마지막 전화번호(cursor)와 건수를 저장해서
+# 워커가 죽어도 다른 워커가 선점 시간(lease_until)이 지난 뒤 cursor 다음 번호부터 이어서 전송
+class SmsCampaign(TimeStampedModel):
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_DONE = 'done'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '전송 대기'),
+        (STATUS_SENDING, '전송 중'),
+        (STATUS_DONE, '전송 완료'),
+    ]
+
+    content = models.TextField(verbose_name='문자 내용')
+    filters = models.JSONField(default=dict, blank=True, verbose_name='수신자 조건')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='상태')
+    cursor = models.CharField(max_length=11, blank=True, verbose_name='마지막으로 보낸 휴대폰 번호')
+    sent = models.PositiveIntegerField(default=0, verbose_name='전송 성공 수')
+    failed = models.PositiveIntegerField(default=0, verbose_name='전송 실패 수')
+    total = models.PositiveIntegerField(default=0, verbose_name='요청할 때의 수신자 수')
+    lease_until = models.DateTimeField(null=True, blank=True, verbose_name='선점 만료 시각')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='전송 완료 시각')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='+', verbose_name='요청한 관리자')
+
+    class Meta:
+        db_table = 'sms_campaign'
+
+    def __str__(self):
+        return f'{self.pk} ({self.status})'
+
+
 class User(AbstractUser):
     '''
         필요한 항목들 추가
     '''
+    # 가입 진행 상태
+    # 전화번호 인증 전 -> 인증번호 확인 완료(전화번호, username만 있는 User) -> 회원가입 완료
+    STATE_PENDING_VERIFICATION = 'pending_verification'
+    STATE_VERIFIED = 'verified'
+    STATE_REGISTERED = 'registered'
+    STATE_CHOICES = [
+        (STATE_PENDING_VERIFICATION, '전화번호 인증 전'),
+        (STATE_VERIFIED, '전화번호 인증 완료'),
+        (STATE_REGISTERED, '회원가입 완료'),
+    ]
+
     nickname = models.CharField(max_length=20)
-    phone_number = models.CharField(max_length=11, validators=[RegexValidator(r"^010?[0-9]\d{3}?\d{4}$")])
+    # 전화번호로 가입 여부를 찾는 조회가 많기 때문에 unique 인덱스
+    # 전화번호 없이 만든 User(관리자 등)는 빈 문자열 대신 NULL로 저장해서 unique 제약에 걸리지 않도록 함
+    phone_number = PhoneNumberField(unique=True, null=True)
     name = models.CharField(max_length=50)
+    registration_state = models.CharField(max_length=20, choices=STATE_CHOICES, default=STATE_PENDING_VERIFICATION,
+                                          verbose_name='가입 상태')
+    # 발급한 토큰에 같이 저장하는 버전, 올리면 이전에 발급한 토큰은 모두 무효(accounts/tokens.py 참고)
+    token_version = models.PositiveIntegerField(default=0, verbose_name='토큰 버전')
+    # TOKEN_CLAIMS 값을 마지막으로 바꾼 시각, 이전에 발급한 access token의 claim은 사용하지 않음
+    claims_updated_at = models.DateTimeField(null=True, blank=True, verbose_name='토큰 claim 정보 수정 시각')
+
+    # access token에 claim으로 넣는 User 정보(accounts/authentication.py의 StatelessJWTAuthentication)
+    TOKEN_CLAIMS = ['username', 'email', 'nickname', 'phone_number', 'name']
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # 전화번호로 가입 상태만 조회할 때 테이블을 읽지 않고 인덱스만으로 처리(covering index)
+            models.Index(fields=['phone_number', 'registration_state'], name='user_phone_state_idx'),
+            # 회원 가져오기(accounts/importing.py)에서 배치마다 중복을 확인할 때 테이블 전체를 읽지 않도록 함
+            # email은 allauth처럼 대소문자 구분 없이 비교하기 때문에 소문자로 바꾼 값의 인덱스
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(fields=['nickname'], name='user_nickname_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_token_state = user.get_token_state()
+        return user
+
+    def get_token_state(self):
+        # 바뀌면 발급한 토큰의 claim, 캐시의 토큰 버전 정보를 다시 만들어야 하는 값
+        # (필드를 지연 로딩(defer)한 경우는 비교하지 않도록 None)
+        deferred = self.get_deferred_fields()
+        if deferred.intersection(self.TOKEN_CLAIMS + ['is_active']):
+            return None
+        return [getattr(self, claim) for claim in self.TOKEN_CLAIMS] + [self.is_active]
+
+    def save(self, *args, **kwargs):
+        from .tokens import invalidate_token_version
+
+        if not self.phone_number:
+            self.phone_number = None
+        if self.registration_state == self.STATE_PENDING_VERIFICATION and self.phone_number:
+            # 상태를 지정하지 않고 전화번호와 함께 만든 User는 기존 기준(email 유무)으로 상태 결정
+            self.registration_state = self.STATE_REGISTERED if self.email else self.STATE_VERIFIED
+        loaded = getattr(self, '_loaded_token_state', None)
+        state = self.get_token_state()
+        changed = not self._state.adding and (loaded is None or state != loaded)
+        if changed and (loaded is None or state[:-1] != loaded[:-1]):
+            # 이전에 발급한 access token의 claim(이전 정보)으로 내 정보 보기에 응답하지 않도록 수정 시각 저장
+            self.claims_updated_at = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'claims_updated_at'}
+        super().save(*args, **kwargs)
+        self._loaded_token_state = state
+        if changed:
+            # 캐시의 토큰 버전 정보(is_active, claims_updated_at 포함)를 다음 요청에서 다시 읽도록 삭제
+            invalidate_token_version(self.pk)
+        # 바로 다음 요청(가입, 토큰 검증 등)이 복제가 늦은 replica를 읽지 않도록 primary로 고정
+        pin_primary(phone_number=self.phone_number, user_id=self.pk)
+
+    @classmethod
+    def get_registration_state(cls, phone_number):
+        '''
+            전화번호로 가입 상태만 조회, 해당 전화번호의 User가 없으면 None 리턴
+            (phone_number, registration_state) 인덱스만 읽는 쿼리 한 번으로 처리
+        '''
+        try:
+            return cls.objects.values_list('registration_state', flat=True).get(phone_number=phone_number)
+        except cls.DoesNotExist:
+            return None
+
+    def revoke_tokens(self):
+        '''
+            UPDATE 한 번으로 이 User에게 발급한 모든 토큰을 무효화(모든 기기에서 로그아웃)
+            토큰마다 blacklist 행을 만들지 않음
+        '''
+        from .tokens import invalidate_token_version
+
+        User.objects.filter(pk=self.pk).update(token_version=models.F('token_version') + 1)
+        self.token_version += 1
+        invalidate_token_version(self.pk)
+        pin_primary(user_id=self.pk)
 
     def __str__(self):
         return f'{self.username}'
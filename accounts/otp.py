@@ -0,0 +1,310 @@
+'''
+    전화번호 인증번호(OTP) 저장소
+
+    - DatabaseOtpStore : sms_auth 테이블에 저장하고 outbox로 문자 발송(기본값)
+    - CacheOtpStore : Django 캐시에 TTL을 걸어 저장하고 BatchingDispatcher로 문자 발송
+                      인증번호 발송 / 확인에서 SQL을 사용하지 않음
+
+    settings.OTP['STORE']로 사용할 저장소 선택
+
+    인증번호 발송 API는 issue_once()를 사용
+    - RESEND_COOLDOWN초 안에 발송한 번호는 새로 발송하지 않고 기존 인증번호 유지
+    - 같은 번호로 동시에 들어온 요청은 캐시 잠금(cache.add)으로 한 번만 발송(single-flight)
+'''
+import datetime
+import logging
+import math
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models import OuterRef, Subquery
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'STORE': 'accounts.otp.DatabaseOtpStore',
+    'TTL': 300,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'otp',
+    'RESEND_COOLDOWN': 60,
+    'LOCK_TIMEOUT': 10,
+}
+
+# issue_once() 결과(새로 발송했는지, 다시 발송할 수 있을 때까지 남은 시간(초))
+IssueResult = namedtuple('IssueResult', ['issued', 'resend_after'])
+
+
+def otp_setting(name):
+    return getattr(settings, 'OTP', {}).get(name, DEFAULTS[name])
+
+
+class BaseOtpStore:
+    '''
+        인증번호 저장소의 기본 클래스
+        issue() : 새 인증번호를 만들어 저장하고 문자 발송 요청, 인증번호 리턴
+        issue_once() : 재발송 대기 시간과 동시 요청을 확인하고 필요할 때만 issue()
+        check() : 유효시간 안에 저장된 인증번호와 같은지 확인
+        exists() : 인증번호를 발송한 적이 있는 번호인지 확인
+    '''
+
+    def __init__(self):
+        self.ttl = otp_setting('TTL')
+        self.cache = caches[otp_setting('CACHE_ALIAS')]
+        self.prefix = otp_setting('KEY_PREFIX')
+        self.cooldown = otp_setting('RESEND_COOLDOWN')
+        self.lock_timeout = otp_setting('LOCK_TIMEOUT')
+
+    def issue(self, phone_number):
+        raise NotImplementedError('subclasses of BaseOtpStore must override issue() method')
+
+    def get_cooldown_key(self, phone_number):
+        return f'{self.prefix}:cooldown:{phone_number}'
+
+    def get_lock_key(self, phone_number):
+        return f'{self.prefix}:lock:{phone_number}'
+
+    def get_resend_after(self, phone_number):
+        '''
+            재발송 대기 중이면 남은 시간(초), 아니면 None
+        '''
+        resend_at = self.cache.get(self.get_cooldown_key(phone_number))
+        if resend_at is None or resend_at <= time.time():
+            return None
+        return math.ceil(resend_at - time.time())
+
+    def issue_once(self, phone_number):
+        '''
+            재발송 대기 시간 안이거나 같은 번호의 발송이 진행 중이면 발송하지 않고 IssueResult(False, 남은 시간)
+            아니면 issue()로 새 인증번호를 발송하고 IssueResult(True, RESEND_COOLDOWN)
+            발송 중 에러가 나면 잠금만 풀어서 바로 다시 시도할 수 있도록 함
+        '''
+        resend_after = self.get_resend_after(phone_number)
+        if resend_after is not None:
+            return IssueResult(False, resend_after)
+        lock_key = self.get_lock_key(phone_number)
+        if not self.cache.add(lock_key, True, self.lock_timeout):
+            # 먼저 들어온 요청이 발송하고 있음
+            return IssueResult(False, self.cooldown)
+        try:
+            # 잠금을 잡기 전에 다른 요청이 발송을 끝냈을 수 있어서 다시 확인
+            resend_after = self.get_resend_after(phone_number)
+            if resend_after is not None:
+                return IssueResult(False, resend_after)
+            self.issue(phone_number)
+            if self.cooldown:
+                self.cache.set(self.get_cooldown_key(phone_number), time.time() + self.cooldown, self.cooldown)
+        finally:
+            self.cache.delete(lock_key)
+        return IssueResult(True, self.cooldown)
+
+    def check(self, phone_number, auth_number):
+        raise NotImplementedError('subclasses of BaseOtpStore must override check() method')
+
+    def exists(self, phone_number):
+        raise NotImplementedError('subclasses of BaseOtpStore must override exists() method')
+
+    def get_status(self, phone_number):
+        '''
+            인증번호 발송 내역과 User 가입 상태를 한 번에 읽어서 PhoneStatus로 리턴
+        '''
+        raise NotImplementedError('subclasses of BaseOtpStore must override get_status() method')
+
+
+class DatabaseOtpStore(BaseOtpStore):
+    '''
+        sms_auth 테이블을 사용하는 기존 방식
+        인증번호 저장과 outbox 저장이 하나의 트랜잭션으로 묶여서 문자 발송이 유실되지 않음
+    '''
+
+    def issue(self, phone_number):
+        from .models import SmsAuth
+
+        return SmsAuth.objects.upsert(phone_number).auth_number
+
+    def check(self, phone_number, auth_number):
+        from .models import SmsAuth
+
+        time_limit = timezone.now() - datetime.timedelta(seconds=self.ttl)
+        return SmsAuth.objects.filter(phone_number=phone_number, auth_number=auth_number,
+                                      modified__gte=time_limit).exists()
+
+    def exists(self, phone_number):
+        from .models import SmsAuth
+
+        return SmsAuth.objects.filter(phone_number=phone_number).exists()
+
+    def get_status(self, phone_number):
+        '''
+            sms_auth 행과 같은 전화번호의 User id, 가입 상태를 서브쿼리로 붙여서 쿼리 한 번으로 조회
+            인증번호를 발송한 적 없는 번호만 User를 한 번 더 조회
+        '''
+        from .models import SmsAuth, User
+
+        user = User.objects.filter(phone_number=OuterRef('phone_number'))
+        sms_auth = (SmsAuth.objects.filter(phone_number=phone_number)
+                    .annotate(user_id=Subquery(user.values('id')[:1]),
+                              registration_state=Subquery(user.values('registration_state')[:1]))
+                    .values('auth_number', 'modified', 'user_id', 'registration_state').first())
+        if sms_auth is None:
+            return PhoneStatus(phone_number, *get_user_state(phone_number))
+        return PhoneStatus(phone_number, sms_auth['user_id'], sms_auth['registration_state'], issued=True,
+                           auth_number=sms_auth['auth_number'],
+                           expires_at=sms_auth['modified'] + datetime.timedelta(seconds=self.ttl))
+
+
+class CacheOtpStore(BaseOtpStore):
+    '''
+        Django 캐시를 사용하는 저장소
+        전화번호마다 키 하나에 인증번호를 저장하고 캐시의 TTL로 만료시키기 때문에
+        유효시간 확인 쿼리가 필요 없고, 확인은 GET 한 번으로 끝남
+        만료되지 않는 키는 저장하지 않음, 발송 내역은 유효시간 안의 인증번호가 있거나
+        인증번호 확인을 마친 User(DB)가 있는지로 판단(캐시에서 키가 지워져도 가입, 비밀번호 찾기에 영향 없음)
+        여러 프로세스에서 같이 사용하려면 CACHES에 Redis, Memcached 같은 공유 캐시를 설정해야 함
+    '''
+
+    def get_key(self, phone_number):
+        return f'{self.prefix}:{phone_number}'
+
+    def issue(self, phone_number):
+        from .models import SmsAuth
+        from .sms import SmsMessage
+        from .sms.dispatcher import get_dispatcher
+
+        auth_number = SmsAuth.make_auth_number()
+        # 새 인증번호로 덮어쓰면서 TTL도 다시 시작
+        self.cache.set(self.get_key(phone_number), auth_number, self.ttl)
+        # 저장하지 않은 SmsAuth로 문자 내용만 만들기(SQL 사용 x)
+        content = SmsAuth(phone_number=phone_number, auth_number=auth_number).get_message()
+        future = get_dispatcher().submit(SmsMessage(phone_number, content))
+        future.add_done_callback(log_send_error)
+        return auth_number
+
+    def check(self, phone_number, auth_number):
+        # 저장된 값과 한 번의 GET으로 비교하기 때문에 확인 도중 값이 바뀌는 경우가 없음
+        stored = self.cache.get(self.get_key(phone_number))
+        return stored is not None and stored == auth_number
+
+    def exists(self, phone_number):
+        if self.cache.get(self.get_key(phone_number)) is not None:
+            return True
+        return is_verified_state(get_user_state(phone_number)[1])
+
+    def get_status(self, phone_number):
+        '''
+            인증번호는 캐시에서 읽고 User는 쿼리 한 번으로 조회
+        '''
+        auth_number = self.cache.get(self.get_key(phone_number))
+        user_id, registration_state = get_user_state(phone_number)
+        return PhoneStatus(phone_number, user_id, registration_state,
+                           issued=auth_number is not None or is_verified_state(registration_state),
+                           auth_number=auth_number)
+
+
+class PhoneStatus:
+    '''
+        전화번호 하나의 인증번호 발송 내역과 User 가입 상태
+        serializer와 view가 같은 결과를 사용해서 같은 조회를 반복하지 않도록 함
+    '''
+
+    def __init__(self, phone_number, user_id=None, registration_state=None, issued=False, auth_number=None,
+                 expires_at=None):
+        self.phone_number = phone_number
+        self.user_id = user_id
+        self.registration_state = registration_state
+        self.issued = issued
+        self.auth_number = auth_number
+        # None이면 저장소(캐시 TTL)에서 이미 만료를 처리한 경우
+        self.expires_at = expires_at
+
+    @property
+    def has_user(self):
+        return self.user_id is not None
+
+    @property
+    def is_registered(self):
+        from .models import User
+
+        return self.registration_state == User.STATE_REGISTERED
+
+    def check(self, auth_number):
+        '''
+            유효시간 안의 인증번호와 같은지 확인(쿼리 x)
+        '''
+        if not self.issued or self.auth_number is None or self.auth_number != auth_number:
+            return False
+        return self.expires_at is None or timezone.now() < self.expires_at
+
+
+class PhoneStatusResolver:
+    '''
+        요청 하나 동안 전화번호별 PhoneStatus를 한 번만 읽어서 재사용
+        view에서 만들어 serializer context(phone_status)로 넘김
+    '''
+
+    def __init__(self, store=None):
+        self.store = store or get_otp_store()
+        self._statuses = {}
+
+    def get(self, phone_number):
+        if phone_number not in self._statuses:
+            self._statuses[phone_number] = self.store.get_status(phone_number)
+        return self._statuses[phone_number]
+
+
+def get_phone_status(context, phone_number):
+    '''
+        serializer context에 PhoneStatusResolver가 있으면 사용하고 없으면 바로 조회
+    '''
+    resolver = (context or {}).get('phone_status')
+    if resolver is None:
+        return get_otp_store().get_status(phone_number)
+    return resolver.get(phone_number)
+
+
+def get_user_state(phone_number):
+    from .models import User
+
+    user = User.objects.filter(phone_number=phone_number).values_list('id', 'registration_state').first()
+    return user or (None, None)
+
+
+def is_verified_state(registration_state):
+    # 인증번호 확인을 마친 User가 있으면 인증번호를 발송한 적이 있는 번호
+    from .models import User
+
+    return registration_state in (User.STATE_VERIFIED, User.STATE_REGISTERED)
+
+
+def log_send_error(future):
+    if future.exception() is not None:
+        logger.warning('인증번호 문자 발송 실패: %s', future.exception())
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_otp_store():
+    '''
+        settings.OTP['STORE']에 지정한 저장소를 처음 사용할 때 만들어서 재사용
+    '''
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(otp_setting('STORE'))()
+    return _store
+
+
+@receiver(setting_changed)
+def reset_store(*, setting, **kwargs):
+    global _store
+    if setting in ('OTP', 'CACHES'):
+        _store = None
@@ -0,0 +1,36 @@
+'''
+    orjson으로 요청 본문을 읽는 Parser
+
+    사용하려면 REST_FRAMEWORK['DEFAULT_PARSER_CLASSES']에 'accounts.parsers.OrjsonParser' 지정
+    View는 request.data로 본문을 읽기 때문에 요청 수 제한(throttle)과 View가 파싱 결과를 같이 사용
+'''
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import OrjsonRenderer, orjson, require_orjson
+
+
+class OrjsonParser(JSONParser):
+    '''
+        JSONParser와 같은 media type, 같은 에러(ParseError, 400)로 orjson을 사용하는 Parser
+        orjson은 UTF-8만 읽기 때문에 다른 charset은 먼저 디코딩
+        NaN, Infinity는 orjson이 허용하지 않아서 STRICT_JSON과 같이 에러
+    '''
+    renderer_class = OrjsonRenderer
+
+    def __init__(self):
+        require_orjson(type(self).__name__)
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            # orjson.JSONDecodeError, UnicodeDecodeError 모두 ValueError
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,181 @@
+'''
+    전화번호 정규화
+
+    사용자가 입력한 전화번호(010-1234-5678, 010 1234 5678, +82 10-1234-5678 등)를
+    구분자 없는 숫자(01012345678)로 바꿔서 저장, 조회, 요청 수 제한이 모두 같은 값을 사용하도록 함
+    정규화한 값은 기존 형식(^010?[0-9]\d{3}?\d{4}$)과 같은 범위만 허용
+    (010으로 시작하는 11자리, 01X로 시작하는 예전 10자리 번호)
+
+    - normalize_phone_number(): 한 개 정규화(형식이 틀리면 None)
+    - normalize_phone_numbers(): 가져오기(import) 등에서 여러 개를 한 번에 정규화, (정규화한 값, 유효 여부) 리턴
+      list는 list로, NumPy 배열은 NumPy 연산으로 한 번에 처리해서 배열로 리턴
+    - PhoneNumberField: 저장, 조회 전에 정규화하는 모델 필드
+    - PhoneNumberSerializerField: 입력을 정규화해서 validated_data로 넘기는 serializer 필드
+'''
+import re
+
+from django.core.validators import RegexValidator
+from django.db import models
+from django.utils.deconstruct import deconstructible
+from rest_framework import serializers
+
+try:
+    import numpy as np
+except ImportError:
+    # normalize_phone_numbers()에 NumPy 배열을 넘길 때만 필요
+    np = None
+
+# 정규화한 전화번호 형식(ASCII 숫자만)
+PHONE_NUMBER_REGEX = r'^010?[0-9]{8}\Z'
+PHONE_NUMBER_RE = re.compile(PHONE_NUMBER_REGEX)
+# 정규화한 전화번호 최대 길이
+MAX_LENGTH = 11
+# serializer에서 받는 구분자를 포함한 입력 최대 길이(+82 10-1234-5678 등)
+MAX_INPUT_LENGTH = 20
+# 입력에서 지우는 구분자
+SEPARATORS = ' \t\r\n-.()'
+COUNTRY_CODE = '+82'
+INVALID_MESSAGE = '전화번호 형식이 잘못되었습니다.'
+
+_DELETE_SEPARATORS = str.maketrans('', '', SEPARATORS)
+# 여러 값을 이어 붙여서 구분자를 한 번에 지울 때 값 사이에 넣는 문자(입력에 거의 없는 제어 문자)
+_JOIN = '\x1f'
+
+
+def _canonicalize(number):
+    '''
+        구분자를 지운 번호에서 국가 번호(+82)를 0으로 바꾸고 형식 확인, 형식이 틀리면 None
+    '''
+    if number.startswith(COUNTRY_CODE):
+        number = number[len(COUNTRY_CODE):]
+        if not number.startswith('0'):
+            number = '0' + number
+    return number if PHONE_NUMBER_RE.match(number) else None
+
+
+def normalize_phone_number(value):
+    '''
+        구분자를 지우고 국가 번호(+82)를 0으로 바꾼 전화번호, 형식이 틀리면 None
+    '''
+    if not isinstance(value, str):
+        return None
+    return _canonicalize(value.translate(_DELETE_SEPARATORS))
+
+
+def normalize_phone_numbers(values):
+    '''
+        여러 전화번호를 한 번에 정규화해서 (정규화한 값, 유효 여부) 리턴
+        - list 등: (list, list), 형식이 틀린 값은 None
+        - NumPy 배열: ('<U11' 배열, bool 배열), 형식이 틀린 값은 빈 문자열
+        구분자는 값마다 지우지 않고 전체를 이어 붙인 문자열에서 한 번에 지우기
+    '''
+    if np is not None and isinstance(values, np.ndarray):
+        return _normalize_array(values)
+    match = PHONE_NUMBER_RE.match
+    # 대부분은 구분자만 지우면 형식에 맞기 때문에 +로 시작하는 값만 국가 번호 처리
+    numbers = [number if match(number) else _canonicalize(number) if number[:1] == '+' else None
+               for number in _strip_separators(values)]
+    return numbers, [number is not None for number in numbers]
+
+
+def _strip_separators(values):
+    '''
+        구분자를 지운 문자열 list, 문자열이 아닌 값은 빈 문자열(형식 오류)
+    '''
+    values = list(values)
+    try:
+        joined = _JOIN.join(values)
+    except TypeError:
+        values = [value if isinstance(value, str) else '' for value in values]
+        joined = _JOIN.join(values)
+    numbers = joined.translate(_DELETE_SEPARATORS).split(_JOIN)
+    if len(numbers) != len(values):
+        # 값 안에 _JOIN 문자가 있거나 값이 없는 경우
+        numbers = [value.translate(_DELETE_SEPARATORS) for value in values]
+    return numbers
+
+
+def _normalize_array(values):
+    '''
+        구분자를 지운 번호를 문자 코드 행렬(행: 전화번호, 열: 문자)로 바꿔서 한 번에 확인
+        1. 맨 앞의 +82는 지우고 다음 숫자가 0이 아니면 0을 붙이기(첫 자리를 0으로 바꾸고 한 칸만 밀기)
+        2. 앞에서부터 11자리를 잘라서 01X, 길이(10, 11자리), 숫자만 있는지 확인
+    '''
+    shape = values.shape
+    stripped = np.array(_strip_separators(values.astype(str, copy=False).reshape(-1).tolist()), dtype=str)
+    width = stripped.dtype.itemsize // 4
+    if not width:
+        return np.zeros(shape, dtype=f'<U{MAX_LENGTH}'), np.zeros(shape, dtype=bool)
+    codes = stripped.view(np.uint32).reshape(-1, width)
+    length = np.count_nonzero(codes, axis=1)
+    # 국가 번호(최대 3자리) + 11자리만 확인하면 되기 때문에 앞부분만 사용(짧으면 뒤를 0으로 채우기)
+    head = np.zeros((len(codes), len(COUNTRY_CODE) + MAX_LENGTH), dtype=np.uint32)
+    head[:, :min(width, head.shape[1])] = codes[:, :head.shape[1]]
+    codes = head
+
+    plus = codes[:, 0] == ord('+')
+    country = plus & (codes[:, 1] == ord('8')) & (codes[:, 2] == ord('2'))
+    add_zero = country & (codes[:, 3] != ord('0'))
+    shift = np.where(country, np.where(add_zero, 2, 3), 0)
+    numbers = np.take_along_axis(codes, np.arange(MAX_LENGTH) + shift[:, None], axis=1)
+    numbers[add_zero, 0] = ord('0')
+    length -= shift
+
+    digits = ((numbers >= ord('0')) & (numbers <= ord('9'))) | (np.arange(MAX_LENGTH) >= length[:, None])
+    valid = ((plus == country) & ((length == MAX_LENGTH) | (length == MAX_LENGTH - 1)) & digits.all(axis=1)
+             & (numbers[:, 0] == ord('0')) & (numbers[:, 1] == ord('1'))
+             & ((length == MAX_LENGTH - 1) | (numbers[:, 2] == ord('0'))))
+    numbers[~valid] = 0
+    return numbers.view(f'<U{MAX_LENGTH}').reshape(shape), valid.reshape(shape)
+
+
+@deconstructible
+class PhoneNumberValidator(RegexValidator):
+    '''
+        정규화한 전화번호 형식인지 확인
+    '''
+    regex = PHONE_NUMBER_REGEX
+    message = INVALID_MESSAGE
+
+
+class PhoneNumberField(models.CharField):
+    '''
+        정규화한 전화번호를 저장하는 CharField
+        저장(pre_save), 조회(get_prep_value), full_clean(to_python) 전에 정규화해서
+        010-1234-5678로 저장하거나 조회해도 01012345678과 같은 행(인덱스)을 사용
+        정규화할 수 없는 값은 그대로 두고 validator에서 에러
+    '''
+    default_validators = [PhoneNumberValidator()]
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', MAX_LENGTH)
+        super().__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        return normalize_phone_number(value) or value
+
+    def pre_save(self, model_instance, add):
+        value = self.to_python(super().pre_save(model_instance, add))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+class PhoneNumberSerializerField(serializers.CharField):
+    '''
+        입력한 전화번호를 정규화해서 리턴, 형식이 틀리면 '전화번호 형식이 잘못되었습니다.'
+    '''
+    default_error_messages = {
+        'invalid': INVALID_MESSAGE,
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', MAX_LENGTH)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        phone_number = normalize_phone_number(value) if len(value) <= MAX_INPUT_LENGTH else None
+        if phone_number is None:
+            self.fail('invalid')
+        return phone_number
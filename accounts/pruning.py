@@ -0,0 +1,241 @@
+'''
+    만료된 행 정리(pruning)
+
+    - outstanding_token : 만료(expires_at)된 OutstandingToken과 그 토큰의 BlacklistedToken
+    - sms_auth : 유효시간(OTP['TTL'])이 지난 인증번호 중 같은 전화번호의 User가 없는 행
+      (User가 있는 번호의 sms_auth 행은 인증번호 발송 내역으로 회원가입, 비밀번호 찾기에서 사용하기 때문에 유지)
+
+    한 번의 DELETE로 지우면 지우는 동안 테이블 잠금이 길어지기 때문에
+    기본 키 순서로 BATCH_SIZE개씩 범위를 나눠서 범위마다 짧은 트랜잭션으로 삭제
+    범위마다 진행 위치(PruneCursor)를 저장해서 중간에 멈춰도 다음 실행에서 이어서 진행하고
+    끝까지 진행하면 위치를 지워서 다음 실행은 처음부터 진행
+
+    실행 : python manage.py prune_expired
+    PRUNING['SCHEDULER']를 켜면 프로세스 안에서 INTERVAL초마다 실행
+'''
+import datetime
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .models import PruneCursor, SmsAuth, User
+from .otp import otp_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    'SLEEP': 0.005,
+    'INTERVAL': 3600,
+    'SCHEDULER': False,
+}
+
+
+def pruning_setting(name):
+    return getattr(settings, 'PRUNING', {}).get(name, DEFAULTS[name])
+
+
+class PruneTarget:
+    '''
+        정리 대상의 기본 클래스
+        get_expired() : 범위(queryset) 안에서 지울 행
+        delete() : 지울 행을 삭제하고 {모델 label: 삭제한 행 수} 리턴
+    '''
+    name = None
+    model = None
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_expired(self, queryset, now):
+        raise NotImplementedError('subclasses of PruneTarget must override get_expired() method')
+
+    def delete(self, queryset):
+        return queryset.delete()[1]
+
+
+class OutstandingTokenTarget(PruneTarget):
+    name = 'outstanding_token'
+    model = OutstandingToken
+
+    def get_expired(self, queryset, now):
+        return queryset.filter(expires_at__lt=now)
+
+    def delete(self, queryset):
+        # BlacklistedToken을 먼저 지우면 OutstandingToken은 CASCADE 대상이 없어서
+        # 행마다 관계를 확인하는 Collector(queryset.delete()) 대신 기본 키 목록으로 DELETE 문만 실행
+        # (SQLite는 읽기로 시작한 트랜잭션이 쓰기로 바뀔 때 잠금을 기다리지 않고 실패하기 때문에 DELETE를 먼저 실행)
+        blacklisted = BlacklistedToken.objects.filter(token__in=queryset).delete()[0]
+        # 기본 키는 범위 하나(BATCH_SIZE) 안에서만 읽고 DB의 파라미터 수 제한에 맞춰 나눠서 삭제
+        ids = list(queryset.values_list('pk', flat=True))
+        connection = connections[queryset.db]
+        size = connection.features.max_query_params or len(ids) or 1
+        opts = OutstandingToken._meta
+        qn = connection.ops.quote_name
+        outstanding = 0
+        with connection.cursor() as cursor:
+            for offset in range(0, len(ids), size):
+                chunk = ids[offset:offset + size]
+                cursor.execute(f'DELETE FROM {qn(opts.db_table)} WHERE {qn(opts.pk.column)} IN '
+                               f'({", ".join(["%s"] * len(chunk))})', chunk)
+                outstanding += cursor.rowcount
+        return {BlacklistedToken._meta.label: blacklisted, OutstandingToken._meta.label: outstanding}
+
+
+class SmsAuthTarget(PruneTarget):
+    name = 'sms_auth'
+    model = SmsAuth
+
+    def get_expired(self, queryset, now):
+        time_limit = now - datetime.timedelta(seconds=otp_setting('TTL'))
+        user = User.objects.filter(phone_number=OuterRef('pk'))
+        return queryset.filter(modified__lt=time_limit).filter(~Exists(user))
+
+
+TARGETS = [OutstandingTokenTarget, SmsAuthTarget]
+TARGET_NAMES = [target.name for target in TARGETS]
+
+
+def prune_range(target, start, batch_size, now):
+    '''
+        기본 키가 (start, 다음 batch_size번째 키] 범위인 행 중 만료된 행 삭제
+        (범위의 마지막 기본 키, {모델 label: 삭제한 행 수}) 리턴, 테이블 끝까지 진행했으면 기본 키는 None
+    '''
+    queryset = target.get_queryset()
+    if start is not None:
+        queryset = queryset.filter(pk__gt=start)
+    # 범위의 끝은 기본 키 인덱스만 읽어서 찾기
+    end = list(queryset.order_by('pk').values_list('pk', flat=True)[batch_size - 1:batch_size])
+    end = end[0] if end else None
+    if end is not None:
+        queryset = queryset.filter(pk__lte=end)
+    with transaction.atomic(using=queryset.db):
+        deleted = target.delete(target.get_expired(queryset, now))
+    return end, deleted
+
+
+class Pruner:
+    '''
+        정리 대상을 순서대로 범위마다 삭제하고 대상별 결과(삭제한 행 수, 초당 삭제 수 등) 리턴
+        max_batches, max_seconds, stop_event로 중간에 멈추면 진행 위치가 남아서 다음 실행에서 이어서 진행
+    '''
+
+    def __init__(self, targets=None, batch_size=None, sleep=None):
+        names = targets or TARGET_NAMES
+        self.targets = [target() for target in TARGETS if target.name in names]
+        self.batch_size = batch_size or pruning_setting('BATCH_SIZE')
+        self.sleep = pruning_setting('SLEEP') if sleep is None else sleep
+
+    def run(self, max_batches=None, max_seconds=None, stop_event=None, reset=False):
+        if reset:
+            PruneCursor.objects.filter(name__in=[target.name for target in self.targets]).delete()
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.remaining = max_batches
+        results = []
+        for target in self.targets:
+            result = self.prune(target, deadline, stop_event)
+            results.append(result)
+            if not result['complete']:
+                break
+        return results
+
+    def should_stop(self, deadline, stop_event):
+        return ((self.remaining is not None and self.remaining <= 0)
+                or (deadline is not None and time.monotonic() >= deadline)
+                or (stop_event is not None and stop_event.is_set()))
+
+    def prune(self, target, deadline, stop_event):
+        cursor = PruneCursor.objects.filter(name=target.name).first()
+        start = target.model._meta.pk.to_python(cursor.position) if cursor else None
+        resumed_from = start
+        now = timezone.now()
+        deleted, batches, max_batch = {}, 0, 0
+        complete = False
+        started = time.perf_counter()
+        while not self.should_stop(deadline, stop_event):
+            batch_started = time.perf_counter()
+            start, counts = prune_range(target, start, self.batch_size, now)
+            max_batch = max(max_batch, time.perf_counter() - batch_started)
+            batches += 1
+            if self.remaining is not None:
+                self.remaining -= 1
+            for label, count in counts.items():
+                deleted[label] = deleted.get(label, 0) + count
+            if start is None:
+                complete = True
+                PruneCursor.objects.filter(name=target.name).delete()
+                break
+            self.save_position(target, start)
+            if self.sleep:
+                time.sleep(self.sleep)
+        seconds = time.perf_counter() - started
+        rows = sum(deleted.values())
+        return {
+            'target': target.name,
+            'complete': complete,
+            'resumed_from': resumed_from,
+            'rows': rows,
+            'deleted': deleted,
+            'batches': batches,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+            'max_batch_ms': round(max_batch * 1000, 2),
+        }
+
+    @staticmethod
+    def save_position(target, position):
+        # update_or_create()는 SELECT 후 쓰는 트랜잭션이라 SQLite에서 다른 쓰기와 겹치면 기다리지 않고 잠금 에러가 나서
+        # 자동 커밋되는 UPDATE, 없으면 INSERT로 저장
+        cursors = PruneCursor.objects.filter(name=target.name)
+        if not cursors.update(position=str(position), modified=timezone.now()):
+            PruneCursor.objects.create(name=target.name, position=str(position))
+
+
+class PruningScheduler(threading.Thread):
+    '''
+        프로세스 안에서 INTERVAL초마다 Pruner 실행(cron 등 따로 실행할 수 없는 환경용)
+    '''
+
+    def __init__(self, interval=None):
+        super().__init__(name='pruning-scheduler', daemon=True)
+        self.interval = interval or pruning_setting('INTERVAL')
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                for result in Pruner().run(stop_event=self.stop_event):
+                    logger.info('만료된 행 정리(%s): %s건, %s건/초', result['target'], result['rows'],
+                                result['rows_per_second'])
+            except Exception:
+                logger.exception('만료된 행 정리 실패')
+            finally:
+                close_old_connections()
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    '''
+        PRUNING['SCHEDULER']가 켜져 있으면 프로세스마다 한 번만 스케줄러 시작
+    '''
+    global _scheduler
+    if not pruning_setting('SCHEDULER'):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PruningScheduler()
+            _scheduler.start()
+    return _scheduler
@@ -0,0 +1,47 @@
+'''
+    orjson으로 JSON 응답을 만드는 Renderer
+
+    DRF JSONRenderer는 json 모듈로 문자열을 만든 뒤 다시 bytes로 인코딩하지만
+    orjson은 바로 UTF-8 bytes를 만들기 때문에 응답마다 드는 직렬화 비용이 줄어듦
+    사용하려면 REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']에 'accounts.renderers.OrjsonRenderer' 지정
+'''
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    # OrjsonParser, OrjsonRenderer를 사용할 때만 필요
+    orjson = None
+
+
+def require_orjson(name):
+    if orjson is None:
+        raise ImportError(f"{name}를 사용하려면 orjson을 설치해주세요.")
+
+
+class OrjsonRenderer(JSONRenderer):
+    '''
+        JSONRenderer와 같은 결과(한글 그대로, 공백 없음)를 orjson으로 만드는 Renderer
+        - datetime, Decimal, 지연 번역 문자열(ugettext_lazy) 등 orjson이 모르는 타입은
+          DRF JSONEncoder로 변환해서 날짜 형식도 JSONRenderer와 같게 유지
+        - indent를 요청한 경우(?format=json; indent=4 등)는 JSONRenderer 사용
+    '''
+
+    def __init__(self):
+        require_orjson(type(self).__name__)
+        self.default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.default,
+                           option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                           | orjson.OPT_NON_STR_KEYS)
+        # JSONRenderer처럼 \u2028, \u2029는 JavaScript에서도 읽을 수 있도록 이스케이프
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
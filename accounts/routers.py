@@ -0,0 +1,95 @@
+'''
+    읽기 전용 replica DB 라우팅(DATABASE_ROUTERS)
+
+    - 쓰기와 대부분의 조회는 default(primary)로 보내고
+      read_from_replica() 안의 조회만 DATABASE_REPLICAS['ALIASES'] 중 하나로 보냄
+      (가입 / 인증번호 확인 serializer의 validate_* 존재 여부 확인, 토큰 검증, 내 정보 보기)
+    - 전화번호나 User에 쓰기를 하면 PIN_SECONDS 동안 그 전화번호, User의 조회를 primary로 고정(pin)
+      인증번호 저장(sms/send) 직후의 인증번호 확인(sms/confirm)처럼 방금 쓴 값을 읽는 요청이
+      복제가 늦은 replica를 읽지 않도록 함(여러 워커가 같이 보도록 CACHE_ALIAS 캐시에 저장)
+    - 트랜잭션 안의 조회는 항상 primary
+    - ALIASES가 비어 있으면 모든 조회를 default로 보내고 pin도 저장하지 않음
+'''
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULTS = {
+    'ALIASES': [],
+    'PIN_SECONDS': 10,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'db-pin',
+}
+
+# 현재 컨텍스트(스레드, 코루틴)에서 조회를 보낼 replica 별칭
+_replica_alias = contextvars.ContextVar('replica_alias', default=None)
+
+
+def replica_setting(name):
+    return getattr(settings, 'DATABASE_REPLICAS', {}).get(name, DEFAULTS[name])
+
+
+def get_pin_keys(phone_number=None, user_id=None):
+    prefix = replica_setting('KEY_PREFIX')
+    keys = []
+    if phone_number:
+        keys.append(f'{prefix}:phone:{phone_number}')
+    if user_id is not None:
+        keys.append(f'{prefix}:user:{user_id}')
+    return keys
+
+
+def pin_primary(phone_number=None, user_id=None):
+    '''
+        쓰기를 한 전화번호, User의 조회를 PIN_SECONDS 동안 primary로 고정
+    '''
+    keys = get_pin_keys(phone_number, user_id)
+    if not keys or not replica_setting('ALIASES'):
+        return
+    caches[replica_setting('CACHE_ALIAS')].set_many(dict.fromkeys(keys, 1), replica_setting('PIN_SECONDS'))
+
+
+def is_pinned(phone_number=None, user_id=None):
+    keys = get_pin_keys(phone_number, user_id)
+    return bool(keys) and bool(caches[replica_setting('CACHE_ALIAS')].get_many(keys))
+
+
+@contextmanager
+def read_from_replica(phone_number=None, user_id=None):
+    '''
+        with 안의 조회를 replica로 보내고 사용한 별칭을 리턴(primary를 사용하면 None)
+        phone_number, user_id : 조회하는 전화번호, User(최근에 쓰기를 했으면 primary 사용)
+    '''
+    aliases = replica_setting('ALIASES')
+    if not aliases or _replica_alias.get() is not None or is_pinned(phone_number, user_id):
+        yield _replica_alias.get()
+        return
+    token = _replica_alias.set(random.choice(aliases))
+    try:
+        yield _replica_alias.get()
+    finally:
+        _replica_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    '''
+        read_from_replica() 안의 조회만 replica로 보내는 라우터
+        replica에서 읽은 객체도 저장은 primary로 보내도록 쓰기는 항상 default를 리턴
+    '''
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 primary의 복제본이기 때문에 어느 DB에서 읽은 객체끼리도 관계 허용
+        return True
@@ -2,4 +2,6 @@ from .signup import CustomRegisterSerializer
 from .retrieve import UserSerializer
 from .sms_send import SMSSendSerializer, SmsConfirmSerializer
 from .password import CustomPasswordChangeSerializer, PasswordSmsConfirmSerializer, CustomPasswordChangeFieldsSerializer
-from .login import CustomTokenObtainPairSerializer
+from .login import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer, CachedTokenVerifySerializer
+from .user_import import ImportUserSerializer
+from .campaign import SmsCampaignSerializer
@@ -0,0 +1,35 @@
+from rest_framework import serializers
+from ..models import SmsCampaign, User
+from django.utils.translation import ugettext_lazy as _
+
+
+class CampaignFilterSerializer(serializers.Serializer):
+    '''
+        공지 문자 수신자 조건, 여기에 있는 조건만 User.objects.filter()에 사용
+    '''
+    registration_state = serializers.ChoiceField(choices=User.STATE_CHOICES, required=False)
+    is_active = serializers.BooleanField(required=False)
+    date_joined__gte = serializers.DateTimeField(required=False)
+    date_joined__lt = serializers.DateTimeField(required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = sorted(set(data) - set(self.fields))
+            if unknown:
+                raise serializers.ValidationError({name: [_('지원하지 않는 조건입니다.')] for name in unknown})
+        return super().to_internal_value(data)
+
+
+class SmsCampaignSerializer(serializers.ModelSerializer):
+    filters = CampaignFilterSerializer(required=False)
+    content = serializers.CharField(max_length=2000)
+
+    class Meta:
+        model = SmsCampaign
+        fields = ['id', 'content', 'filters', 'status', 'total', 'sent', 'failed', 'created', 'finished_at']
+        read_only_fields = ['status', 'total', 'sent', 'failed', 'created', 'finished_at']
+
+    def create(self, validated_data):
+        # JSONField에 저장할 수 있도록 datetime은 문자열(ISO 8601)로 저장
+        validated_data['filters'] = dict(CampaignFilterSerializer(validated_data.get('filters', {})).data)
+        return super().create(validated_data)
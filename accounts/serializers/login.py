@@ -1,7 +1,15 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenVerifySerializer
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import UntypedToken
 from django.utils.translation import ugettext_lazy as _
 
+from ..routers import read_from_replica
+from ..tokens import VersionedRefreshToken, check_token_payload, check_token_version, get_verified_token_cache
+
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     '''
@@ -10,3 +18,44 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     default_error_messages = {
         "no_active_account": _("지정된 자격 증명에 해당하는 활성화된 사용자를 찾을 수 없습니다.")
     }
+    # OutstandingToken 행 대신 token_version claim으로 무효화를 확인하는 refresh token
+    # StatelessJWTAuthentication이 DB 조회 없이 User를 만들 수 있도록 access token에만 User 정보 claim 추가
+    token_class = VersionedRefreshToken
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    '''
+    refresh할 때 User 조회 한 번으로 토큰 버전, blacklist, is_active 확인
+    새 access token의 User 정보 claim은 조회한 User의 현재 정보로 만듦
+    '''
+    token_class = VersionedRefreshToken
+
+
+class CachedTokenVerifySerializer(TokenVerifySerializer):
+    '''
+    TokenVerifySerializer와 같은 검증(서명, 만료, blacklist)과 토큰 버전 확인을 하고
+    성공한 결과는 VerifiedTokenCache에 저장해서 같은 토큰은 토큰의 exp까지 다시 검증하지 않음
+    (토큰 버전은 캐시된 결과를 사용할 때도 확인)
+    토큰 버전, blacklist 조회는 읽기 전용 replica에서 진행(토큰의 User에 최근 쓰기가 있었으면 primary)
+    '''
+
+    def validate(self, attrs):
+        cache = get_verified_token_cache()
+        verified = cache.get(attrs['token']) if cache is not None else None
+        if verified is not None:
+            with read_from_replica(user_id=verified.user_id):
+                check_token_version(verified.user_id, verified.token_version)
+            return {}
+
+        token = UntypedToken(attrs['token'])
+        with read_from_replica(user_id=token.get(api_settings.USER_ID_CLAIM)):
+            check_token_payload(token.payload)
+            if (api_settings.BLACKLIST_AFTER_ROTATION
+                    and 'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS):
+                jti = token.get(api_settings.JTI_CLAIM)
+                if BlacklistedToken.objects.filter(token__jti=jti).exists():
+                    raise ValidationError('Token is blacklisted')
+
+        if cache is not None:
+            cache.set(attrs['token'], token)
+        return {}
@@ -1,8 +1,13 @@
 from allauth.utils import get_username_max_length
 from django.core.validators import RegexValidator
+from django.db.models import F
 from rest_auth.serializers import PasswordChangeSerializer
 from rest_framework import serializers
 from ..models import SmsAuth, User
+from ..otp import get_phone_status
+from ..phone import PhoneNumberSerializerField
+from .replica import ReplicaReadMixin
+from ..tokens import invalidate_token_version
 from django.utils.translation import ugettext_lazy as _
 
 try:
@@ -11,9 +16,8 @@ except ImportError:
     raise ImportError("allauth needs to be added to INSTALLED_APPS.")
 
 
-class PasswordSmsConfirmSerializer(serializers.ModelSerializer):
-    phone_number = serializers.CharField(max_length=11, validators=[RegexValidator(regex=r"^010?[0-9]\d{3}?\d{4}$",
-                                                                                   message='전화번호 형식이 잘못되었습니다.')])
+class PasswordSmsConfirmSerializer(ReplicaReadMixin, serializers.ModelSerializer):
+    phone_number = PhoneNumberSerializerField()
     auth_number = serializers.IntegerField(min_value=1000, max_value=9999)
 
     class Meta:
@@ -31,19 +35,20 @@ class PasswordSmsConfirmSerializer(serializers.ModelSerializer):
         가입 내역이 있는지 확인하기
         '''
         # 전화 번호 인증 확인하기
-        phone_number_obj = SmsAuth.objects.filter(phone_number=phone_number)
-        user = User.objects.filter(phone_number=phone_number)
+        # 인증번호 발송 내역과 가입 상태를 한 번에 조회(view와 같은 요청이면 context의 결과 재사용)
+        phone_status = get_phone_status(self.context, phone_number)
+        is_issued, state = phone_status.issued, phone_status.registration_state
         # 전화 번호 인증하지 않았을 경우
         # 인증을 하지 않았다면 가입한 적도 없었으니 비밀번호를 찾을 수 없음
-        if not phone_number_obj.exists():
+        if not is_issued:
             raise serializers.ValidationError(_("가입한 회원이 아닙니다."))
         else:
-            if not user.exists() or (user.exists() and len(user[0].email) == 0):
+            if state != User.STATE_REGISTERED:
                 # 1. 인증번호 확인 과정을 거치지 않았거나
                 # 2. 인증과정은 거쳤지만 가입하지 않은 경우
                 # 가입 내역이 없기 때문에 비밀번호 찾기 불가
                 raise serializers.ValidationError(_("가입한 회원이 아닙니다."))
-            elif user.exists() and len(user[0].email) > 0:
+            else:
                 # 회원이기 때문에 phone_number 리턴
                 return phone_number
 
@@ -65,8 +70,9 @@ class CustomPasswordChangeFieldsSerializer(serializers.Serializer):
     )
 
     def validate_username(self, username):
-        user = User.objects.filter(username=username)
-        if user.exists():
+        # User가 있는지 확인하면서 가져온 객체를 view에서 다시 조회하지 않도록 저장
+        self.user = User.objects.filter(username=username).first()
+        if self.user is not None:
             return username
         else:
             raise serializers.ValidationError(_("가입한 회원이 아닙니다."))
@@ -85,6 +91,19 @@ class CustomPasswordChangeSerializer(PasswordChangeSerializer):
         validators=[RegexValidator(regex=r"^([a-zA-Z])[a-zA-Z0-9_]*$", message='ID 형식이 잘못되었습니다.')]
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 로그인한 세션이 없기 때문에 비밀번호 변경 후 세션을 새로 만들어 갱신할 필요가 없음
+        self.logout_on_password_change = True
+
+    def save(self):
+        # 비밀번호를 저장하는 UPDATE에서 토큰 버전도 같이 올려서 이전에 발급한 토큰을 모두 무효화
+        self.user.token_version = F('token_version') + 1
+        super().save()
+        # 저장한 뒤에도 F() 식이 남아있지 않도록 저장된 버전을 다시 읽기
+        self.user.refresh_from_db(fields=['token_version'])
+        invalidate_token_version(self.user.pk)
+
     def validate_old_password(self, value):
         invalid_password_conditions = (
             self.old_password_field_enabled,
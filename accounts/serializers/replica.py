@@ -0,0 +1,18 @@
+from collections.abc import Mapping
+
+from rest_framework.fields import empty
+
+from ..phone import normalize_phone_number
+from ..routers import read_from_replica
+
+
+class ReplicaReadMixin:
+    '''
+        validate_*의 존재 여부 확인 조회(중복 확인, 가입 상태 등)를 읽기 전용 replica로 보내기
+        요청한 전화번호에 최근 쓰기(인증번호 저장, User 생성 등)가 있었으면 primary에서 조회
+    '''
+
+    def run_validation(self, data=empty):
+        phone_number = normalize_phone_number(data.get('phone_number')) if isinstance(data, Mapping) else None
+        with read_from_replica(phone_number=phone_number):
+            return super().run_validation(data)
@@ -7,8 +7,10 @@ from django.db import transaction
 from rest_framework import serializers
 from rest_auth.registration.serializers import RegisterSerializer
 from accounts.models import SmsAuth, User
+from accounts.otp import get_phone_status
+from accounts.phone import PhoneNumberSerializerField
+from accounts.serializers.replica import ReplicaReadMixin
 from django.utils.translation import ugettext_lazy as _
-from rest_framework_simplejwt.models import TokenUser
 
 try:
     from allauth.account import app_settings as allauth_settings
@@ -17,7 +19,7 @@ except ImportError:
 
 
 # rest-auth에서 기본적으로 제공하는 RegisterSerializer 커스텀 하여 재사용
-class CustomRegisterSerializer(RegisterSerializer):
+class CustomRegisterSerializer(ReplicaReadMixin, RegisterSerializer):
     # 필요한 필드 다시 적기
     username = serializers.CharField(
         max_length=get_username_max_length(),
@@ -27,9 +29,7 @@ class CustomRegisterSerializer(RegisterSerializer):
     )
     nickname = serializers.CharField(max_length=20, validators=[
         RegexValidator(regex=r"[^ㄱ-ㅣ]$", message='닉네임 형식이 잘못되었습니다.')])
-    phone_number = serializers.CharField(max_length=11,
-                                         validators=[RegexValidator(regex=r"^010?[0-9]\d{3}?\d{4}$",
-                                                                    message='전화번호 형식이 잘못되었습니다.')])
+    phone_number = PhoneNumberSerializerField()
     name = serializers.CharField(max_length=50,
                                  validators=[RegexValidator(regex=r"^[a-zA-Z|가-힣]*$", message='이름 형식이 잘못되었습니다.')])
     email = serializers.EmailField(required=True)
@@ -54,21 +54,20 @@ class CustomRegisterSerializer(RegisterSerializer):
             혹시 모를 경우를 대비해 다시 한 번 전화번호 확인
         '''
         # 전화 번호 인증 확인하기
-        phone_number_obj = SmsAuth.objects.filter(phone_number=phone_number)
-        user = User.objects.filter(phone_number=phone_number)
+        # 인증번호 발송 내역과 가입 상태를 한 번에 조회(view와 같은 요청이면 context의 결과 재사용)
+        phone_status = get_phone_status(self.context, phone_number)
+        is_issued, state = phone_status.issued, phone_status.registration_state
         # 1. 전화 번호 인증을 진행하지 않았을 경우
         # 2. 전화번호 인증만 진행한 경우(인증번호 확인 작업 x)
-        if not phone_number_obj.exists() or not user.exists():
+        if not is_issued or state is None or state == User.STATE_PENDING_VERIFICATION:
             raise serializers.ValidationError(_("전화번호 인증 후 회원가입을 진행해주세요."))
-        elif phone_number_obj.exists() and user.exists():
-            # 전화번호 인증과 인증번호 확인 까지 완료
-            if len(user[0].email) > 0:
-                # 이미 회원인데 다시 가입하려는 경우
-                raise serializers.ValidationError(_("가입내역이 있습니다. 로그인을 진행해주세요."))
-            else:
-                # email의 길이가 0보다 크지 않다는건 
-                # 회원가입을 진행하지 않았다는 뜻이기에 phone_number 리턴
-                return phone_number
+        elif state == User.STATE_REGISTERED:
+            # 이미 회원인데 다시 가입하려는 경우
+            raise serializers.ValidationError(_("가입내역이 있습니다. 로그인을 진행해주세요."))
+        else:
+            # 전화번호 인증과 인증번호 확인 까지 완료했지만
+            # 회원가입을 진행하지 않았기 때문에 phone_number 리턴
+            return phone_number
 
     # 추가된 필드를 다시 저장해줘야 해서 재정의하기
     def get_cleaned_data(self):
@@ -100,5 +99,6 @@ class CustomRegisterSerializer(RegisterSerializer):
         user.nickname = data.get('nickname')
         user.phone_number = phone_number
         user.name = data.get('name')
+        user.registration_state = User.STATE_REGISTERED
         user.save()
         return user
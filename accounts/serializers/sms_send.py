@@ -1,22 +1,22 @@
-from django.core.validators import RegexValidator
 from rest_framework import serializers
 from ..models import SmsAuth, User
+from ..otp import get_phone_status
+from ..phone import PhoneNumberSerializerField
+from .replica import ReplicaReadMixin
 from django.utils.translation import ugettext_lazy as _
 
 
 # 전화번호 형식 확인하기
 class SMSSendSerializer(serializers.ModelSerializer):
-    phone_number = serializers.CharField(max_length=11, validators=[
-        RegexValidator(regex=r"^010?[0-9]\d{3}?\d{4}$", message='전화번호 형식이 잘못되었습니다.')])
+    phone_number = PhoneNumberSerializerField()
 
     class Meta:
         model = SmsAuth
         fields = ['phone_number']
 
 
-class SmsConfirmSerializer(serializers.ModelSerializer):
-    phone_number = serializers.CharField(max_length=11, validators=[
-        RegexValidator(regex=r"^010?[0-9]\d{3}?\d{4}$", message='전화번호 형식이 잘못되었습니다.')])
+class SmsConfirmSerializer(ReplicaReadMixin, serializers.ModelSerializer):
+    phone_number = PhoneNumberSerializerField()
     auth_number = serializers.IntegerField(min_value=1000, max_value=9999)
 
     class Meta:
@@ -34,17 +34,18 @@ class SmsConfirmSerializer(serializers.ModelSerializer):
         가입 내역이 있는지 확인하기
         '''
         # 전화 번호 인증 확인하기
-        phone_number_obj = SmsAuth.objects.filter(phone_number=phone_number)
-        user = User.objects.filter(phone_number=phone_number)
+        # 인증번호 발송 내역과 가입 상태를 한 번에 조회(view와 같은 요청이면 context의 결과 재사용)
+        phone_status = get_phone_status(self.context, phone_number)
+        is_issued, state = phone_status.issued, phone_status.registration_state
         # 전화 번호 인증하지 않았을 경우
-        if not phone_number_obj.exists():
+        if not is_issued:
             raise serializers.ValidationError(_("전화번호 인증을 진행해주세요."))
         else:
-            if not user.exists() or (user.exists() and len(user[0].email) == 0):
+            if state != User.STATE_REGISTERED:
                 # 1. 인증번호 확인 과정을 거치지 않았거나
                 # 2. 인증과정은 거쳤지만 가입하지 않은 경우
                 # phone_number 리턴
                 return phone_number
-            elif user.exists() and len(user[0].email) > 0:
+            else:
                 # 이미 회원인데 다시 가입하려는 경우
                 raise serializers.ValidationError(_("가입내역이 있습니다. 로그인을 진행해주세요."))
@@ -0,0 +1,49 @@
+from allauth.account.adapter import get_adapter
+from django.contrib.auth.hashers import identify_hasher
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import serializers
+
+from .signup import CustomRegisterSerializer
+
+
+class ImportUserSerializer(CustomRegisterSerializer):
+    '''
+        회원 가져오기(manage.py import_users)에서 한 행을 확인하는 serializer
+        필드 형식은 가입 API(CustomRegisterSerializer)와 같은 규칙을 사용하고
+        DB 조회가 필요한 중복 확인(username, email, nickname, phone_number)은
+        행마다 조회하지 않고 accounts.importing에서 배치마다 한 번에 확인
+        비밀번호는 password1(+ password2) 또는 이미 해시한 password_hash 중 하나
+    '''
+    password1 = serializers.CharField(write_only=True, required=False)
+    password2 = serializers.CharField(write_only=True, required=False)
+    password_hash = serializers.CharField(write_only=True, required=False)
+
+    def validate_username(self, username):
+        # 중복 확인(DB 조회) 없이 형식과 금지어만 확인
+        return get_adapter().clean_username(username, shallow=True)
+
+    def validate_email(self, email):
+        return get_adapter().clean_email(email)
+
+    def validate_nickname(self, nickname):
+        return nickname
+
+    def validate_phone_number(self, phone_number):
+        # 기존 시스템의 회원은 전화번호 인증(sms_auth) 내역이 없기 때문에 형식(정규화)만 확인
+        return phone_number
+
+    def validate_password_hash(self, encoded):
+        try:
+            identify_hasher(encoded)
+        except ValueError:
+            raise serializers.ValidationError(_('지원하지 않는 비밀번호 해시입니다.'))
+        return encoded
+
+    def validate(self, data):
+        if data.get('password_hash'):
+            return data
+        if not data.get('password1'):
+            raise serializers.ValidationError({'password1': [_('비밀번호 또는 password_hash가 필요합니다.')]})
+        if data['password1'] != data.get('password2', data['password1']):
+            raise serializers.ValidationError(_("The two password fields didn't match."))
+        return data
@@ -0,0 +1,40 @@
+'''
+    문자 발송 모듈
+    django.core.mail처럼 settings.SMS_BACKEND에 지정한 백엔드로 문자를 보낸다.
+
+    - accounts.sms.backends.sens.SmsBackend     : NAVER SENS로 전송(기본값)
+    - accounts.sms.backends.locmem.SmsBackend   : accounts.sms.outbox 리스트에 저장(테스트용)
+    - accounts.sms.backends.filebased.SmsBackend : SMS_FILE_PATH에 JSON Lines로 저장
+    - accounts.sms.backends.latency.SmsBackend  : SMS_LATENCY 설정만큼 지연/에러를 흉내(부하 테스트용)
+'''
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class SmsMessage:
+    '''
+        문자 한 건(수신자, 내용)
+    '''
+
+    def __init__(self, to, content):
+        self.to = to
+        self.content = content
+
+    def __eq__(self, other):
+        return isinstance(other, SmsMessage) and (self.to, self.content) == (other.to, other.content)
+
+    def __repr__(self):
+        return f'SmsMessage(to={self.to!r}, content={self.content!r})'
+
+
+def get_connection(backend=None, fail_silently=False, **kwargs):
+    klass = import_string(backend or settings.SMS_BACKEND)
+    return klass(fail_silently=fail_silently, **kwargs)
+
+
+def send_sms(to, content, fail_silently=False, connection=None):
+    '''
+        문자 한 건 전송하고 보낸 문자 수 리턴
+    '''
+    connection = connection or get_connection(fail_silently=fail_silently)
+    return connection.send_messages([SmsMessage(to, content)])
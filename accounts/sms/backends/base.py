@@ -0,0 +1,52 @@
+from asgiref.sync import sync_to_async
+
+
+class SmsSendError(Exception):
+    '''
+        문자 전송 실패
+    '''
+
+
+class BaseSmsBackend:
+    '''
+        문자 발송 백엔드의 기본 클래스
+        하위 클래스는 send_messages()를 구현해야 한다.
+    '''
+
+    def __init__(self, fail_silently=False, **kwargs):
+        self.fail_silently = fail_silently
+
+    def send_messages(self, messages):
+        '''
+            SmsMessage 리스트를 전송하고 보낸 문자 수 리턴
+            전송에 실패하면 fail_silently가 아닌 경우 예외 발생
+        '''
+        raise NotImplementedError('subclasses of BaseSmsBackend must override send_messages() method')
+
+    def send_batch(self, messages):
+        '''
+            SmsMessage 리스트를 전송하고 메시지마다 결과를 리턴
+            성공한 메시지는 None, 실패한 메시지는 발생한 예외
+            기본 구현은 한 건씩 send_messages()로 전송하고, 여러 건을 한 번에 보낼 수 있는 백엔드는 재정의
+        '''
+        results = []
+        for message in messages:
+            try:
+                sent = self.send_messages([message])
+            except Exception as e:
+                results.append(e)
+            else:
+                results.append(None if sent else SmsSendError('전송하지 못했습니다.'))
+        return results
+
+    async def asend_batch(self, messages):
+        '''
+            send_batch()의 비동기 버전
+            기본 구현은 스레드에서 send_batch()를 실행하고, 비동기 클라이언트가 있는 백엔드는 재정의
+        '''
+        return await sync_to_async(self.send_batch, thread_sensitive=False)(messages)
+
+    async def aclose(self):
+        '''
+            asend_batch()에서 사용한 비동기 자원 정리
+        '''
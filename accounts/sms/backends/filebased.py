@@ -0,0 +1,34 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .base import BaseSmsBackend
+
+_lock = threading.Lock()
+
+
+class SmsBackend(BaseSmsBackend):
+    '''
+        보낸 문자를 SMS_FILE_PATH 파일에 한 줄에 하나씩 JSON으로 저장
+        {"to": "010...", "content": "...", "sent_at": "2022-01-01T00:00:00+00:00"}
+    '''
+
+    def __init__(self, *args, file_path=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file_path = file_path or getattr(settings, 'SMS_FILE_PATH', None)
+        if not self.file_path:
+            raise ImproperlyConfigured('filebased SMS 백엔드를 사용하려면 SMS_FILE_PATH를 설정해주세요.')
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        os.makedirs(directory, exist_ok=True)
+
+    def send_messages(self, messages):
+        sent_at = timezone.now().isoformat()
+        lines = [json.dumps({'to': message.to, 'content': message.content, 'sent_at': sent_at},
+                            ensure_ascii=False) + '\n' for message in messages]
+        with _lock, open(self.file_path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+        return len(messages)
@@ -0,0 +1,60 @@
+import math
+import random
+import time
+
+from django.conf import settings
+
+from .base import BaseSmsBackend, SmsSendError
+
+DEFAULTS = {
+    'P50': 0.05,
+    'P99': 0.5,
+    'ERROR_RATE': 0.0,
+    'SEED': None,
+}
+
+# 표준정규분포의 99% 분위수
+Z_99 = 2.3263
+
+
+class SmsBackend(BaseSmsBackend):
+    '''
+        느린 문자 발송 업체를 흉내내는 백엔드(부하 테스트, 장애 재현용)
+        실제로 보내지는 않고 요청마다 SMS_LATENCY 설정에 맞춰 기다리거나 에러를 발생시킨다.
+
+        지연 시간은 P50(중앙값), P99(99% 분위수, 초)를 만족하는 로그정규분포에서 뽑고
+        ERROR_RATE 확률로 SmsSendError를 발생시킨다.
+    '''
+
+    def __init__(self, *args, p50=None, p99=None, error_rate=None, seed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        config = dict(DEFAULTS, **getattr(settings, 'SMS_LATENCY', {}))
+        self.p50 = config['P50'] if p50 is None else p50
+        self.p99 = config['P99'] if p99 is None else p99
+        self.error_rate = config['ERROR_RATE'] if error_rate is None else error_rate
+        self.random = random.Random(config['SEED'] if seed is None else seed)
+        self.mu = math.log(self.p50) if self.p50 > 0 else None
+        self.sigma = math.log(self.p99 / self.p50) / Z_99 if self.p50 > 0 and self.p99 > self.p50 else 0
+
+    def sample_delay(self):
+        if self.mu is None:
+            return 0
+        return self.random.lognormvariate(self.mu, self.sigma)
+
+    def send_messages(self, messages):
+        time.sleep(self.sample_delay())
+        if self.random.random() < self.error_rate:
+            if self.fail_silently:
+                return 0
+            raise SmsSendError('지연 시뮬레이터에서 발생시킨 전송 실패')
+        return len(messages)
+
+    def send_batch(self, messages):
+        # 여러 건을 한 번의 요청으로 보내는 업체처럼 요청 한 번만큼 지연
+        try:
+            sent = self.send_messages(messages)
+        except SmsSendError as e:
+            return [e] * len(messages)
+        if not sent:
+            return [SmsSendError('지연 시뮬레이터에서 발생시킨 전송 실패')] * len(messages)
+        return [None] * len(messages)
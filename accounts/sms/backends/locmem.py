@@ -0,0 +1,19 @@
+from ... import sms
+from .. import SmsMessage
+from .base import BaseSmsBackend
+
+
+class SmsBackend(BaseSmsBackend):
+    '''
+        보낸 문자를 accounts.sms.outbox 리스트에 저장(테스트용)
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not hasattr(sms, 'outbox'):
+            sms.outbox = []
+
+    def send_messages(self, messages):
+        for message in messages:
+            sms.outbox.append(SmsMessage(message.to, message.content))
+        return len(messages)
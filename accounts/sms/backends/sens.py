@@ -0,0 +1,79 @@
+import httpx
+import requests
+from django.conf import settings
+
+from ..client import AsyncSensClient, get_client
+from ..dispatcher import batch_setting
+from .base import BaseSmsBackend
+
+
+class SmsBackend(BaseSmsBackend):
+    '''
+        NAVER SENS로 문자 전송
+        여러 건은 SMS_BATCH['MAX_SIZE']개씩 묶어서 한 번의 요청(messages 배열)으로 전송
+    '''
+
+    def send_messages(self, messages):
+        results = self.send_batch(messages)
+        errors = [result for result in results if result is not None]
+        if errors and not self.fail_silently:
+            raise errors[0]
+        return len(results) - len(errors)
+
+    def send_batch(self, messages):
+        client = get_client()
+        size = batch_setting('MAX_SIZE')
+        results = []
+        for i in range(0, len(messages), size):
+            results.extend(self._send_chunk(client, messages[i:i + size]))
+        return results
+
+    def _send_chunk(self, client, chunk):
+        try:
+            client.send_batch(chunk)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if len(chunk) > 1 and is_recipient_error(status):
+                # 요청 형식 오류는 수신자 하나 때문에 전체가 실패할 수 있으므로
+                # 한 건씩 다시 보내서 실패한 수신자만 찾아내기
+                return [result for message in chunk for result in self._send_chunk(client, [message])]
+            return [e] * len(chunk)
+        except requests.RequestException as e:
+            return [e] * len(chunk)
+        return [None] * len(chunk)
+
+    async def asend_batch(self, messages):
+        if getattr(self, '_async_client', None) is None:
+            key = settings.NAVER_KEY
+            self._async_client = AsyncSensClient(key['ClOUD_ACCESS_KEY'], key['ClOUD_SECRET_KEY'],
+                                                 key['SMS_ACCESS_ID'], key['SMS_PHONE_NUMBER'],
+                                                 settings.SENS_API_URL)
+        size = batch_setting('MAX_SIZE')
+        results = []
+        for i in range(0, len(messages), size):
+            results.extend(await self._asend_chunk(messages[i:i + size]))
+        return results
+
+    async def _asend_chunk(self, chunk):
+        try:
+            await self._async_client.asend_batch(chunk)
+        except httpx.HTTPStatusError as e:
+            if len(chunk) > 1 and is_recipient_error(e.response.status_code):
+                results = []
+                for message in chunk:
+                    results.extend(await self._asend_chunk([message]))
+                return results
+            return [e] * len(chunk)
+        except httpx.HTTPError as e:
+            return [e] * len(chunk)
+        return [None] * len(chunk)
+
+    async def aclose(self):
+        if getattr(self, '_async_client', None) is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+def is_recipient_error(status):
+    # 인증, 요청 제한 에러가 아닌 4xx는 요청 본문(수신자) 문제로 보고 한 건씩 다시 보내기
+    return status is not None and 400 <= status < 500 and status not in (401, 403, 429)
@@ -0,0 +1,180 @@
+'''
+    조건에 맞는 회원 전체에게 공지 문자 보내기(SmsCampaign)
+
+    - 수신자는 User를 phone_number 순서로 .iterator(chunk_size=ITERATOR_CHUNK_SIZE)로 읽어서 메모리에 모두 올리지 않음
+    - CHUNK_SIZE명씩 SENS 요청 하나(messages 배열)로 묶고, CONCURRENCY개의 요청을 스레드 풀에서 동시에 전송
+    - CHUNK_SIZE * CONCURRENCY명(배치)을 보낼 때마다 마지막 전화번호(cursor)와 건수를 저장하고 선점 시간을 연장
+      워커가 죽으면 선점 시간(LEASE)이 지난 뒤 다른 워커가 cursor 다음 번호부터 이어서 전송
+      (저장하지 못한 마지막 배치는 다시 보내기 때문에 최대 한 배치만큼 중복 수신 가능)
+'''
+import datetime
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from . import SmsMessage, get_connection
+from .backends.sens import is_recipient_error
+from ..models import SmsCampaign, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CHUNK_SIZE': 100,
+    'CONCURRENCY': 4,
+    'ITERATOR_CHUNK_SIZE': 2000,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 1,
+    'LEASE': 300,
+    'POLL_INTERVAL': 5,
+}
+
+
+def campaign_setting(name):
+    return getattr(settings, 'SMS_CAMPAIGN', {}).get(name, DEFAULTS[name])
+
+
+def get_recipients(campaign, chunk_size=None):
+    '''
+        cursor 다음 전화번호부터 조건에 맞는 수신자의 전화번호를 phone_number 순서로 생성
+        phone_number unique 인덱스 순서로 읽기 때문에 정렬 없이 이어서 읽을 수 있음
+    '''
+    queryset = get_recipient_queryset(campaign.filters)
+    if campaign.cursor:
+        queryset = queryset.filter(phone_number__gt=campaign.cursor)
+    return queryset.values_list('phone_number', flat=True).iterator(
+        chunk_size=chunk_size or campaign_setting('ITERATOR_CHUNK_SIZE'))
+
+
+def get_recipient_queryset(filters):
+    return User.objects.filter(**filters).exclude(phone_number=None).order_by('phone_number')
+
+
+def claim_campaign(pk=None):
+    '''
+        전송할 캠페인 하나를 선점해서 리턴, 없으면 None
+        - 전송 대기(pending) 중인 캠페인
+        - 전송 중(sending)이지만 워커가 죽어서 선점 시간이 지난 캠페인
+        조건부 update로 선점하기 때문에 여러 워커가 동시에 돌아도 한 워커만 전송
+    '''
+    now = timezone.now()
+    ready = SmsCampaign.objects.filter(Q(status=SmsCampaign.STATUS_PENDING) |
+                                       Q(status=SmsCampaign.STATUS_SENDING, lease_until__lte=now))
+    if pk is not None:
+        ready = ready.filter(pk=pk)
+    lease = now + datetime.timedelta(seconds=campaign_setting('LEASE'))
+    for candidate in ready.order_by('pk').values_list('pk', flat=True)[:10]:
+        if ready.filter(pk=candidate).update(status=SmsCampaign.STATUS_SENDING, lease_until=lease, modified=now):
+            return SmsCampaign.objects.get(pk=candidate)
+    return None
+
+
+def is_retryable(error):
+    # 수신자 문제(4xx)는 다시 보내도 실패하기 때문에 timeout, 5xx 등만 다시 시도
+    response = getattr(error, 'response', None)
+    return not is_recipient_error(getattr(response, 'status_code', None))
+
+
+def send_chunk(connection, phone_numbers, content):
+    '''
+        SENS 요청 하나로 전송하고 성공한 수신자 수 리턴
+        실패한 수신자만 RETRY_DELAY * 2^(시도 횟수 - 1)초 뒤에 MAX_ATTEMPTS번까지 다시 전송
+    '''
+    pending = [SmsMessage(phone_number, content) for phone_number in phone_numbers]
+    max_attempts = campaign_setting('MAX_ATTEMPTS')
+    for attempt in range(1, max_attempts + 1):
+        try:
+            results = connection.send_batch(pending)
+        except Exception as e:
+            results = [e] * len(pending)
+        failed = [(message, error) for message, error in zip(pending, results) if error is not None]
+        retry = [message for message, error in failed if is_retryable(error)]
+        if not retry or attempt == max_attempts:
+            break
+        time.sleep(campaign_setting('RETRY_DELAY') * 2 ** (attempt - 1))
+        pending = retry
+    for message, error in failed:
+        logger.warning('공지 문자 전송 실패(%s): %s', message.to, error)
+    return len(phone_numbers) - len(failed)
+
+
+def run_campaign(campaign, stop_event=None, chunk_size=None, concurrency=None):
+    '''
+        선점한 캠페인을 cursor 다음 수신자부터 끝까지(또는 stop_event가 설정될 때까지) 전송
+        배치마다 진행 상황을 저장하고, 전송을 마치면 True 리턴
+        선점 시간이 지나서 다른 워커가 가져간 경우에는 진행 상황을 저장하지 않고 멈춤
+    '''
+    chunk_size = chunk_size or campaign_setting('CHUNK_SIZE')
+    concurrency = concurrency or campaign_setting('CONCURRENCY')
+    connection = get_connection()
+    recipients = get_recipients(campaign)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            batch = list(itertools.islice(recipients, chunk_size * concurrency))
+            if not batch:
+                return finish(campaign)
+            chunks = [batch[i:i + chunk_size] for i in range(0, len(batch), chunk_size)]
+            sent = sum(pool.map(lambda chunk: send_chunk(connection, chunk, campaign.content), chunks))
+            if not save_progress(campaign, batch[-1], sent, len(batch) - sent):
+                logger.warning('공지 문자(%s) 선점 시간이 지나서 전송을 멈춥니다.', campaign.pk)
+                return False
+            if stop_event is not None and stop_event.is_set():
+                release(campaign)
+                return False
+
+
+def save_progress(campaign, cursor, sent, failed):
+    '''
+        배치 전송 결과 저장, 선점 시간을 연장하면서 선점한 워커가 맞는지(lease_until) 확인
+    '''
+    now = timezone.now()
+    lease = now + datetime.timedelta(seconds=campaign_setting('LEASE'))
+    updated = SmsCampaign.objects.filter(pk=campaign.pk, lease_until=campaign.lease_until).update(
+        cursor=cursor, sent=campaign.sent + sent, failed=campaign.failed + failed, lease_until=lease, modified=now)
+    if updated:
+        campaign.cursor, campaign.lease_until = cursor, lease
+        campaign.sent += sent
+        campaign.failed += failed
+    return bool(updated)
+
+
+def finish(campaign):
+    now = timezone.now()
+    updated = SmsCampaign.objects.filter(pk=campaign.pk, lease_until=campaign.lease_until).update(
+        status=SmsCampaign.STATUS_DONE, lease_until=None, finished_at=now, modified=now)
+    if updated:
+        campaign.status, campaign.lease_until, campaign.finished_at = SmsCampaign.STATUS_DONE, None, now
+    return bool(updated)
+
+
+def release(campaign):
+    # 종료 신호로 멈춘 경우 선점 시간을 기다리지 않고 다음 워커가 바로 이어서 전송하도록 선점 해제
+    now = timezone.now()
+    SmsCampaign.objects.filter(pk=campaign.pk, lease_until=campaign.lease_until).update(
+        status=SmsCampaign.STATUS_PENDING, lease_until=None, modified=now)
+    campaign.status, campaign.lease_until = SmsCampaign.STATUS_PENDING, None
+
+
+def run_campaign_worker(stop_event, chunk_size=None, concurrency=None, poll_interval=None):
+    '''
+        stop_event가 설정될 때까지 전송할 캠페인을 선점해서 전송
+        전송할 캠페인이 없으면 poll_interval초 쉬었다가 다시 확인
+    '''
+    poll_interval = campaign_setting('POLL_INTERVAL') if poll_interval is None else poll_interval
+    while not stop_event.is_set():
+        try:
+            campaign = claim_campaign()
+            if campaign is not None:
+                run_campaign(campaign, stop_event, chunk_size, concurrency)
+        except Exception:
+            logger.exception('공지 문자 전송 중 에러 발생')
+            campaign = None
+        finally:
+            close_old_connections()
+        if campaign is None:
+            stop_event.wait(poll_interval)
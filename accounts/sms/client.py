@@ -0,0 +1,228 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CONNECT_TIMEOUT': 3,
+    'READ_TIMEOUT': 10,
+    'POOL_MAXSIZE': 10,
+}
+
+
+def client_setting(name):
+    return getattr(settings, 'SENS_CLIENT', {}).get(name, DEFAULTS[name])
+
+
+class SensClient:
+    '''
+        NAVER SENS API 클라이언트
+        - 워커(프로세스)마다 keep-alive 커넥션 풀을 가진 requests.Session 하나를 재사용
+        - connect / read timeout 설정
+        - 서명용 HMAC 키는 한 번만 만들어 두고 요청마다 복사해서 사용
+        - fork 후에는 부모 프로세스의 커넥션을 쓰지 않도록 세션을 새로 만듦
+    '''
+
+    def __init__(self, access_key, secret_key, service_id, sender, base_url,
+                 connect_timeout=None, read_timeout=None, pool_maxsize=None):
+        self.access_key = access_key
+        self.service_id = service_id
+        self.sender = sender
+        self.base_url = base_url.rstrip('/')
+        self.uri = f'/sms/v2/services/{service_id}/messages'
+        self.url = f'{self.base_url}{self.uri}'
+        self.timeout = (connect_timeout or client_setting('CONNECT_TIMEOUT'),
+                        read_timeout or client_setting('READ_TIMEOUT'))
+        self.pool_maxsize = pool_maxsize or client_setting('POOL_MAXSIZE')
+        self._hmac = hmac.new(bytes(secret_key, 'UTF-8'), digestmod=hashlib.sha256)
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # 배치 디스패처, outbox 워커의 여러 스레드에서 같이 갱신하기 때문에 _stats_lock 안에서만 수정
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'seconds': 0.0}
+
+    @classmethod
+    def from_settings(cls):
+        key = settings.NAVER_KEY
+        return cls(key['ClOUD_ACCESS_KEY'], key['ClOUD_SECRET_KEY'], key['SMS_ACCESS_ID'],
+                   key['SMS_PHONE_NUMBER'], settings.SENS_API_URL)
+
+    @property
+    def session(self):
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session, self._pid = session, pid
+        return self._session
+
+    def make_signature(self, message):
+        signer = self._hmac.copy()
+        signer.update(message)
+        return base64.b64encode(signer.digest())
+
+    def get_headers(self, method='POST'):
+        timestamp = str(int(time.time() * 1000))
+        message = bytes(f'{method} {self.uri}\n{timestamp}\n{self.access_key}', 'UTF-8')
+        return {
+            "Content-Type": "application/json; charset=utf-8",
+            "x-ncp-apigw-timestamp": timestamp,
+            "x-ncp-iam-access-key": self.access_key,
+            "x-ncp-apigw-signature-v2": self.make_signature(message),
+        }
+
+    def send(self, phone_number, content):
+        '''
+            문자 한 건 전송
+            전송에 실패하면(timeout, 4xx, 5xx 응답) requests.RequestException 발생
+        '''
+        body = {
+            "type": "SMS",
+            "from": self.sender,
+            "content": content,
+            "messages": [
+                {
+                    "to": phone_number,
+                }
+            ],
+        }
+        return self.post(body)
+
+    def get_batch_body(self, messages):
+        return {
+            "type": "SMS",
+            "from": self.sender,
+            "content": messages[0].content,
+            "messages": [
+                {
+                    "to": message.to,
+                    "content": message.content,
+                } for message in messages
+            ],
+        }
+
+    def send_batch(self, messages):
+        '''
+            여러 수신자에게 한 번의 요청으로 전송(SENS messages 배열)
+            messages는 to, content 속성을 가진 객체의 리스트이고 메시지마다 내용이 달라도 됨
+            전송에 실패하면 requests.RequestException 발생
+        '''
+        return self.post(self.get_batch_body(messages))
+
+    def record(self, elapsed, error=False):
+        '''
+            요청 수, 에러 수, 요청 시간 기록
+        '''
+        with self._stats_lock:
+            self.stats['requests'] += 1
+            self.stats['seconds'] += elapsed
+            if error:
+                self.stats['errors'] += 1
+
+    def post(self, body):
+        start = time.perf_counter()
+        error = False
+        try:
+            response = self.session.post(self.url, data=json.dumps(body), headers=self.get_headers(),
+                                         timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(elapsed, error)
+            logger.debug('SENS %s %.1fms', self.uri, elapsed * 1000)
+        return response
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class AsyncSensClient(SensClient):
+    '''
+        asyncio용 SENS 클라이언트(httpx.AsyncClient 사용)
+        서명, 요청 본문은 SensClient와 같고 HTTP 요청만 비동기로 보낸다.
+        httpx.AsyncClient는 이벤트 루프에 묶이기 때문에 루프마다 하나씩 만들어서 사용
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        connect_timeout, read_timeout = self.timeout
+        self._async_session = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize),
+        )
+
+    async def asend_batch(self, messages):
+        '''
+            send_batch()의 비동기 버전
+            전송에 실패하면 httpx.HTTPError 발생
+        '''
+        return await self.apost(self.get_batch_body(messages))
+
+    async def apost(self, body):
+        start = time.perf_counter()
+        error = False
+        try:
+            response = await self._async_session.post(self.url, content=json.dumps(body),
+                                                      headers=self.get_headers())
+            response.raise_for_status()
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(elapsed, error)
+            logger.debug('SENS(async) %s %.1fms', self.uri, elapsed * 1000)
+        return response
+
+    async def aclose(self):
+        await self._async_session.aclose()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    '''
+        프로세스마다 하나의 SensClient를 처음 사용할 때 만들어서 재사용
+    '''
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SensClient.from_settings()
+    return _client
+
+
+@receiver(setting_changed)
+def reset_client(setting, **kwargs):
+    # 테스트에서 override_settings로 SENS 설정을 바꾸면 클라이언트를 다시 만들기
+    global _client
+    if setting in ('SENS_API_URL', 'SENS_CLIENT', 'NAVER_KEY'):
+        with _client_lock:
+            if _client is not None:
+                _client.close()
+            _client = None
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+DEFAULTS = {
+    'MAX_SIZE': 100,
+    'WINDOW': 0.05,
+}
+
+
+def batch_setting(name):
+    return getattr(settings, 'SMS_BATCH', {}).get(name, DEFAULTS[name])
+
+
+class BatchingDispatcher:
+    '''
+        동시에 들어온 문자 전송 요청을 모아서 한 번에 보내는 디스패처
+
+        submit()으로 들어온 문자는 첫 문자가 들어온 뒤 window초가 지나거나
+        max_size개가 모이면 백엔드의 send_batch()로 한 번에 전송된다.
+        submit()은 Future를 리턴하고, 전송 결과는 수신자별로 Future에 기록된다.
+        (성공하면 result()가 True, 실패하면 result()에서 예외 발생)
+    '''
+
+    def __init__(self, window=None, max_size=None, backend=None):
+        self.window = batch_setting('WINDOW') if window is None else window
+        self.max_size = max_size or batch_setting('MAX_SIZE')
+        self.backend = backend
+        self._pending = []
+        self._deadline = None
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def submit(self, message):
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('이미 종료된 디스패처입니다.')
+            if not self._pending:
+                self._deadline = time.monotonic() + self.window
+            self._pending.append((message, future))
+            self._ensure_thread()
+            self._condition.notify()
+        return future
+
+    def flush(self):
+        '''
+            기다리지 않고 모인 문자를 바로 전송하도록 알리기
+        '''
+        with self._condition:
+            self._deadline = time.monotonic()
+            self._condition.notify()
+
+    def close(self, wait=True):
+        '''
+            남은 문자를 모두 보낸 뒤 디스패처 종료
+        '''
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if wait and thread is not None and thread.is_alive():
+            thread.join()
+
+    def _ensure_thread(self):
+        # fork 후에는 부모 프로세스의 스레드가 없기 때문에 새로 만들기
+        pid = os.getpid()
+        if self._thread is None or self._pid != pid or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='sms-batching-dispatcher', daemon=True)
+            self._pid = pid
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending and not self._closed:
+                self._condition.wait()
+            if not self._pending:
+                return None
+            while len(self._pending) < self.max_size and not self._closed:
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            # 남은 문자는 이미 충분히 기다렸으므로 바로 다음 배치로 전송
+            self._deadline = time.monotonic()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._send(batch)
+
+    def _send(self, batch):
+        from . import get_connection
+
+        messages = [message for message, future in batch]
+        try:
+            results = get_connection(self.backend).send_batch(messages)
+        except Exception as e:
+            results = [e] * len(batch)
+        for (message, future), error in zip(batch, results):
+            if error is None:
+                future.set_result(True)
+            else:
+                future.set_exception(error)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    '''
+        프로세스마다 하나의 BatchingDispatcher를 처음 사용할 때 만들어서 재사용
+    '''
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = BatchingDispatcher()
+    return _dispatcher
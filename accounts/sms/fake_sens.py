@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSensHTTPServer(ThreadingHTTPServer):
+    # 기본 listen 대기열(5)이 작아서 동시에 연결을 많이 열면 SYN 재전송으로 1초씩 지연됨
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeSensHandler(BaseHTTPRequestHandler):
+    '''
+        NAVER SENS의 POST /sms/v2/services/{serviceId}/messages 흉내
+    '''
+
+    def do_POST(self):
+        server = self.server.fake_sens
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+
+        if not (self.path.startswith('/sms/v2/services/') and self.path.endswith('/messages')):
+            return self._respond(404, {'errorMessage': 'Not Found'})
+        if not self.headers.get('x-ncp-apigw-signature-v2'):
+            return self._respond(401, {'errorMessage': 'Authentication Failed'})
+
+        server.wait()
+        status = server.next_status()
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            return self._respond(400, {'errorMessage': 'Invalid JSON'})
+        if any(not str(message.get('to', '')).isdigit() for message in body.get('messages', [])):
+            status = 400
+        server.record(self.path, dict(self.headers), body, status)
+        if status >= 400:
+            return self._respond(status, {'errorMessage': 'Fake SENS error'})
+        return self._respond(status, {
+            'requestId': uuid.uuid4().hex,
+            'requestTime': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'statusCode': str(status),
+            'statusName': 'success',
+        })
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 timeout으로 먼저 끊은 경우
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSensServer:
+    '''
+        테스트, 부하 테스트용 로컬 가짜 SENS 서버
+
+        with FakeSensServer(latency=0.05) as sens:
+            with override_settings(SENS_API_URL=sens.url):
+                ...
+            sens.messages  # 받은 메시지 목록 [{'to': ..., 'content': ...}, ...]
+    '''
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, status=202):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.status = status
+        self.requests = []
+        self._failures = []
+        self._lock = threading.Lock()
+        # 수신자별 마지막 메시지(부하 테스트에서 인증번호를 기다릴 때 사용)
+        self._inbox = {}
+        self._received = threading.Condition(self._lock)
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def messages(self):
+        '''
+            요청 본문의 messages를 풀어서 수신자별 메시지 목록으로 리턴
+            메시지에 content가 없으면 요청 본문의 content 사용
+        '''
+        with self._lock:
+            requests = list(self.requests)
+        messages = []
+        for request in requests:
+            if request['status'] >= 400:
+                continue
+            body = request['body']
+            for message in body.get('messages', []):
+                messages.append({'to': message['to'], 'content': message.get('content', body.get('content'))})
+        return messages
+
+    def fail_next(self, count=1, status=500):
+        # 다음 count번의 요청에 status로 응답
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def next_status(self):
+        with self._lock:
+            if self._failures:
+                return self._failures.pop(0)
+        return self.status
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def record(self, path, headers, body, status):
+        with self._received:
+            self.requests.append({'path': path, 'headers': headers, 'body': body, 'status': status})
+            if status < 400:
+                for message in body.get('messages', []):
+                    self._inbox[message['to']] = message.get('content', body.get('content'))
+                self._received.notify_all()
+
+    def wait_message(self, to, timeout=None):
+        '''
+            to로 보낸 메시지를 받을 때까지 기다렸다가 마지막 메시지 내용 리턴
+            timeout초 안에 받지 못하면 None
+        '''
+        with self._received:
+            self._received.wait_for(lambda: to in self._inbox, timeout)
+            return self._inbox.get(to)
+
+    def reset(self):
+        with self._lock:
+            self.requests = []
+            self._failures = []
+            self._inbox = {}
+
+    def start(self):
+        self._httpd = FakeSensHTTPServer((self.host, self.port), FakeSensHandler)
+        self._httpd.fake_sens = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
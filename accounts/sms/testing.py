@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from .. import sms
+
+
+class SmsTestRunner(DiscoverRunner):
+    '''
+        테스트 중에는 실제 문자가 나가지 않도록 SMS_BACKEND를 locmem 백엔드로 교체
+        (Django 테스트 러너가 EMAIL_BACKEND를 교체하는 것과 같은 방식)
+    '''
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._original_sms_backend = settings.SMS_BACKEND
+        settings.SMS_BACKEND = 'accounts.sms.backends.locmem.SmsBackend'
+        sms.outbox = []
+
+    def teardown_test_environment(self, **kwargs):
+        settings.SMS_BACKEND = self._original_sms_backend
+        del sms.outbox
+        super().teardown_test_environment(**kwargs)
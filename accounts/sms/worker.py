@@ -0,0 +1,210 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import datetime
+import logging
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from . import SmsMessage, get_connection
+from .dispatcher import batch_setting
+from ..models import SmsOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 50,
+    'WORKERS': 4,
+    'POLL_INTERVAL': 1,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 2,
+    'BACKOFF_MAX': 300,
+    'SENDING_TIMEOUT': 60,
+}
+
+
+def outbox_setting(name):
+    return getattr(settings, 'SMS_OUTBOX', {}).get(name, DEFAULTS[name])
+
+
+def get_backoff(attempts):
+    '''
+        attempts번 실패한 뒤 다음 시도까지 기다릴 시간(초)
+        BACKOFF_BASE * 2^(attempts - 1), 최대 BACKOFF_MAX
+    '''
+    delay = outbox_setting('BACKOFF_BASE') * (2 ** max(attempts - 1, 0))
+    return min(delay, outbox_setting('BACKOFF_MAX'))
+
+
+def claim_batch(batch_size=None):
+    '''
+        전송할 outbox 행을 batch_size만큼 가져와서 선점하기
+        - 전송 대기(pending) 중이면서 다음 전송 시각이 지난 행
+        - 전송 중(sending)이지만 워커가 죽어서 선점 시간(SENDING_TIMEOUT)이 지난 행
+        조건부 update로 선점하기 때문에 여러 워커가 동시에 돌아도 같은 행을 중복 전송하지 않음
+    '''
+    batch_size = batch_size or outbox_setting('BATCH_SIZE')
+    now = timezone.now()
+    lease = now + datetime.timedelta(seconds=outbox_setting('SENDING_TIMEOUT'))
+    ready = SmsOutbox.objects.filter(status__in=[SmsOutbox.STATUS_PENDING, SmsOutbox.STATUS_SENDING],
+                                     next_attempt_at__lte=now)
+    candidates = list(ready.order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size])
+
+    claimed = []
+    for pk in candidates:
+        updated = ready.filter(pk=pk).update(status=SmsOutbox.STATUS_SENDING, next_attempt_at=lease,
+                                             attempts=F('attempts') + 1, modified=now)
+        if updated:
+            claimed.append(pk)
+    return list(SmsOutbox.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def mark_sent(outboxes):
+    now = timezone.now()
+    SmsOutbox.objects.filter(pk__in=[outbox.pk for outbox in outboxes]).update(
+        status=SmsOutbox.STATUS_SENT, sent_at=now, last_error='', modified=now)
+
+
+def mark_failed(outbox, error):
+    '''
+        전송 실패 기록
+        최대 시도 횟수를 넘기면 failed, 아니면 backoff 뒤에 다시 시도하도록 pending으로 되돌리기
+    '''
+    now = timezone.now()
+    if outbox.attempts >= outbox_setting('MAX_ATTEMPTS'):
+        status, next_attempt_at = SmsOutbox.STATUS_FAILED, now
+    else:
+        status = SmsOutbox.STATUS_PENDING
+        next_attempt_at = now + datetime.timedelta(seconds=get_backoff(outbox.attempts))
+    SmsOutbox.objects.filter(pk=outbox.pk).update(status=status, next_attempt_at=next_attempt_at,
+                                                  last_error=str(error), modified=now)
+
+
+def deliver(outboxes):
+    '''
+        outbox 여러 건을 한 번의 요청(SENS messages 배열)으로 전송하고 수신자별 결과 기록하기
+        성공한 건수 리턴
+    '''
+    messages = [SmsMessage(outbox.phone_number, outbox.content) for outbox in outboxes]
+    try:
+        results = get_connection().send_batch(messages)
+    except Exception as e:
+        results = [e] * len(outboxes)
+    return record_results(outboxes, results)
+
+
+def record_results(outboxes, results):
+    '''
+        수신자별 전송 결과(None 또는 예외)를 outbox 행에 기록하고 성공한 건수 리턴
+    '''
+    sent = []
+    for outbox, error in zip(outboxes, results):
+        if error is None:
+            sent.append(outbox)
+        else:
+            logger.warning('SMS 전송 실패(%s, %s회): %s', outbox.phone_number, outbox.attempts, error)
+            mark_failed(outbox, error)
+    if sent:
+        mark_sent(sent)
+    return len(sent)
+
+
+def _deliver_in_thread(outboxes):
+    # 스레드마다 DB 커넥션이 따로 생기기 때문에 작업이 끝나면 정리
+    try:
+        return deliver(outboxes)
+    finally:
+        close_old_connections()
+
+
+def drain_outbox(batch_size=None, workers=None, executor=None):
+    '''
+        outbox 한 번 비우기
+        선점한 행들을 SMS_BATCH['MAX_SIZE']개씩 묶어서 스레드 풀에서 동시에 전송하고 처리한 행 수 리턴
+    '''
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0
+    size = batch_setting('MAX_SIZE')
+    chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+    workers = workers or outbox_setting('WORKERS')
+    if executor is None and (workers <= 1 or len(chunks) == 1):
+        for chunk in chunks:
+            deliver(chunk)
+        return len(batch)
+    if executor is not None:
+        list(executor.map(_deliver_in_thread, chunks))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_deliver_in_thread, chunks))
+    return len(batch)
+
+
+def run_outbox_worker(stop_event, batch_size=None, workers=None, poll_interval=None):
+    '''
+        stop_event가 설정될 때까지 outbox를 계속 비우기
+        보낼 행이 없으면 poll_interval초 쉬었다가 다시 확인
+    '''
+    workers = workers or outbox_setting('WORKERS')
+    poll_interval = outbox_setting('POLL_INTERVAL') if poll_interval is None else poll_interval
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while not stop_event.is_set():
+            try:
+                processed = drain_outbox(batch_size, workers, executor=pool)
+            except Exception:
+                logger.exception('SMS outbox 처리 중 에러 발생')
+                processed = 0
+            finally:
+                close_old_connections()
+            if not processed:
+                stop_event.wait(poll_interval)
+
+
+async def adeliver(connection, outboxes):
+    '''
+        deliver()의 비동기 버전
+        HTTP 요청은 백엔드의 asend_batch()로 보내고 DB 기록만 sync_to_async로 처리
+    '''
+    messages = [SmsMessage(outbox.phone_number, outbox.content) for outbox in outboxes]
+    try:
+        results = await connection.asend_batch(messages)
+    except Exception as e:
+        results = [e] * len(outboxes)
+    return await sync_to_async(record_results)(outboxes, results)
+
+
+async def adrain_outbox(connection, batch_size=None):
+    '''
+        drain_outbox()의 비동기 버전
+        묶음마다 스레드를 쓰지 않고 하나의 이벤트 루프에서 동시에 전송
+    '''
+    batch = await sync_to_async(claim_batch)(batch_size)
+    if not batch:
+        return 0
+    size = batch_setting('MAX_SIZE')
+    chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+    await asyncio.gather(*(adeliver(connection, chunk) for chunk in chunks))
+    return len(batch)
+
+
+async def arun_outbox_worker(stop_event, batch_size=None, poll_interval=None):
+    '''
+        run_outbox_worker()의 비동기 버전
+    '''
+    poll_interval = outbox_setting('POLL_INTERVAL') if poll_interval is None else poll_interval
+    connection = get_connection()
+    try:
+        while not stop_event.is_set():
+            try:
+                processed = await adrain_outbox(connection, batch_size)
+            except Exception:
+                logger.exception('SMS outbox 처리 중 에러 발생')
+                processed = 0
+            if not processed:
+                await asyncio.sleep(poll_interval)
+    finally:
+        await connection.aclose()
@@ -0,0 +1,192 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.hashers import Argon2PasswordHasher, check_password, make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..hashers import HashingUnavailable, PooledArgon2PasswordHasher, get_hashing_service
+from ..models import User
+
+SINGLE_WORKER = {'WORKERS': 1, 'QUEUE_SIZE': 0, 'RETRY_AFTER': 3}
+LOW_COST = {'TIME_COST': 1, 'MEMORY_COST': 8192, 'PARALLELISM': 1}
+
+
+class HoldSlots:
+    '''
+    풀의 자리를 모두 차지해서 대기열이 가득 찬 상황 만들기
+    '''
+
+    def __init__(self, service):
+        self.service = service
+        self.count = service.workers + service.queue_size
+
+    def __enter__(self):
+        for _ in range(self.count):
+            self.service._slots.acquire()
+
+    def __exit__(self, *exc_info):
+        for _ in range(self.count):
+            self.service._slots.release()
+
+
+class PooledArgon2PasswordHasherTestCase(TestCase):
+    '''
+    프로세스 풀에서 계산하는 Argon2 hasher 테스트
+    '''
+
+    def test_encode_and_verify(self):
+        '''
+        1. 풀에서 만든 해시를 기존 Argon2PasswordHasher로 확인할 수 있고 반대도 가능
+        2. 해시 계산 횟수와 시간이 지표에 기록됨
+        '''
+        completed = get_hashing_service().stats()['completed']
+        encoded = make_password('test123456')
+        self.assertTrue(encoded.startswith('argon2$'))
+        self.assertTrue(Argon2PasswordHasher().verify('test123456', encoded))
+        self.assertTrue(check_password('test123456', Argon2PasswordHasher().encode('test123456', 'saltsaltsalt')))
+        self.assertFalse(check_password('wrong123456', encoded))
+
+        stats = get_hashing_service().stats()
+        self.assertEqual(stats['completed'], completed + 3)
+        self.assertEqual(stats['pending'], 0)
+        self.assertGreater(stats['max_hash_ms'], 0)
+
+    @override_settings(PASSWORD_HASHING=SINGLE_WORKER)
+    def test_queue_full(self):
+        '''
+        대기열이 가득 차면 기다리지 않고 HashingUnavailable 발생
+        '''
+        service = get_hashing_service()
+        with HoldSlots(service), self.assertRaises(HashingUnavailable) as cm:
+            PooledArgon2PasswordHasher().encode('test123456', 'saltsaltsalt')
+        self.assertEqual(cm.exception.wait, 3)
+        self.assertEqual(service.stats()['rejected'], 1)
+        # 자리가 나면 다시 계산
+        self.assertTrue(check_password('test123456', make_password('test123456')))
+
+    def test_setting_costs(self):
+        '''
+        PASSWORD_HASHING에 지정한 비용으로 해시를 만들고 비용이 다른 해시는 must_update()
+        '''
+        default_encoded = make_password('test123456')
+        with override_settings(PASSWORD_HASHING=LOW_COST):
+            hasher = PooledArgon2PasswordHasher()
+            encoded = make_password('test123456')
+            decoded = hasher.decode(encoded)
+            self.assertEqual((decoded['time_cost'], decoded['memory_cost'], decoded['parallelism']), (1, 8192, 1))
+            self.assertFalse(hasher.must_update(encoded))
+            self.assertTrue(hasher.must_update(default_encoded))
+
+
+class CalibrateHasherCommandTestCase(TestCase):
+    '''
+    Argon2 비용 측정 명령어 테스트
+    '''
+
+    def test_calibrate(self):
+        out = StringIO()
+        call_command('calibrate_hasher', target_ms=1000, max_memory=16384, parallelism=[1], samples=1,
+                     stdout=out, stderr=StringIO())
+        snippet = out.getvalue()
+        self.assertIn('PASSWORD_HASHING = {', snippet)
+        self.assertIn("'MEMORY_COST': 16384,", snippet)
+        self.assertIn("'PARALLELISM': 1,", snippet)
+        # 출력한 설정을 그대로 사용할 수 있는지 확인
+        namespace = {}
+        exec(snippet, namespace)
+        self.assertGreaterEqual(namespace['PASSWORD_HASHING']['TIME_COST'], 1)
+
+
+class PasswordUpgradeTestCase(APITestCase):
+    '''
+    비용을 바꾸면 기존 비밀번호는 다음 로그인에 성공할 때 새 비용으로 다시 저장
+    '''
+
+    def setUp(self):
+        self.password = 'test123456'
+        self.user = User.objects.create_user(username='test', email='test@test.com', password=self.password,
+                                             nickname='test', phone_number='01000000000', name='테스트')
+        self.url = reverse('token_obtain_pair')
+
+    @override_settings(PASSWORD_HASHING=LOW_COST)
+    def test_upgrade_on_login(self):
+        old_password = self.user.password
+        # 로그인 실패는 다시 저장하지 않음
+        data = json.dumps({'username': 'test', 'password': 'wrong123456'})
+        self.client.post(self.url, data, content_type='application/json')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, old_password)
+
+        data = json.dumps({'username': 'test', 'password': self.password})
+        response = self.client.post(self.url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertNotEqual(self.user.password, old_password)
+        self.assertEqual(PooledArgon2PasswordHasher().decode(self.user.password)['memory_cost'], 8192)
+        self.assertTrue(self.user.check_password(self.password))
+
+
+@override_settings(PASSWORD_HASHING=SINGLE_WORKER)
+class HashingBackpressureViewTestCase(APITestCase):
+    '''
+    대기열이 가득 찼을 때 비밀번호를 다루는 API는 503 + Retry-After로 응답
+    '''
+
+    def setUp(self):
+        self.password = 'test123456'
+        self.user = User.objects.create_user(username='test', email='test@test.com', password=self.password,
+                                             nickname='test', phone_number='01000000000', name='테스트')
+
+    def test_token_obtain(self):
+        data = json.dumps({'username': 'test', 'password': self.password})
+        with HoldSlots(get_hashing_service()):
+            response = self.client.post(reverse('token_obtain_pair'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+
+        response = self.client.post(reverse('token_obtain_pair'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_password_change(self):
+        data = json.dumps({'username': 'test', 'old_password': self.password,
+                           'new_password1': 'new123456!', 'new_password2': 'new123456!'})
+        with HoldSlots(get_hashing_service()):
+            response = self.client.post(reverse('password_change'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password(self.password))
+
+    def test_admin_login(self):
+        '''
+        DRF 밖에서 비밀번호를 확인하는 관리자 로그인도 500 대신 503 + Retry-After
+        '''
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        data = {'username': 'test', 'password': self.password, 'next': '/admin/'}
+        with HoldSlots(get_hashing_service()):
+            response = self.client.post('/admin/login/', data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '3')
+
+        response = self.client.post('/admin/login/', data, format='multipart')
+        self.assertRedirects(response, '/admin/')
+
+    def test_metrics(self):
+        '''
+        해시 풀 지표는 관리자만 조회 가능
+        '''
+        url = reverse('hashing_metrics')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(RefreshToken.for_user(self.user).access_token))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['workers'], 1)
+        self.assertEqual(response.data['queue_size'], 0)
+        self.assertIn('avg_hash_ms', response.data)
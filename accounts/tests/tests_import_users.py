@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+import tempfile
+from unittest import mock
+from io import StringIO
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from ..importing import UserImporter, read_rows
+from ..models import User
+from .tests_hashers import LOW_COST
+
+FIELDS = ['username', 'email', 'nickname', 'name', 'phone_number', 'password', 'password_hash']
+
+
+def make_row(index, **values):
+    row = {
+        'username': f'import{index}',
+        'email': f'import{index}@example.com',
+        'nickname': f'가져오기{index}',
+        'name': '홍길동',
+        'phone_number': f'010-2000-{index:04d}',
+        'password': 'import-pass-1234!',
+    }
+    row.update(values)
+    return row
+
+
+@override_settings(PASSWORD_HASHING=LOW_COST)
+class ImportUsersTestCase(TestCase):
+    '''
+    회원 가져오기(manage.py import_users) 테스트
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, rows, name='users.csv'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def write_jsonl(self, lines, name='users.jsonl'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines) + '\n')
+        return path
+
+    def call(self, path, **options):
+        out = StringIO()
+        errors = os.path.join(self.directory.name, 'errors.jsonl')
+        call_command('import_users', path, errors=errors, workers=2, stdout=out, **options)
+        with open(errors, encoding='utf-8') as file:
+            failed = {row['row']: row['errors'] for row in map(json.loads, file)}
+        os.remove(errors)
+        return out.getvalue(), failed
+
+    def test_import_csv(self):
+        path = self.write_csv([make_row(index) for index in range(5)])
+        out, failed = self.call(path, batch_size=2)
+        self.assertEqual(failed, {})
+        self.assertEqual(User.objects.count(), 5)
+        user = User.objects.get(username='import3')
+        self.assertEqual(user.phone_number, '01020000003')
+        self.assertEqual(user.registration_state, User.STATE_REGISTERED)
+        # 기본 hasher와 같은 비용의 Argon2로 해시
+        self.assertTrue(user.password.startswith('argon2$'))
+        self.assertTrue(check_password('import-pass-1234!', user.password))
+        # 배치마다 진행 상황과 다음 시작 위치 출력
+        self.assertIn('--start 2', out)
+        self.assertIn('--start 4', out)
+        self.assertIn('5행 처리(저장 5, 실패 0)', out)
+
+    def test_invalid_and_duplicate_rows(self):
+        User.objects.create(username='taken', email='Taken@example.com', nickname='기존', phone_number='01020009999')
+        path = self.write_jsonl([
+            make_row(1),
+            make_row(2, name='hong1'),
+            make_row(3, phone_number='010-1234'),
+            make_row(4, password='1234'),
+            make_row(5, username='taken'),
+            make_row(6, email='taken@example.com'),
+            make_row(7, nickname='기존'),
+            make_row(8, phone_number='+82 10 2000 9999'),
+            # 파일 안의 중복(다른 배치 포함)
+            make_row(9, username='import1'),
+            make_row(10, email='IMPORT1@example.com'),
+            '{not json',
+            '',
+            make_row(13),
+        ])
+        out, failed = self.call(path, batch_size=3)
+        self.assertEqual(set(User.objects.filter(username__startswith='import').values_list('username', flat=True)),
+                         {'import1', 'import13'})
+        self.assertEqual(sorted(failed), [2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(failed[3], {'phone_number': ['전화번호 형식이 잘못되었습니다.']})
+        self.assertIn('password1', failed[4])
+        self.assertEqual(failed[5], {'username': ['이미 사용 중인 값입니다.']})
+        self.assertEqual(failed[10], {'email': ['이미 사용 중인 값입니다.']})
+        self.assertIn('13행 처리(저장 2, 실패 10)', out)
+
+    def test_password_hash(self):
+        encoded = make_password('hashed-pass-1234!')
+        path = self.write_csv([
+            make_row(1, password='', password_hash=encoded),
+            make_row(2, password='', password_hash='plain-text'),
+            make_row(3, password=''),
+        ])
+        out, failed = self.call(path)
+        self.assertEqual(User.objects.get(username='import1').password, encoded)
+        self.assertEqual(failed[2], {'password_hash': ['지원하지 않는 비밀번호 해시입니다.']})
+        self.assertIn('password1', failed[3])
+
+    def test_resume(self):
+        '''
+        실패하면 저장을 마친 위치를 출력하고, --start로 이어서 진행
+        '''
+        path = self.write_csv([make_row(index) for index in range(6)])
+        save = UserImporter.save
+        calls = []
+
+        def fail_second_batch(importer, batch):
+            calls.append(batch.end)
+            if len(calls) == 2:
+                raise RuntimeError('db down')
+            save(importer, batch)
+
+        with self.assertRaisesMessage(CommandError, '--start 2로 이어서 진행하세요.'):
+            with self.settings(USER_IMPORT={'BATCH_SIZE': 2}), \
+                    mock.patch.object(UserImporter, 'save', fail_second_batch):
+                self.call(path)
+        self.assertEqual(User.objects.count(), 2)
+
+        out, failed = self.call(path, start=2, batch_size=2)
+        self.assertEqual(failed, {})
+        self.assertEqual(User.objects.count(), 6)
+        self.assertIn('4행 처리(저장 4, 실패 0)', out)
+
+    def test_read_rows(self):
+        rows = list(read_rows(StringIO('{"username": "a"}\n\n[1]\n{"username": "b"}\n'), 'jsonl', start=1))
+        self.assertEqual([number for number, _ in rows], [2, 3, 4])
+        self.assertIsNone(rows[0][1])
+        self.assertIsInstance(rows[1][1], ValueError)
+        self.assertEqual(rows[2][1], {'username': 'b'})
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_other_hasher(self):
+        '''
+        기본 hasher가 Argon2가 아니면 프로세스 풀 없이 현재 프로세스에서 해시
+        '''
+        importer = UserImporter(batch_size=10)
+        rows = read_rows(StringIO(json.dumps(make_row(1)) + '\n'), 'jsonl')
+        self.assertEqual(importer.run(rows)['imported'], 1)
+        self.assertIsNone(importer._executor)
+        self.assertTrue(User.objects.get(username='import1').password.startswith('md5$'))
@@ -0,0 +1,60 @@
+import threading
+
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from ..loadtest import ENDPOINTS, InProcessTransport, LoadTest, percentile
+from ..models import User
+from ..sms.fake_sens import FakeSensServer
+from ..sms.worker import run_outbox_worker
+
+
+class PercentileTestCase(SimpleTestCase):
+    '''
+    nearest-rank 분위수 테스트
+    '''
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+
+class LoadTestTestCase(TransactionTestCase):
+    '''
+    가짜 SENS 서버로 받은 인증번호로 회원가입 흐름 전체를 실행하는 부하 테스트 하네스 테스트
+    '''
+
+    def setUp(self):
+        self.sens = FakeSensServer().start()
+        self.stop_event = threading.Event()
+        self.settings_override = override_settings(SENS_API_URL=self.sens.url,
+                                                   SMS_BACKEND='accounts.sms.backends.sens.SmsBackend')
+        self.settings_override.enable()
+        self.worker = threading.Thread(target=run_outbox_worker, args=(self.stop_event,),
+                                       kwargs={'poll_interval': 0.01}, daemon=True)
+        self.worker.start()
+
+    def tearDown(self):
+        self.stop_event.set()
+        self.worker.join()
+        self.settings_override.disable()
+        self.sens.stop()
+
+    def test_run(self):
+        '''
+        1. 모든 흐름이 성공하고 API마다 흐름 수만큼 요청
+        2. 가입한 User는 가입 완료 상태
+        '''
+        result = LoadTest(self.sens, InProcessTransport, users=1, flows=2).run()
+        self.assertEqual(result['completed'], 2)
+        self.assertEqual(result['failed'], 0)
+        for name in ENDPOINTS:
+            self.assertEqual(result['endpoints'][name]['count'], 2)
+            self.assertEqual(result['endpoints'][name]['errors'], 0)
+            self.assertIsNotNone(result['endpoints'][name]['p99_ms'])
+        self.assertEqual(result['sms_delivery']['count'], 2)
+        self.assertEqual(len(self.sens.messages), 2)
+        self.assertEqual(User.objects.filter(registration_state=User.STATE_REGISTERED).count(), 2)
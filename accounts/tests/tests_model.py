@@ -1,6 +1,12 @@
+import datetime
+import threading
+
 from django.core.exceptions import ValidationError
-from django.test import TestCase
-from ..models import SmsAuth, User
+from django.db import close_old_connections, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase
+from ..models import SmsAuth, SmsOutbox, User
 
 
 class SmsAuthTestCase(TestCase):
@@ -93,3 +99,133 @@ class UserModelTestCase(TestCase):
         self.assertEqual(nickname, 'CharField')
         self.assertEqual(phone_number, 'CharField')
         self.assertEqual(name, 'CharField')
+
+
+class UserRegistrationStateTestCase(TestCase):
+    '''
+    User.registration_state 테스트
+    '''
+
+    def test_default_state(self):
+        '''
+        상태를 지정하지 않고 만들면
+        1. 전화번호가 없으면 인증 전
+        2. 전화번호만 있으면 인증 완료
+        3. 전화번호와 email이 있으면 가입 완료
+        '''
+        admin = User.objects.create(username='admin')
+        verified = User.objects.create(username='01000000000', phone_number='01000000000')
+        registered = User.objects.create(username='test', phone_number='01000000001', email='test@test.com')
+        self.assertIsNone(admin.phone_number)
+        self.assertEqual(admin.registration_state, User.STATE_PENDING_VERIFICATION)
+        self.assertEqual(verified.registration_state, User.STATE_VERIFIED)
+        self.assertEqual(registered.registration_state, User.STATE_REGISTERED)
+
+    def test_get_registration_state(self):
+        '''
+        쿼리 한 번으로 가입 상태만 조회하고 없는 번호는 None
+        '''
+        User.objects.create(username='01000000000', phone_number='01000000000')
+        with self.assertNumQueries(1):
+            self.assertEqual(User.get_registration_state('01000000000'), User.STATE_VERIFIED)
+        with self.assertNumQueries(1):
+            self.assertIsNone(User.get_registration_state('01000000009'))
+
+
+class SmsAuthUpsertTestCase(TransactionTestCase):
+    '''
+    SmsAuth.objects.upsert() 테스트
+    '''
+
+    def setUp(self):
+        self.phone_number = '01012345678'
+
+    def test_upsert_insert_and_update(self):
+        '''
+        1. 없는 번호면 새로 저장
+        2. 있는 번호면 인증번호와 수정 시각만 바뀌고 outbox는 요청마다 쌓임
+        '''
+        first = SmsAuth.objects.upsert(self.phone_number)
+        saved = SmsAuth.objects.get(phone_number=self.phone_number)
+        self.assertEqual(saved.auth_number, first.auth_number)
+
+        with self.assertNumQueries(3):
+            # BEGIN / INSERT ... ON CONFLICT / outbox INSERT (SELECT 없음)
+            second = SmsAuth.objects.upsert(self.phone_number)
+        updated = SmsAuth.objects.get(phone_number=self.phone_number)
+        self.assertEqual(updated.auth_number, second.auth_number)
+        self.assertEqual(updated.created, saved.created)
+        self.assertGreaterEqual(updated.modified, saved.modified)
+        self.assertTrue(1000 <= updated.auth_number <= 9999)
+        self.assertEqual(SmsOutbox.objects.filter(phone_number=self.phone_number).count(), 2)
+
+    def test_upsert_concurrent(self):
+        '''
+        여러 스레드에서 같은 번호로 동시에 요청해도 IntegrityError 없이 한 행만 남음
+        '''
+        count = 16
+        barrier = threading.Barrier(count)
+        errors = []
+        results = []
+
+        def send():
+            try:
+                barrier.wait()
+                results.append(SmsAuth.objects.upsert(self.phone_number))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=send) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(SmsAuth.objects.filter(phone_number=self.phone_number).count(), 1)
+        self.assertEqual(SmsOutbox.objects.filter(phone_number=self.phone_number).count(), count)
+        # 마지막으로 저장된 인증번호는 요청 중 하나의 인증번호
+        saved = SmsAuth.objects.get(phone_number=self.phone_number)
+        self.assertIn(saved.auth_number, [result.auth_number for result in results])
+
+
+class UserPhoneNumberMigrationTestCase(TransactionTestCase):
+    '''
+    User.phone_number에 unique 인덱스를 추가하는 마이그레이션(0003) 테스트
+    '''
+    migrate_from = [('accounts', '0002_sms_outbox')]
+    migrate_to = [('accounts', '0003_user_phone_number_unique')]
+
+    def setUp(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate(self.migrate_from)
+        old_apps = self.executor.loader.project_state(self.migrate_from).apps
+        OldUser = old_apps.get_model('accounts', 'User')
+        now = timezone.now()
+        # 같은 번호로 인증만 한 User, 가입한 User, 나중에 인증만 한 User
+        OldUser.objects.create(username='a', phone_number='01000000000', date_joined=now)
+        OldUser.objects.create(username='b', phone_number='01000000000', email='b@test.com', date_joined=now)
+        OldUser.objects.create(username='c', phone_number='01000000000',
+                               date_joined=now + datetime.timedelta(days=1))
+        # 전화번호 없이 만든 User 여러 명
+        OldUser.objects.create(username='admin1', phone_number='')
+        OldUser.objects.create(username='admin2', phone_number='')
+
+    def tearDown(self):
+        # 다른 테스트를 위해 마지막 마이그레이션까지 다시 진행
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_dedupe_phone_numbers(self):
+        '''
+        가입을 완료한 User만 전화번호를 유지하고 나머지와 빈 전화번호는 NULL로 변경
+        '''
+        self.executor.loader.build_graph()
+        self.executor.migrate(self.migrate_to)
+        new_apps = self.executor.loader.project_state(self.migrate_to).apps
+        NewUser = new_apps.get_model('accounts', 'User')
+        self.assertEqual(NewUser.objects.get(phone_number='01000000000').username, 'b')
+        self.assertEqual(set(NewUser.objects.filter(phone_number=None).values_list('username', flat=True)),
+                         {'a', 'c', 'admin1', 'admin2'})
@@ -0,0 +1,133 @@
+import datetime
+import json
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from .. import sms
+from ..models import SmsAuth, SmsOutbox, User
+from ..otp import CacheOtpStore, DatabaseOtpStore, get_otp_store
+
+CACHE_OTP = {'STORE': 'accounts.otp.CacheOtpStore'}
+
+
+def wait_outbox(count, timeout=5):
+    # CacheOtpStore는 디스패처 스레드가 문자를 보내기 때문에 잠시 기다리기
+    deadline = time.monotonic() + timeout
+    while len(sms.outbox) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return sms.outbox
+
+
+class DatabaseOtpStoreTestCase(TestCase):
+    '''
+    sms_auth 테이블을 사용하는 인증번호 저장소 테스트
+    '''
+
+    def setUp(self):
+        self.store = DatabaseOtpStore()
+        self.phone_number = '01000000000'
+
+    def test_default_store(self):
+        self.assertIsInstance(get_otp_store(), DatabaseOtpStore)
+
+    def test_issue_and_check(self):
+        auth_number = self.store.issue(self.phone_number)
+        self.assertTrue(self.store.exists(self.phone_number))
+        self.assertTrue(self.store.check(self.phone_number, auth_number))
+        self.assertTrue(SmsAuth.check_auth_number(self.phone_number, auth_number))
+        self.assertFalse(self.store.check('01000000001', auth_number))
+        self.assertEqual(SmsOutbox.objects.filter(phone_number=self.phone_number).count(), 1)
+
+    def test_check_expired(self):
+        '''
+        유효시간(5분)이 지난 인증번호는 실패
+        '''
+        auth_number = self.store.issue(self.phone_number)
+        expired = timezone.now() - datetime.timedelta(minutes=6)
+        SmsAuth.objects.filter(phone_number=self.phone_number).update(modified=expired)
+        self.assertFalse(self.store.check(self.phone_number, auth_number))
+
+
+@override_settings(OTP=CACHE_OTP)
+class CacheOtpStoreTestCase(TestCase):
+    '''
+    캐시를 사용하는 인증번호 저장소 테스트
+    '''
+
+    def setUp(self):
+        cache.clear()
+        sms.outbox = []
+        self.phone_number = '01000000000'
+
+    def test_setting_store(self):
+        self.assertIsInstance(get_otp_store(), CacheOtpStore)
+
+    def test_issue_and_check_without_sql(self):
+        '''
+        인증번호 발송, 확인 모두 SQL을 사용하지 않음
+        '''
+        store = get_otp_store()
+        with self.assertNumQueries(0):
+            auth_number = store.issue(self.phone_number)
+            self.assertTrue(store.exists(self.phone_number))
+            self.assertTrue(store.check(self.phone_number, auth_number))
+            self.assertTrue(SmsAuth.check_auth_number(self.phone_number, auth_number))
+            self.assertFalse(store.check(self.phone_number, 10000))
+        # 인증번호가 없는 번호는 인증을 마친 User가 있는지 DB에서 확인
+        self.assertFalse(store.exists('01000000001'))
+        self.assertTrue(1000 <= auth_number <= 9999)
+        self.assertFalse(SmsAuth.objects.exists())
+        self.assertFalse(SmsOutbox.objects.exists())
+        outbox = wait_outbox(1)
+        self.assertEqual(outbox[0].to, self.phone_number)
+        self.assertIn(str(auth_number), outbox[0].content)
+
+    def test_reissue_overwrite(self):
+        '''
+        다시 발송하면 이전 인증번호는 사용할 수 없음
+        '''
+        store = get_otp_store()
+        first = store.issue(self.phone_number)
+        second = store.issue(self.phone_number)
+        while second == first:
+            second = store.issue(self.phone_number)
+        self.assertFalse(store.check(self.phone_number, first))
+        self.assertTrue(store.check(self.phone_number, second))
+
+    @override_settings(OTP=dict(CACHE_OTP, TTL=1))
+    def test_check_expired(self):
+        '''
+        캐시 TTL이 지나면 인증번호와 발송 내역이 같이 만료됨
+        인증번호 확인을 마친 User가 있는 번호는 발송 내역이 있는 번호로 확인
+        '''
+        store = get_otp_store()
+        auth_number = store.issue(self.phone_number)
+        time.sleep(1.1)
+        self.assertFalse(store.check(self.phone_number, auth_number))
+        self.assertFalse(store.exists(self.phone_number))
+        self.assertFalse(store.get_status(self.phone_number).issued)
+
+        User.objects.create(username='expired', phone_number=self.phone_number,
+                            registration_state=User.STATE_VERIFIED)
+        self.assertTrue(store.exists(self.phone_number))
+        self.assertTrue(store.get_status(self.phone_number).issued)
+
+    def test_views(self):
+        '''
+        캐시 저장소로 인증번호 발송 API는 SQL 없이 처리되고 확인 API로 User 생성
+        '''
+        data = json.dumps({'phone_number': self.phone_number})
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('sms_auth_send'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        auth_number = cache.get(f'otp:{self.phone_number}')
+        data = json.dumps({'phone_number': self.phone_number, 'auth_number': auth_number})
+        response = self.client.post(reverse('sms_auth_confirm'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.filter(phone_number=self.phone_number).exists())
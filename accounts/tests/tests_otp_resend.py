@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import SmsAuth
+from ..otp import CacheOtpStore, get_otp_store
+from ..sms.backends.base import BaseSmsBackend
+from ..sms.dispatcher import get_dispatcher
+from ..sms.worker import drain_outbox
+
+COUNTING_BACKEND = 'accounts.tests.tests_otp_resend.CountingSmsBackend'
+SLOW_STORE = {'STORE': 'accounts.tests.tests_otp_resend.SlowCacheOtpStore', 'RESEND_COOLDOWN': 60}
+
+
+class CountingSmsBackend(BaseSmsBackend):
+    '''
+    SENS 대신 외부로 나가는 문자를 수신자별로 세는 백엔드
+    다른 테스트에서 디스패처에 남은 문자가 섞여도 영향이 없도록 이 파일에서만 쓰는 번호로 확인
+    '''
+    lock = threading.Lock()
+    recipients = []
+
+    @classmethod
+    def reset(cls):
+        with cls.lock:
+            cls.recipients = []
+
+    @classmethod
+    def count(cls, *phone_numbers):
+        with cls.lock:
+            return len([to for to in cls.recipients if to in phone_numbers])
+
+    def send_messages(self, messages):
+        with CountingSmsBackend.lock:
+            CountingSmsBackend.recipients += [message.to for message in messages]
+        return len(messages)
+
+
+class SlowCacheOtpStore(CacheOtpStore):
+    '''
+    발송 도중에 다른 요청이 들어오도록 release가 설정될 때까지 issue()를 멈추는 저장소
+    '''
+    started = threading.Event()
+    release = threading.Event()
+
+    def issue(self, phone_number):
+        self.started.set()
+        self.release.wait(5)
+        return super().issue(phone_number)
+
+
+class BrokenOnceStore(CacheOtpStore):
+    '''
+    처음 한 번만 발송에 실패하는 저장소
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.broken = True
+
+    def issue(self, phone_number):
+        if self.broken:
+            self.broken = False
+            raise RuntimeError('저장 실패')
+        return super().issue(phone_number)
+
+
+def wait_sent(count, *phone_numbers, timeout=5):
+    get_dispatcher().flush()
+    deadline = time.monotonic() + timeout
+    while CountingSmsBackend.count(*phone_numbers) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 늦게 나가는 전송이 있는지 확인하기 위해 조금 더 기다리기
+    time.sleep(0.1)
+    return CountingSmsBackend.count(*phone_numbers)
+
+
+@override_settings(SMS_BACKEND=COUNTING_BACKEND)
+class ResendCooldownTestCase(APITestCase):
+    '''
+    재발송 대기 시간 안의 발송 요청은 새 인증번호를 만들지 않고 기존 인증번호 유지
+    '''
+
+    def setUp(self):
+        cache.clear()
+        CountingSmsBackend.reset()
+        self.url = reverse('sms_auth_send')
+        self.phone_number = '01099990000'
+
+    def send(self, url=None):
+        data = json.dumps({'phone_number': self.phone_number})
+        return self.client.post(url or self.url, data, content_type='application/json')
+
+    def test_cooldown(self):
+        self.assertEqual(self.send().status_code, status.HTTP_200_OK)
+        auth_number = SmsAuth.objects.get(phone_number=self.phone_number).auth_number
+
+        response = self.send()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['message'], ['이미 전송된 인증번호가 있습니다. 문자를 확인해주세요.'])
+        self.assertTrue(0 < response.data['resend_after'] <= 60)
+        response = self.send(reverse('sms_auth_send_async'))
+        self.assertIn('resend_after', response.json())
+
+        # 인증번호가 바뀌지 않고 문자도 한 번만 나감
+        self.assertEqual(SmsAuth.objects.get(phone_number=self.phone_number).auth_number, auth_number)
+        drain_outbox()
+        self.assertEqual(CountingSmsBackend.count(self.phone_number), 1)
+
+    def test_after_cooldown(self):
+        '''
+        재발송 대기 시간이 지나면 새로 발송
+        '''
+        self.send()
+        cache.delete(get_otp_store().get_cooldown_key(self.phone_number))
+        response = self.send()
+        self.assertNotIn('resend_after', response.data)
+        drain_outbox()
+        self.assertEqual(CountingSmsBackend.count(self.phone_number), 2)
+
+    @override_settings(OTP={'RESEND_COOLDOWN': 0})
+    def test_disabled(self):
+        self.send()
+        self.send()
+        drain_outbox()
+        self.assertEqual(CountingSmsBackend.count(self.phone_number), 2)
+
+
+@override_settings(SMS_BACKEND=COUNTING_BACKEND, OTP=SLOW_STORE)
+class SingleFlightTestCase(TestCase):
+    '''
+    같은 번호로 동시에 들어온 발송 요청은 한 번만 발송
+    '''
+
+    def setUp(self):
+        cache.clear()
+        CountingSmsBackend.reset()
+        SlowCacheOtpStore.started.clear()
+        SlowCacheOtpStore.release.clear()
+        self.store = get_otp_store()
+
+    def test_concurrent_requests(self):
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.store.issue_once('01099990001')))
+        first.start()
+        self.assertTrue(SlowCacheOtpStore.started.wait(5))
+
+        # 먼저 들어온 요청이 발송하는 동안 들어온 요청은 기다리지 않고 발송하지 않음
+        concurrent = [self.store.issue_once('01099990001') for _ in range(3)]
+        self.assertEqual([result.issued for result in concurrent], [False] * 3)
+        # 다른 번호는 따로 발송
+        SlowCacheOtpStore.release.set()
+        self.assertTrue(self.store.issue_once('01099990002').issued)
+        first.join(5)
+
+        self.assertTrue(results[0].issued)
+        self.assertEqual(wait_sent(1, '01099990001'), 1)
+        self.assertEqual(wait_sent(1, '01099990002'), 1)
+
+    def test_release_lock_on_error(self):
+        '''
+        발송 중 에러가 나면 잠금을 풀어서 다음 요청이 바로 다시 발송
+        '''
+        store = BrokenOnceStore()
+        with self.assertRaises(RuntimeError):
+            store.issue_once('01099990001')
+        self.assertTrue(store.issue_once('01099990001').issued)
+        self.assertEqual(wait_sent(1, '01099990001'), 1)
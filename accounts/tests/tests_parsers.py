@@ -0,0 +1,124 @@
+import datetime
+import decimal
+import io
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import User
+from ..parsers import OrjsonParser
+from ..renderers import OrjsonRenderer
+from ..views import CustomPasswordChangeView, SMSAuthConfirmView, SMSAuthSendView
+
+
+class OrjsonCodecTestCase(SimpleTestCase):
+    '''
+    orjson Parser/Renderer가 DRF JSONParser/JSONRenderer와 같은 결과를 내는지 확인
+    '''
+
+    def parse(self, body, encoding='utf-8'):
+        return OrjsonParser().parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_parse(self):
+        body = json.dumps({'phone_number': '01000000000', 'name': '테스트'}, ensure_ascii=False).encode()
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body)))
+        self.assertEqual(self.parse('{"name": "é"}'.encode('latin-1'), 'latin-1'), {'name': 'é'})
+
+    def test_parse_error(self):
+        '''
+        형식이 틀린 JSON, NaN은 JSONParser처럼 ParseError(400)
+        '''
+        for body in [b'zzz', b'{"phone_number": ', b'{"a": NaN}', b'\xff']:
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_render(self):
+        data = {
+            'message': ['인증번호가 전송되었습니다.', ErrorDetail('필드 타입을 확인하세요', code='invalid')],
+            'lazy': _('This field is required.'),
+            'date_joined': timezone.now(),
+            'date': datetime.date(2022, 1, 1),
+            'amount': decimal.Decimal('1.50'),
+            'separator': 'a\u2028b\u2029c',
+            1: None,
+        }
+        self.assertEqual(OrjsonRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(OrjsonRenderer().render(None), b'')
+        # indent를 요청하면 JSONRenderer 사용
+        self.assertEqual(OrjsonRenderer().render(data, 'application/json; indent=4'),
+                         JSONRenderer().render(data, 'application/json; indent=4'))
+
+
+class SingleParseTestCase(APITestCase):
+    '''
+    View와 요청 수 제한(throttle)이 request.data로 본문을 한 번만 파싱하는지 확인
+    '''
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, url, data):
+        with mock.patch.object(JSONParser, 'parse', autospec=True, side_effect=JSONParser.parse) as parse:
+            response = self.client.post(url, json.dumps(data), content_type='application/json')
+        return response, parse.call_count
+
+    def test_sms_send(self):
+        response, count = self.post(reverse('sms_auth_send'), {'phone_number': '01000000000'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(count, 1)
+
+    def test_password_change(self):
+        User.objects.create_user(username='parser', password='old123456!', phone_number='01000000001')
+        response, count = self.post(reverse('password_change'), {
+            'username': 'parser', 'old_password': 'old123456!',
+            'new_password1': 'new123456zzz', 'new_password2': 'new123456zzz',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(count, 1)
+
+    def test_invalid_json(self):
+        '''
+        형식이 틀린 JSON은 500 대신 400
+        '''
+        for url in [reverse('sms_auth_send'), reverse('sms_auth_confirm'), reverse('sms_temp_password')]:
+            response = self.client.post(url, 'zzz', content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OrjsonViewTestCase(APITestCase):
+    '''
+    View의 Parser/Renderer를 orjson으로 바꿔도 응답이 같은지 확인
+    '''
+
+    def setUp(self):
+        cache.clear()
+        patches = [mock.patch.object(view, attr, [codec]) for view in
+                   [SMSAuthSendView, SMSAuthConfirmView, CustomPasswordChangeView]
+                   for attr, codec in [('parser_classes', OrjsonParser), ('renderer_classes', OrjsonRenderer)]]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_sms_auth(self):
+        response = self.client.post(reverse('sms_auth_send'), json.dumps({'phone_number': '01000000002'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content.decode(), '{"message":["인증번호가 전송되었습니다."]}')
+
+        response = self.client.post(reverse('sms_auth_confirm'),
+                                    json.dumps({'phone_number': '01000000002', 'auth_number': 'zzz'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        response = self.client.post(reverse('sms_auth_send'), 'zzz', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,122 @@
+import json
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import serializers, status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ..models import SmsAuth, User
+from ..phone import PhoneNumberSerializerField, normalize_phone_number, normalize_phone_numbers, np
+from .tests_throttling import NO_COOLDOWN, throttle_rates
+
+# (입력, 정규화한 값)
+CASES = [
+    ('01012345678', '01012345678'),
+    ('010-1234-5678', '01012345678'),
+    (' 010 1234 5678 ', '01012345678'),
+    ('(010) 1234.5678', '01012345678'),
+    ('+82 10-1234-5678', '01012345678'),
+    ('+82-010-1234-5678', '01012345678'),
+    ('011-123-4567', '0111234567'),
+    ('00011112222', None),
+    ('452', None),
+    ('', None),
+    ('+83 10-1234-5678', None),
+    ('010+1234-5678', None),
+    ('010-1234-5678a', None),
+    ('０１０１２３４５６７８', None),
+    ('010-1234-56789', None),
+    ('010' + '-' * 20 + '12345678', '01012345678'),
+    ('010\x1f12345678', None),
+]
+
+
+class NormalizePhoneNumberTestCase(SimpleTestCase):
+    '''
+    전화번호 정규화 테스트
+    '''
+
+    def test_normalize(self):
+        for value, expected in CASES:
+            self.assertEqual(normalize_phone_number(value), expected, value)
+        self.assertIsNone(normalize_phone_number(1012345678))
+        self.assertIsNone(normalize_phone_number(None))
+
+    def test_serializer_field(self):
+        field = PhoneNumberSerializerField()
+        self.assertEqual(field.run_validation('+82 10-1234-5678'), '01012345678')
+        # 구분자를 포함해도 입력이 너무 길면 형식 오류
+        for value in ['010' + '-' * 20 + '12345678', '010-1234']:
+            with self.assertRaises(serializers.ValidationError) as cm:
+                field.run_validation(value)
+            self.assertEqual(cm.exception.detail, ['전화번호 형식이 잘못되었습니다.'])
+
+    def test_bulk_list(self):
+        numbers, valid = normalize_phone_numbers([value for value, _ in CASES] + [None, 1012345678])
+        self.assertEqual(numbers, [expected for _, expected in CASES] + [None, None])
+        self.assertEqual(valid, [expected is not None for _, expected in CASES] + [False, False])
+        self.assertEqual(normalize_phone_numbers([]), ([], []))
+
+    @skipIf(np is None, 'numpy가 설치되지 않음')
+    def test_bulk_array(self):
+        '''
+        NumPy 배열은 같은 결과를 배열로 리턴(형식이 틀린 값은 빈 문자열)
+        '''
+        values = np.array([value for value, _ in CASES] * 2).reshape(2, -1)
+        numbers, valid = normalize_phone_numbers(values)
+        self.assertEqual(numbers.shape, values.shape)
+        self.assertEqual(numbers[1].tolist(), [expected or '' for _, expected in CASES])
+        self.assertEqual(valid[1].tolist(), [expected is not None for _, expected in CASES])
+        numbers, valid = normalize_phone_numbers(np.array([], dtype=str))
+        self.assertEqual((numbers.size, valid.size), (0, 0))
+
+
+class PhoneNumberFieldTestCase(TestCase):
+    '''
+    모델에는 정규화한 값으로 저장하고 조회
+    '''
+
+    def test_save_and_lookup(self):
+        user = User.objects.create(username='phone', phone_number='010-1234-5678')
+        self.assertEqual(user.phone_number, '01012345678')
+        self.assertEqual(User.objects.values_list('phone_number', flat=True).get(pk=user.pk), '01012345678')
+        self.assertEqual(User.objects.get(phone_number='+82 10 1234 5678'), user)
+        # 형식만 다른 같은 번호는 unique 제약에 걸림
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create(username='phone2', phone_number='010 1234 5678')
+
+        SmsAuth.objects.create(phone_number='010-1234-5678')
+        self.assertTrue(SmsAuth.objects.filter(pk='01012345678').exists())
+
+    def test_validation(self):
+        with self.assertRaises(ValidationError):
+            User(username='phone', phone_number='010-1234').clean_fields(exclude=['password'])
+
+
+@override_settings(REST_FRAMEWORK=throttle_rates(sms_send_phone='1/hour'), OTP=NO_COOLDOWN)
+class PhoneNumberViewTestCase(APITestCase):
+    '''
+    구분자를 넣어서 보내도 같은 번호로 인증, 요청 수 제한
+    '''
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def test_sms_auth(self):
+        self.assertEqual(self.post('sms_auth_send', {'phone_number': '010-5555-0000'}).status_code,
+                         status.HTTP_200_OK)
+        auth_number = SmsAuth.objects.get(phone_number='01055550000').auth_number
+        response = self.post('sms_auth_confirm', {'phone_number': '010 5555 0000', 'auth_number': auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.filter(phone_number='01055550000').exists())
+
+        # 형식만 다른 같은 번호는 같은 요청 수 제한 사용
+        response = self.post('sms_auth_send', {'phone_number': '01055550000'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
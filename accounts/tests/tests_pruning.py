@@ -0,0 +1,117 @@
+import datetime
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from ..models import PruneCursor, SmsAuth, User
+from ..pruning import Pruner, PruningScheduler
+
+
+def make_tokens(count, expired, prefix):
+    delta = datetime.timedelta(hours=-1 if expired else 1)
+    return [OutstandingToken.objects.create(jti=f'{prefix}-{i}', token='token', expires_at=timezone.now() + delta)
+            for i in range(count)]
+
+
+def make_sms_auth(phone_number, minutes_ago):
+    SmsAuth.objects.create(phone_number=phone_number)
+    SmsAuth.objects.filter(phone_number=phone_number).update(
+        modified=timezone.now() - datetime.timedelta(minutes=minutes_ago))
+
+
+class PrunerTestCase(TestCase):
+    '''
+    만료된 행을 기본 키 범위마다 삭제하는 Pruner 테스트
+    '''
+
+    def test_outstanding_token(self):
+        '''
+        만료된 토큰과 그 토큰의 blacklist만 삭제
+        '''
+        expired = make_tokens(5, True, 'expired')
+        valid = make_tokens(3, False, 'valid')
+        BlacklistedToken.objects.create(token=expired[0])
+        BlacklistedToken.objects.create(token=valid[0])
+
+        result, = Pruner(['outstanding_token'], batch_size=2).run()
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['rows'], 6)
+        self.assertEqual(result['deleted'], {'token_blacklist.BlacklistedToken': 1,
+                                             'token_blacklist.OutstandingToken': 5})
+        self.assertEqual(set(OutstandingToken.objects.values_list('jti', flat=True)),
+                         {token.jti for token in valid})
+        self.assertEqual(list(BlacklistedToken.objects.values_list('token_id', flat=True)), [valid[0].pk])
+
+    def test_sms_auth(self):
+        '''
+        유효시간이 지난 인증번호 중 같은 전화번호의 User가 없는 행만 삭제
+        '''
+        make_sms_auth('01000000000', 10)
+        make_sms_auth('01000000001', 10)
+        make_sms_auth('01000000002', 1)
+        User.objects.create(username='01000000001', phone_number='01000000001')
+
+        result, = Pruner(['sms_auth'], batch_size=2).run()
+        self.assertEqual(result['deleted'], {'accounts.SmsAuth': 1})
+        self.assertEqual(set(SmsAuth.objects.values_list('phone_number', flat=True)), {'01000000001', '01000000002'})
+
+    def test_resume(self):
+        '''
+        중간에 멈추면 진행 위치를 저장하고 다음 실행에서 이어서 진행
+        끝까지 진행하면 진행 위치를 지움
+        '''
+        tokens = make_tokens(6, True, 'expired')
+        result, = Pruner(['outstanding_token'], batch_size=2).run(max_batches=2)
+        self.assertFalse(result['complete'])
+        self.assertEqual(result['rows'], 4)
+        self.assertEqual(PruneCursor.objects.get(name='outstanding_token').position, str(tokens[3].pk))
+
+        result, = Pruner(['outstanding_token'], batch_size=2).run()
+        self.assertTrue(result['complete'])
+        self.assertEqual(result['resumed_from'], tokens[3].pk)
+        self.assertEqual(result['rows'], 2)
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(PruneCursor.objects.exists())
+
+    def test_stop_before_next_target(self):
+        '''
+        앞의 대상을 끝내지 못하면 다음 대상은 진행하지 않음
+        '''
+        make_tokens(4, True, 'expired')
+        make_sms_auth('01000000000', 10)
+        results = Pruner(batch_size=2).run(max_batches=1)
+        self.assertEqual([result['target'] for result in results], ['outstanding_token'])
+        self.assertTrue(SmsAuth.objects.exists())
+
+    def test_command(self):
+        make_tokens(3, True, 'expired')
+        out = StringIO()
+        call_command('prune_expired', target=['outstanding_token'], batch_size=2, stdout=out)
+        self.assertIn('outstanding_token: 3건 삭제', out.getvalue())
+        self.assertFalse(OutstandingToken.objects.exists())
+
+
+class PruningSchedulerTestCase(TransactionTestCase):
+    '''
+    프로세스 안에서 주기적으로 정리하는 스케줄러 테스트(별도 스레드의 DB 커넥션 사용)
+    '''
+
+    @override_settings(PRUNING={'BATCH_SIZE': 2})
+    def test_scheduler(self):
+        make_tokens(3, True, 'expired')
+        scheduler = PruningScheduler(interval=60)
+        scheduler.start()
+        try:
+            for _ in range(50):
+                if not OutstandingToken.objects.exists():
+                    break
+                time.sleep(0.1)
+            self.assertFalse(OutstandingToken.objects.exists())
+        finally:
+            scheduler.stop()
+            scheduler.join(5)
+        self.assertFalse(scheduler.is_alive())
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .. import sms
+from ..models import SmsAuth, User
+from ..serializers import CustomTokenObtainPairSerializer
+
+# 테스트가 끝나면 API별 실행된 SQL을 기록하는 파일(PR에서 쿼리 변경 내역을 확인하기 위해 저장소에 포함)
+ARTIFACT_PATH = os.environ.get('QUERY_BUDGET_ARTIFACT',
+                               os.path.join(os.path.dirname(__file__), 'query_budget.json'))
+
+
+class QueryRecorder:
+    '''
+        connection.execute_wrapper()로 실행되는 SQL을 파라미터 없이 기록
+        (값이 아닌 SQL 모양만 비교하기 위해 savepoint 이름도 통일)
+    '''
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(re.sub(r'"s\d+_x\d+"', '"<savepoint>"', sql))
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetTestCase(APITestCase):
+    '''
+    accounts API별 쿼리 수 테스트
+    각 API의 성공 / 실패 경우마다 실행되는 쿼리 수가 정해진 값(budget)과 같은지 확인하고
+    실행된 SQL은 query_budget.json에 기록
+    문자는 테스트 러너의 locmem 백엔드로 보내기 때문에 외부 연결 없이 실행
+    '''
+    recorded = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if not cls.recorded:
+            return
+        # 일부 테스트만 실행한 경우에도 나머지 기록은 유지
+        artifact = {}
+        if os.path.exists(ARTIFACT_PATH):
+            with open(ARTIFACT_PATH, encoding='utf-8') as f:
+                artifact = json.load(f)
+        artifact.update(cls.recorded)
+        with open(ARTIFACT_PATH, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write('\n')
+
+    def setUp(self):
+        # 토큰 버전 캐시가 이전 테스트의 값으로 남아있지 않도록 비우기
+        cache.clear()
+        sms.outbox = []
+        self.phone_number = '01000000000'
+        self.auth_number = SmsAuth.objects.create(phone_number=self.phone_number).auth_number
+        self.password = 'test123456'
+        self.user = User.objects.create_user(username='test', email='test@test.com', password=self.password,
+                                             nickname='test', phone_number=self.phone_number, name='테스트')
+        # 인증번호 확인만 하고 가입하지 않은 번호
+        self.verified_phone_number = '01000000001'
+        self.verified_auth_number = SmsAuth.objects.create(phone_number=self.verified_phone_number).auth_number
+        User.objects.create(username=self.verified_phone_number, phone_number=self.verified_phone_number)
+
+    def assertQueryBudget(self, name, budget, method, url, data=None, expected_status=status.HTTP_200_OK):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            if method == 'get':
+                response = self.client.get(url)
+            else:
+                response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        self.recorded[name] = {'budget': budget, 'queries': recorder.queries}
+        self.assertEqual(len(recorder.queries), budget,
+                         f'{name}: {len(recorder.queries)}개 쿼리 실행(예상 {budget}개)\n' +
+                         '\n'.join(recorder.queries))
+        return response
+
+    def get_tokens(self):
+        # 로그인 API와 같은 토큰(User 정보, 토큰 버전 claim 포함)
+        refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+        return str(refresh), str(refresh.access_token)
+
+    def test_sms_send(self):
+        url = reverse('sms_auth_send')
+        self.assertQueryBudget('sms/send: success', 4, 'post', url, {'phone_number': '01000000002'})
+        self.assertEqual(len(sms.outbox), 0)
+        self.assertQueryBudget('sms/send: invalid phone number', 0, 'post', url, {'phone_number': '0100'},
+                               status.HTTP_400_BAD_REQUEST)
+
+    def test_sms_confirm(self):
+        url = reverse('sms_auth_confirm')
+        new_phone_number = '01000000002'
+        new_auth_number = SmsAuth.objects.create(phone_number=new_phone_number).auth_number
+        self.assertQueryBudget('sms/confirm: success new user', 2, 'post', url,
+                               {'phone_number': new_phone_number, 'auth_number': new_auth_number})
+        self.assertQueryBudget('sms/confirm: success verified user', 1, 'post', url,
+                               {'phone_number': self.verified_phone_number,
+                                'auth_number': self.verified_auth_number})
+        self.assertQueryBudget('sms/confirm: registered user', 1, 'post', url,
+                               {'phone_number': self.phone_number, 'auth_number': self.auth_number},
+                               status.HTTP_400_BAD_REQUEST)
+        self.assertQueryBudget('sms/confirm: wrong auth number', 1, 'post', url,
+                               {'phone_number': self.verified_phone_number,
+                                'auth_number': 1000 if self.verified_auth_number != 1000 else 1001},
+                               status.HTTP_400_BAD_REQUEST)
+        self.assertQueryBudget('sms/confirm: not sent', 2, 'post', url,
+                               {'phone_number': '01000000009', 'auth_number': 1234},
+                               status.HTTP_400_BAD_REQUEST)
+
+    def test_sms_temp_password(self):
+        url = reverse('sms_temp_password')
+        self.assertQueryBudget('sms/temp-password: success', 2, 'post', url,
+                               {'phone_number': self.phone_number, 'auth_number': self.auth_number})
+        self.assertQueryBudget('sms/temp-password: not registered', 1, 'post', url,
+                               {'phone_number': self.verified_phone_number,
+                                'auth_number': self.verified_auth_number},
+                               status.HTTP_400_BAD_REQUEST)
+
+    def test_password_change(self):
+        url = reverse('password_change')
+        data = {'username': 'test', 'old_password': self.password,
+                'new_password1': 'new123456!', 'new_password2': 'new123456!'}
+        self.assertQueryBudget('password/change: success', 3, 'post', url, data)
+        self.assertQueryBudget('password/change: unknown username', 1, 'post', url,
+                               dict(data, username='nobody'), status.HTTP_400_BAD_REQUEST)
+        self.assertQueryBudget('password/change: wrong old password', 1, 'post', url,
+                               dict(data, old_password='wrong123456'), status.HTTP_400_BAD_REQUEST)
+
+    def test_token_obtain(self):
+        url = reverse('token_obtain_pair')
+        self.assertQueryBudget('token: success', 1, 'post', url,
+                               {'username': 'test', 'password': self.password})
+        self.assertQueryBudget('token: wrong password', 1, 'post', url,
+                               {'username': 'test', 'password': 'wrong123456'}, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_refresh(self):
+        url = reverse('token_refresh')
+        refresh, _ = self.get_tokens()
+        # 새 access token의 User 정보 claim을 만드는 User 조회에서 토큰 버전, blacklist도 같이 확인
+        self.assertQueryBudget('token/refresh: success', 1, 'post', url, {'refresh': refresh})
+        self.assertQueryBudget('token/refresh: invalid token', 0, 'post', url, {'refresh': 'ddd'},
+                               status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_verify(self):
+        url = reverse('token_verify')
+        refresh, access = self.get_tokens()
+        self.assertQueryBudget('token/verify: success', 1, 'post', url, {'token': access})
+        # 같은 토큰은 검증 결과 캐시로 응답
+        self.assertQueryBudget('token/verify: cached', 0, 'post', url, {'token': access})
+        self.assertQueryBudget('token/verify: invalid token', 0, 'post', url, {'token': 'ddd'},
+                               status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_details(self):
+        url = reverse('rest_user_details')
+        # claim이 없는 토큰은 DB에서 User 조회
+        access = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        self.assertQueryBudget('rest-auth/user: success', 1, 'get', url)
+        # 로그인으로 발급한 토큰은 claim으로 User를 만들어서 쿼리 없음
+        access = str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        self.assertQueryBudget('rest-auth/user: stateless', 0, 'get', url)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ddd')
+        self.assertQueryBudget('rest-auth/user: invalid token', 0, 'get', url,
+                               expected_status=status.HTTP_401_UNAUTHORIZED)
+
+    def test_signup(self):
+        url = reverse('rest_register')
+        data = {'username': 'test2', 'email': 'test2@test.com', 'password1': self.password,
+                'password2': self.password, 'nickname': 'test2', 'phone_number': self.verified_phone_number,
+                'name': '테스트이'}
+        self.assertQueryBudget('signup: success', 17, 'post', url, data, status.HTTP_201_CREATED)
+        self.assertQueryBudget('signup: already registered', 5, 'post', url,
+                               dict(data, username='test3', email='test3@test.com', nickname='test3',
+                                    phone_number=self.phone_number), status.HTTP_400_BAD_REQUEST)
+
+    def test_hashing_metrics(self):
+        url = reverse('hashing_metrics')
+        _, access = self.get_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        self.assertQueryBudget('metrics/hashing: not admin', 1, 'get', url,
+                               expected_status=status.HTTP_403_FORBIDDEN)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.assertQueryBudget('metrics/hashing: success', 1, 'get', url)
+
+    def test_token_verify_metrics(self):
+        url = reverse('token_verify_metrics')
+        _, access = self.get_tokens()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        self.assertQueryBudget('metrics/token-verify: not admin', 1, 'get', url,
+                               expected_status=status.HTTP_403_FORBIDDEN)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.assertQueryBudget('metrics/token-verify: success', 1, 'get', url)
@@ -0,0 +1,149 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..models import SmsAuth, User
+from ..routers import pin_primary, read_from_replica
+from ..serializers import CustomRegisterSerializer
+from ..tokens import VersionedRefreshToken, get_verified_token_cache
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICAS={'ALIASES': [REPLICA], 'PIN_SECONDS': 60})
+class PrimaryReplicaRouterTestCase(APITransactionTestCase):
+    '''
+    SQLite 파일 두 개(default = primary, replica)로 읽기 전용 replica 라우팅 테스트
+    복제는 하지 않기 때문에 replica에는 테스트에서 직접 저장한 행만 있음
+    replica 연결은 이 클래스에서만 추가하고(테스트 러너가 만드는 테스트 DB가 아님) 끝나면 삭제
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases[REPLICA] = dict(connections.databases['default'],
+                                              NAME=os.path.join(cls.directory, 'replica.sqlite3'))
+        call_command('migrate', database=REPLICA, interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        get_verified_token_cache().clear()
+
+    def tearDown(self):
+        call_command('flush', database=REPLICA, interactive=False, verbosity=0)
+        super().tearDown()
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def test_routing(self):
+        User.objects.create(username='primary')
+        User.objects.using(REPLICA).create(username='replica')
+        self.assertTrue(User.objects.filter(username='primary').exists())
+
+        with read_from_replica() as alias:
+            self.assertEqual(alias, REPLICA)
+            self.assertEqual(list(User.objects.values_list('username', flat=True)), ['replica'])
+            # 트랜잭션 안의 조회와 쓰기는 primary
+            with transaction.atomic():
+                self.assertTrue(User.objects.filter(username='primary').exists())
+            user = User.objects.get(username='replica')
+            user.name = 'primary'
+            user.save()
+        self.assertEqual(User.objects.get(username='replica').name, 'primary')
+        self.assertEqual(User.objects.using(REPLICA).get(username='replica').name, '')
+
+    def test_pin(self):
+        '''
+        최근에 쓰기를 한 전화번호, User의 조회는 primary
+        '''
+        pin_primary(phone_number='01011112222')
+        with read_from_replica(phone_number='01011112222') as alias:
+            self.assertIsNone(alias)
+        with read_from_replica(phone_number='01033334444', user_id=1) as alias:
+            self.assertEqual(alias, REPLICA)
+        with override_settings(DATABASE_REPLICAS={'ALIASES': []}):
+            cache.clear()
+            pin_primary(user_id=1)
+            self.assertEqual(cache.get('db-pin:user:1'), None)
+            with read_from_replica() as alias:
+                self.assertIsNone(alias)
+
+    def test_validate_reads_replica(self):
+        '''
+        회원가입 serializer의 중복 확인은 replica에서 조회
+        '''
+        User.objects.using(REPLICA).create(username='other', nickname='중복닉네임')
+        cache.clear()
+        serializer = CustomRegisterSerializer(data={'nickname': '중복닉네임', 'phone_number': '01055556666'})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['nickname'], ['이미 이 닉네임으로 등록된 사용자가 있습니다.'])
+
+        with override_settings(DATABASE_REPLICAS={'ALIASES': []}):
+            serializer = CustomRegisterSerializer(data={'nickname': '중복닉네임', 'phone_number': '01055556666'})
+            self.assertFalse(serializer.is_valid())
+            self.assertNotIn('nickname', serializer.errors)
+
+    def test_read_after_write(self):
+        '''
+        인증번호 저장(sms/send) 직후의 인증번호 확인(sms/confirm)은 primary에서 조회
+        pin 시간이 지나면 replica에서 조회(복제되지 않은 replica에는 인증번호가 없음)
+        '''
+        phone_number = '01077778888'
+        self.assertEqual(self.post('sms_auth_send', {'phone_number': phone_number}).status_code, status.HTTP_200_OK)
+        auth_number = SmsAuth.objects.get(pk=phone_number).auth_number
+        response = self.post('sms_auth_confirm', {'phone_number': phone_number, 'auth_number': auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(User.objects.using(REPLICA).exists())
+        self.assertEqual(User.objects.get(phone_number=phone_number).registration_state, User.STATE_VERIFIED)
+
+        cache.clear()
+        response = self.post('sms_auth_confirm', {'phone_number': phone_number, 'auth_number': auth_number})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('phone_number', response.data)
+
+    def test_token_verify(self):
+        '''
+        토큰 검증은 replica에서 조회하고, 토큰을 무효화한 User는 pin 시간 동안 primary에서 조회
+        '''
+        user = User.objects.create(username='verify', phone_number='01012340000')
+        User.objects.using(REPLICA).create(pk=user.pk, username='verify', phone_number='01012340000')
+        token = str(VersionedRefreshToken.for_user(user).access_token)
+        cache.clear()
+        self.assertEqual(self.post('token_verify', {'token': token}).status_code, status.HTTP_200_OK)
+
+        user.revoke_tokens()
+        self.assertEqual(self.post('token_verify', {'token': token}).status_code, status.HTTP_401_UNAUTHORIZED)
+        # pin이 없으면 복제되지 않은 replica의 이전 토큰 버전으로 검증
+        cache.clear()
+        self.assertEqual(self.post('token_verify', {'token': token}).status_code, status.HTTP_200_OK)
+
+    def test_user_details(self):
+        '''
+        claim이 없는 예전 토큰으로 내 정보를 조회하면 User는 replica에서 조회
+        '''
+        user = User.objects.using(REPLICA).create(username='details', phone_number='01043210000')
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(AccessToken.for_user(user)))
+        response = self.client.get(reverse('rest_user_details'))
+        self.assertEqual((response.status_code, response.data['username']), (status.HTTP_200_OK, 'details'))
+        self.assertFalse(User.objects.exists())
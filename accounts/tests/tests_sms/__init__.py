@@ -0,0 +1,4 @@
+from .tests_outbox import *
+from .tests_client import *
+from .tests_backends import *
+from .tests_dispatcher import *
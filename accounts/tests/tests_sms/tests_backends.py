@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ... import sms
+from ...models import SmsAuth, SmsOutbox
+from ...sms import SmsMessage, get_connection, send_sms
+from ...sms.backends.base import SmsSendError
+from ...sms.backends.latency import SmsBackend as LatencyBackend
+from ...sms.fake_sens import FakeSensServer
+from ...sms.worker import drain_outbox
+
+
+class SmsBackendTestCase(SimpleTestCase):
+    '''
+    SMS_BACKEND 테스트
+    '''
+
+    def setUp(self):
+        sms.outbox = []
+
+    def test_test_runner_use_locmem(self):
+        '''
+        테스트 중에는 locmem 백엔드 사용
+        '''
+        self.assertEqual(settings.SMS_BACKEND, 'accounts.sms.backends.locmem.SmsBackend')
+
+    def test_locmem_backend(self):
+        self.assertEqual(send_sms('01000000000', '테스트'), 1)
+        self.assertEqual(sms.outbox, [SmsMessage('01000000000', '테스트')])
+
+    def test_filebased_backend(self):
+        '''
+        filebased 백엔드는 한 줄에 하나씩 JSON으로 저장
+        '''
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'sms', 'messages.jsonl')
+            with override_settings(SMS_BACKEND='accounts.sms.backends.filebased.SmsBackend',
+                                   SMS_FILE_PATH=file_path):
+                connection = get_connection()
+                connection.send_messages([SmsMessage('01000000000', '첫번째'), SmsMessage('01000000001', '두번째')])
+                send_sms('01000000002', '세번째')
+            with open(file_path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual([(line['to'], line['content']) for line in lines],
+                         [('01000000000', '첫번째'), ('01000000001', '두번째'), ('01000000002', '세번째')])
+
+    def test_sens_backend(self):
+        with FakeSensServer() as sens, override_settings(SENS_API_URL=sens.url):
+            connection = get_connection('accounts.sms.backends.sens.SmsBackend')
+            self.assertEqual(connection.send_messages([SmsMessage('01000000000', '테스트')]), 1)
+            self.assertEqual(sens.messages, [{'to': '01000000000', 'content': '테스트'}])
+
+    def test_latency_backend_percentiles(self):
+        '''
+        latency 백엔드의 지연 시간 분포가 설정한 p50, p99에 가까운지 확인
+        '''
+        backend = LatencyBackend(p50=0.1, p99=1.0, seed=1)
+        delays = sorted(backend.sample_delay() for _ in range(20000))
+        self.assertAlmostEqual(delays[len(delays) // 2], 0.1, delta=0.01)
+        self.assertAlmostEqual(delays[int(len(delays) * 0.99)], 1.0, delta=0.15)
+
+    def test_latency_backend_error_rate(self):
+        backend = LatencyBackend(p50=0, p99=0, error_rate=1.0)
+        with self.assertRaises(SmsSendError):
+            backend.send_messages([SmsMessage('01000000000', '테스트')])
+        self.assertEqual(LatencyBackend(p50=0, p99=0, error_rate=1.0, fail_silently=True).send_messages(
+            [SmsMessage('01000000000', '테스트')]), 0)
+        self.assertEqual(LatencyBackend(p50=0, p99=0, error_rate=0).send_messages(
+            [SmsMessage('01000000000', '테스트')]), 1)
+
+
+class SmsBackendWorkerTestCase(TestCase):
+    '''
+    outbox 워커는 SMS_BACKEND로 문자 전송
+    '''
+
+    def setUp(self):
+        sms.outbox = []
+
+    def test_worker_use_backend(self):
+        sms_auth = SmsAuth.objects.create(phone_number='01000000000')
+        drain_outbox(workers=1)
+        self.assertEqual(sms.outbox, [SmsMessage('01000000000', sms_auth.get_message())])
+        self.assertEqual(SmsOutbox.objects.get().status, SmsOutbox.STATUS_SENT)
+
+    @override_settings(SMS_BACKEND='accounts.sms.backends.latency.SmsBackend',
+                       SMS_LATENCY={'P50': 0, 'P99': 0, 'ERROR_RATE': 1.0})
+    def test_worker_retry_backend_error(self):
+        SmsAuth.objects.create(phone_number='01000000000')
+        drain_outbox(workers=1)
+        outbox = SmsOutbox.objects.get()
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_PENDING)
+        self.assertIn('지연 시뮬레이터', outbox.last_error)
@@ -0,0 +1,187 @@
+import datetime
+import threading
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ...models import SmsCampaign, User
+from ...sms import campaign as campaign_module
+from ...sms.campaign import claim_campaign, run_campaign
+from ...sms.fake_sens import FakeSensServer
+
+RETRY_NOW = {'RETRY_DELAY': 0, 'MAX_ATTEMPTS': 2}
+
+
+def create_users(count, **fields):
+    User.objects.bulk_create([User(username=f'campaign{i}', phone_number=f'0103000{i:04d}', **fields)
+                              for i in range(count)])
+
+
+@override_settings(SMS_CAMPAIGN=RETRY_NOW)
+class SmsCampaignSendTestCase(TestCase):
+    '''
+    공지 문자를 가짜 SENS 서버로 나눠서 보내고 진행 상황을 저장하는지 테스트
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sens = FakeSensServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sens.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.sens.reset()
+        self.settings_override = override_settings(SENS_API_URL=self.sens.url,
+                                                   SMS_BACKEND='accounts.sms.backends.sens.SmsBackend')
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def test_send_all(self):
+        create_users(25, registration_state=User.STATE_REGISTERED)
+        # 전화번호가 없는 User, 조건에 맞지 않는 User는 제외
+        User.objects.create(username='admin')
+        User.objects.create(username='pending', phone_number='01099990000')
+        campaign = SmsCampaign.objects.create(content='공지', filters={'registration_state': 'registered'})
+
+        self.assertEqual(claim_campaign().pk, campaign.pk)
+        self.assertIsNone(claim_campaign())
+        campaign.refresh_from_db()
+        self.assertTrue(run_campaign(campaign, chunk_size=10, concurrency=2))
+
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.sent, campaign.failed), (SmsCampaign.STATUS_DONE, 25, 0))
+        self.assertEqual(campaign.cursor, '01030000024')
+        self.assertIsNotNone(campaign.finished_at)
+        # 10명씩 요청 하나로 전송
+        self.assertEqual(sorted(len(request['body']['messages']) for request in self.sens.requests), [5, 10, 10])
+        self.assertEqual(sorted(message['to'] for message in self.sens.messages),
+                         [f'0103000{i:04d}' for i in range(25)])
+
+    def test_resume(self):
+        '''
+        배치마다 저장한 cursor 다음 번호부터 이어서 전송(이미 보낸 번호는 다시 보내지 않음)
+        '''
+        create_users(30)
+        campaign = SmsCampaign.objects.create(content='공지')
+        stop_event = threading.Event()
+        save_progress = campaign_module.save_progress
+
+        def stop_after_first_batch(*args, **kwargs):
+            stop_event.set()
+            return save_progress(*args, **kwargs)
+
+        campaign_module.save_progress = stop_after_first_batch
+        try:
+            self.assertFalse(run_campaign(claim_campaign(), stop_event, chunk_size=5, concurrency=2))
+        finally:
+            campaign_module.save_progress = save_progress
+        campaign.refresh_from_db()
+        # 종료 신호로 멈추면 선점을 해제해서 바로 다시 가져갈 수 있음
+        self.assertEqual((campaign.status, campaign.cursor, campaign.sent),
+                         (SmsCampaign.STATUS_PENDING, '01030000009', 10))
+
+        out = StringIO()
+        call_command('send_sms_campaigns', campaign=campaign.pk, chunk_size=5, concurrency=2, stdout=out)
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.sent), (SmsCampaign.STATUS_DONE, 30))
+        received = [message['to'] for message in self.sens.messages]
+        self.assertEqual(sorted(received), [f'0103000{i:04d}' for i in range(30)])
+        self.assertIn('성공 30, 실패 0', out.getvalue())
+
+    def test_expired_lease(self):
+        '''
+        워커가 죽어서 선점 시간이 지난 캠페인은 다른 워커가 이어서 전송
+        '''
+        create_users(3)
+        now = timezone.now()
+        campaign = SmsCampaign.objects.create(content='공지', status=SmsCampaign.STATUS_SENDING, cursor='01030000000',
+                                              sent=1, lease_until=now + datetime.timedelta(seconds=60))
+        self.assertIsNone(claim_campaign())
+        SmsCampaign.objects.filter(pk=campaign.pk).update(lease_until=now - datetime.timedelta(seconds=1))
+        claimed = claim_campaign()
+        self.assertTrue(run_campaign(claimed))
+        self.assertEqual(claimed.sent, 3)
+        self.assertEqual(sorted(message['to'] for message in self.sens.messages), ['01030000001', '01030000002'])
+
+    def test_lost_lease(self):
+        '''
+        선점 시간이 지나서 다른 워커가 가져간 캠페인은 진행 상황을 덮어쓰지 않고 멈춤
+        '''
+        create_users(3)
+        campaign = claim_campaign(SmsCampaign.objects.create(content='공지').pk)
+        SmsCampaign.objects.filter(pk=campaign.pk).update(lease_until=timezone.now())
+        with self.assertLogs('accounts.sms.campaign', 'WARNING'):
+            self.assertFalse(run_campaign(campaign))
+        self.assertEqual(SmsCampaign.objects.get(pk=campaign.pk).sent, 0)
+
+    def test_retry(self):
+        '''
+        5xx로 실패한 요청은 다시 보내고, MAX_ATTEMPTS번 모두 실패하면 실패 수에 기록
+        '''
+        create_users(4)
+        campaign = SmsCampaign.objects.create(content='공지')
+        self.sens.fail_next(1, 500)
+        self.assertTrue(run_campaign(claim_campaign(), chunk_size=2, concurrency=1))
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.sent, campaign.failed), (4, 0))
+
+        self.sens.reset()
+        campaign = SmsCampaign.objects.create(content='공지')
+        self.sens.fail_next(2, 503)
+        with self.assertLogs('accounts.sms.campaign', 'WARNING') as logs:
+            self.assertTrue(run_campaign(claim_campaign(), chunk_size=2, concurrency=1))
+        self.assertEqual(len(logs.records), 2)
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.sent, campaign.failed), (2, 2))
+        self.assertEqual(len(self.sens.requests), 3)
+
+
+class SmsCampaignViewTestCase(APITestCase):
+    '''
+    공지 문자 등록, 진행 상황 API(관리자만 가능)
+    '''
+
+    def setUp(self):
+        self.admin = User.objects.create(username='staff', is_staff=True)
+        create_users(3, registration_state=User.STATE_REGISTERED)
+
+    def test_permission(self):
+        self.client.force_authenticate(User.objects.get(username='campaign0'))
+        response = self.client.post(reverse('sms_campaign'), {'content': '공지'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(SmsCampaign.objects.exists())
+
+    def test_create(self):
+        self.client.force_authenticate(self.admin)
+        data = {'content': '공지', 'filters': {'registration_state': 'registered',
+                                              'date_joined__gte': '2020-01-01T00:00:00Z'}}
+        response = self.client.post(reverse('sms_campaign'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data['status'], response.data['total']), ('pending', 3))
+        campaign = SmsCampaign.objects.get(pk=response.data['id'])
+        self.assertEqual(campaign.created_by, self.admin)
+        self.assertEqual(campaign.filters['registration_state'], 'registered')
+        # 저장한 조건으로 다시 조회할 수 있음
+        self.assertEqual(campaign_module.get_recipient_queryset(campaign.filters).count(), 3)
+
+        response = self.client.get(reverse('sms_campaign_detail', args=[campaign.pk]))
+        self.assertEqual((response.status_code, response.data['sent']), (status.HTTP_200_OK, 0))
+        self.assertEqual(len(self.client.get(reverse('sms_campaign')).data), 1)
+
+    def test_invalid_filters(self):
+        self.client.force_authenticate(self.admin)
+        data = {'content': '공지', 'filters': {'password__startswith': 'argon2'}}
+        response = self.client.post(reverse('sms_campaign'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['filters'], {'password__startswith': ['지원하지 않는 조건입니다.']})
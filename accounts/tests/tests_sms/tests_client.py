@@ -0,0 +1,124 @@
+import base64
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from ...sms.client import SensClient, get_client
+from ...sms.fake_sens import FakeSensServer
+
+
+class SensClientTestCase(SimpleTestCase):
+    '''
+    SensClient 테스트
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sens = FakeSensServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sens.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.sens.reset()
+        self.client = SensClient('access', 'secret', 'service', '01011112222', self.sens.url)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_make_signature(self):
+        '''
+        캐시한 HMAC 키로 만든 서명이 매번 새로 만든 서명과 같은지 확인
+        '''
+        message = b'POST /sms/v2/services/service/messages\n1234\naccess'
+        expected = base64.b64encode(hmac.new(b'secret', message, digestmod=hashlib.sha256).digest())
+        self.assertEqual(self.client.make_signature(message), expected)
+        self.assertEqual(self.client.make_signature(message), expected)
+
+    def test_send(self):
+        '''
+        fake SENS 서버로 전송 성공
+        '''
+        self.client.send('01000000000', '테스트')
+        self.assertEqual(self.sens.messages, [{'to': '01000000000', 'content': '테스트'}])
+        headers = self.sens.requests[0]['headers']
+        self.assertEqual(headers['x-ncp-iam-access-key'], 'access')
+        self.assertEqual(self.sens.requests[0]['body']['from'], '01011112222')
+        self.assertEqual(self.client.stats['requests'], 1)
+
+    def test_send_fail(self):
+        '''
+        SENS가 에러로 응답하면 HTTPError 발생
+        '''
+        self.sens.fail_next(1, status=500)
+        with self.assertRaises(requests.HTTPError):
+            self.client.send('01000000000', '테스트')
+        self.assertEqual(self.client.stats['errors'], 1)
+
+    def test_concurrent_stats(self):
+        '''
+        여러 스레드에서 동시에 보내도 요청 수, 에러 수를 빠짐없이 기록
+        '''
+        self.sens.fail_next(5, status=500)
+
+        def send(i):
+            try:
+                self.client.send(f'010000000{i:02d}', '테스트')
+            except requests.HTTPError:
+                pass
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(send, range(40)))
+        self.assertEqual(self.client.stats['requests'], 40)
+        self.assertEqual(self.client.stats['errors'], 5)
+
+    def test_read_timeout(self):
+        '''
+        응답이 read timeout보다 늦으면 Timeout 발생
+        '''
+        client = SensClient('access', 'secret', 'service', '01011112222', self.sens.url, read_timeout=0.05)
+        self.sens.latency = 0.5
+        try:
+            with self.assertRaises(requests.Timeout):
+                client.send('01000000000', '테스트')
+        finally:
+            self.sens.latency = 0
+            client.close()
+
+    def test_session_reuse(self):
+        '''
+        같은 프로세스에서는 세션을 재사용하고 fork 후에는 새로 만들기
+        '''
+        session = self.client.session
+        self.client.send('01000000000', '테스트')
+        self.client.send('01000000001', '테스트')
+        self.assertIs(self.client.session, session)
+        with mock.patch('accounts.sms.client.os.getpid', return_value=-1):
+            self.assertIsNot(self.client.session, session)
+
+
+class GetClientTestCase(SimpleTestCase):
+    '''
+    get_client 테스트
+    '''
+
+    def test_get_client_singleton(self):
+        self.assertIs(get_client(), get_client())
+        self.assertEqual(get_client().base_url, settings.SENS_API_URL)
+
+    def test_get_client_reset(self):
+        '''
+        SENS 설정이 바뀌면 클라이언트를 새로 만들기
+        '''
+        client = get_client()
+        with override_settings(SENS_API_URL='http://127.0.0.1:1'):
+            self.assertIsNot(get_client(), client)
+            self.assertEqual(get_client().base_url, 'http://127.0.0.1:1')
@@ -0,0 +1,152 @@
+import threading
+
+import requests
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ...models import SmsAuth, SmsOutbox
+from ...sms import SmsMessage, get_connection
+from ...sms.dispatcher import BatchingDispatcher
+from ...sms.fake_sens import FakeSensServer
+from ...sms.worker import adrain_outbox, drain_outbox
+
+SENS_BACKEND = 'accounts.sms.backends.sens.SmsBackend'
+
+
+class SensBatchTestCase(SimpleTestCase):
+    '''
+    SENS 백엔드의 여러 수신자 한 번에 보내기 테스트
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sens = FakeSensServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sens.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.sens.reset()
+        self.settings_override = override_settings(SENS_API_URL=self.sens.url, SMS_BACKEND=SENS_BACKEND)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def test_send_batch_one_request(self):
+        '''
+        메시지마다 내용이 달라도 한 번의 요청으로 전송
+        '''
+        messages = [SmsMessage(f'0100000000{i}', f'인증번호 [{1000 + i}]') for i in range(5)]
+        results = get_connection().send_batch(messages)
+        self.assertEqual(results, [None] * 5)
+        self.assertEqual(len(self.sens.requests), 1)
+        self.assertEqual(self.sens.messages, [{'to': m.to, 'content': m.content} for m in messages])
+
+    @override_settings(SMS_BATCH={'MAX_SIZE': 2})
+    def test_send_batch_max_size(self):
+        messages = [SmsMessage(f'0100000000{i}', '테스트') for i in range(5)]
+        get_connection().send_batch(messages)
+        self.assertEqual([len(r['body']['messages']) for r in self.sens.requests], [2, 2, 1])
+
+    def test_send_batch_invalid_recipient(self):
+        '''
+        잘못된 수신자 때문에 요청이 실패하면 해당 수신자만 실패로 기록
+        '''
+        messages = [SmsMessage('01000000000', '테스트'), SmsMessage('0100000000x', '테스트'),
+                    SmsMessage('01000000002', '테스트')]
+        results = get_connection().send_batch(messages)
+        self.assertIsNone(results[0])
+        self.assertIsInstance(results[1], requests.HTTPError)
+        self.assertIsNone(results[2])
+        self.assertEqual([m['to'] for m in self.sens.messages], ['01000000000', '01000000002'])
+
+    def test_send_batch_server_error(self):
+        '''
+        서버 에러는 묶어서 보낸 수신자 모두 실패
+        '''
+        self.sens.fail_next(1, status=503)
+        results = get_connection().send_batch([SmsMessage('01000000000', 'a'), SmsMessage('01000000001', 'b')])
+        self.assertTrue(all(isinstance(result, requests.HTTPError) for result in results))
+        self.assertEqual(len(self.sens.requests), 1)
+
+    def test_dispatcher_coalesce(self):
+        '''
+        여러 스레드에서 동시에 보낸 문자가 하나의 요청으로 합쳐지는지 확인
+        '''
+        dispatcher = BatchingDispatcher(window=0.2, max_size=100)
+        futures = []
+        lock = threading.Lock()
+
+        def submit(i):
+            future = dispatcher.submit(SmsMessage(f'0100000000{i}', f'내용{i}'))
+            with lock:
+                futures.append(future)
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(future.result(timeout=5) for future in futures))
+        dispatcher.close()
+        self.assertEqual(len(self.sens.requests), 1)
+        self.assertEqual(len(self.sens.messages), 8)
+
+    def test_dispatcher_max_size(self):
+        dispatcher = BatchingDispatcher(window=10, max_size=3)
+        futures = [dispatcher.submit(SmsMessage(f'0100000000{i}', '테스트')) for i in range(7)]
+        dispatcher.flush()
+        for future in futures:
+            future.result(timeout=5)
+        dispatcher.close()
+        self.assertEqual(sorted(len(r['body']['messages']) for r in self.sens.requests), [1, 3, 3])
+
+    def test_dispatcher_failure_mapping(self):
+        dispatcher = BatchingDispatcher(window=0.05)
+        ok = dispatcher.submit(SmsMessage('01000000000', '테스트'))
+        bad = dispatcher.submit(SmsMessage('0100000000x', '테스트'))
+        self.assertTrue(ok.result(timeout=5))
+        with self.assertRaises(requests.HTTPError):
+            bad.result(timeout=5)
+        dispatcher.close()
+
+
+class OutboxBatchTestCase(TestCase):
+    '''
+    outbox 워커가 여러 건을 묶어서 보내고 수신자별 결과를 outbox 행에 기록하는지 테스트
+    '''
+
+    def test_drain_batch(self):
+        with FakeSensServer() as sens, override_settings(SENS_API_URL=sens.url, SMS_BACKEND=SENS_BACKEND):
+            for i in range(3):
+                SmsAuth.objects.create(phone_number=f'0100000000{i}')
+            SmsOutbox.objects.create(phone_number='0100000000x', content='테스트')
+            self.assertEqual(drain_outbox(workers=1), 4)
+            self.assertEqual(len(sens.messages), 3)
+
+        self.assertEqual(SmsOutbox.objects.filter(status=SmsOutbox.STATUS_SENT).count(), 3)
+        failed = SmsOutbox.objects.get(phone_number='0100000000x')
+        self.assertEqual(failed.status, SmsOutbox.STATUS_PENDING)
+        self.assertNotEqual(failed.last_error, '')
+
+    async def test_adrain_batch(self):
+        '''
+        비동기 워커도 같은 결과를 outbox 행에 기록하는지 확인
+        '''
+        with FakeSensServer() as sens, override_settings(SENS_API_URL=sens.url, SMS_BACKEND=SENS_BACKEND):
+            for i in range(3):
+                await sync_to_async(SmsAuth.objects.create)(phone_number=f'0100000000{i}')
+            await sync_to_async(SmsOutbox.objects.create)(phone_number='0100000000x', content='테스트')
+            connection = get_connection()
+            try:
+                self.assertEqual(await adrain_outbox(connection), 4)
+            finally:
+                await connection.aclose()
+            self.assertEqual(len(sens.messages), 3)
+
+        sent = await sync_to_async(SmsOutbox.objects.filter(status=SmsOutbox.STATUS_SENT).count)()
+        self.assertEqual(sent, 3)
@@ -0,0 +1,149 @@
+import datetime
+import json
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ...models import SmsAuth, SmsOutbox
+from ...sms.fake_sens import FakeSensServer
+from ...sms.worker import drain_outbox, get_backoff
+
+
+class SmsOutboxTestCase(TestCase):
+    '''
+    SmsAuth 저장 시 outbox에 쌓이고 워커가 전송하는지 테스트
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sens = FakeSensServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sens.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.sens.reset()
+        self.phone_number = '01000000000'
+        self.settings_override = override_settings(SENS_API_URL=self.sens.url,
+                                                   SMS_BACKEND='accounts.sms.backends.sens.SmsBackend')
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def test_save_enqueue_without_send(self):
+        '''
+        SmsAuth를 저장하면 outbox에 대기 상태로 쌓이고 바로 전송하지 않음
+        '''
+        sms_auth = SmsAuth.objects.create(phone_number=self.phone_number)
+        outbox = SmsOutbox.objects.get(phone_number=self.phone_number)
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_PENDING)
+        self.assertIn(str(sms_auth.auth_number), outbox.content)
+        self.assertEqual(self.sens.requests, [])
+
+    def test_drain_success(self):
+        '''
+        워커가 outbox를 비우면 가짜 SENS 서버로 전송되고 sent 상태로 변경
+        '''
+        sms_auth = SmsAuth.objects.create(phone_number=self.phone_number)
+        self.assertEqual(drain_outbox(workers=1), 1)
+
+        outbox = SmsOutbox.objects.get(phone_number=self.phone_number)
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_SENT)
+        self.assertEqual(outbox.attempts, 1)
+        self.assertIsNotNone(outbox.sent_at)
+        self.assertEqual(self.sens.messages, [{'to': self.phone_number, 'content': sms_auth.get_message()}])
+
+        # 이미 보낸 문자는 다시 보내지 않음
+        self.assertEqual(drain_outbox(workers=1), 0)
+        self.assertEqual(len(self.sens.requests), 1)
+
+    def test_drain_retry_backoff(self):
+        '''
+        전송 실패 시 backoff 시간 뒤에 다시 시도
+        '''
+        SmsAuth.objects.create(phone_number=self.phone_number)
+        self.sens.fail_next(1, status=500)
+        drain_outbox(workers=1)
+
+        outbox = SmsOutbox.objects.get(phone_number=self.phone_number)
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_PENDING)
+        self.assertEqual(outbox.attempts, 1)
+        self.assertNotEqual(outbox.last_error, '')
+        self.assertGreater(outbox.next_attempt_at, timezone.now())
+
+        # backoff 시간 전에는 다시 보내지 않음
+        self.assertEqual(drain_outbox(workers=1), 0)
+
+        # backoff 시간이 지나면 다시 전송
+        SmsOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(workers=1), 1)
+        outbox.refresh_from_db()
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_SENT)
+        self.assertEqual(outbox.attempts, 2)
+
+    @override_settings(SMS_OUTBOX={'MAX_ATTEMPTS': 2})
+    def test_drain_give_up(self):
+        '''
+        최대 시도 횟수를 넘기면 failed 상태로 변경
+        '''
+        SmsAuth.objects.create(phone_number=self.phone_number)
+        self.sens.fail_next(2, status=500)
+        drain_outbox(workers=1)
+        SmsOutbox.objects.update(next_attempt_at=timezone.now())
+        drain_outbox(workers=1)
+
+        outbox = SmsOutbox.objects.get(phone_number=self.phone_number)
+        self.assertEqual(outbox.status, SmsOutbox.STATUS_FAILED)
+        self.assertEqual(drain_outbox(workers=1), 0)
+
+    def test_reclaim_stale_sending(self):
+        '''
+        전송 중에 워커가 죽어서 선점 시간이 지난 행은 다시 전송
+        '''
+        SmsAuth.objects.create(phone_number=self.phone_number)
+        SmsOutbox.objects.update(status=SmsOutbox.STATUS_SENDING,
+                                 next_attempt_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(drain_outbox(workers=1), 1)
+        self.assertEqual(SmsOutbox.objects.get().status, SmsOutbox.STATUS_SENT)
+
+    def test_backoff(self):
+        '''
+        backoff 시간은 2배씩 늘어나고 BACKOFF_MAX를 넘지 않음
+        '''
+        self.assertEqual(get_backoff(1), 2)
+        self.assertEqual(get_backoff(2), 4)
+        self.assertEqual(get_backoff(3), 8)
+        self.assertEqual(get_backoff(100), 300)
+
+    def test_command_once(self):
+        '''
+        send_sms_outbox --once 명령어로 outbox 비우기
+        '''
+        SmsAuth.objects.create(phone_number=self.phone_number)
+        SmsAuth.objects.create(phone_number='01000000001')
+        call_command('send_sms_outbox', '--once', '--workers', '1', stdout=open('/dev/null', 'w'))
+        self.assertEqual(SmsOutbox.objects.filter(status=SmsOutbox.STATUS_SENT).count(), 2)
+        self.assertEqual(len(self.sens.messages), 2)
+
+
+class SmsAuthSendOutboxTestCase(APITestCase):
+    '''
+    인증번호 발송 API는 outbox에 저장만 하고 바로 응답
+    '''
+
+    def test_sms_send_view_enqueue(self):
+        url = reverse('sms_auth_send')
+        data = json.dumps({'phone_number': '01000000000'})
+        with FakeSensServer() as sens, override_settings(SENS_API_URL=sens.url):
+            response = self.client.post(url, data, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(sens.requests, [])
+        self.assertEqual(SmsOutbox.objects.filter(phone_number='01000000000').count(), 1)
@@ -0,0 +1,183 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
+
+from .. import sms
+from ..models import SmsOutbox
+from ..otp import get_otp_store
+from ..throttling import SlidingWindowRateThrottle
+
+
+def throttle_rates(**rates):
+    rates = dict({'sms_send_phone': None, 'sms_send_ip': None, 'sms_send': None}, **rates)
+    return dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=rates)
+
+
+# 같은 번호로 바로 다시 보내도 새로 발송하도록 재발송 대기 시간을 끈 설정(요청 수 제한만 확인)
+NO_COOLDOWN = dict(settings.OTP, RESEND_COOLDOWN=0)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestThrottle(SlidingWindowRateThrottle):
+    rate = '2/min'
+
+    def get_cache_key(self, request, view):
+        return 'throttle_test'
+
+
+class SlidingWindowRateThrottleTestCase(SimpleTestCase):
+    '''
+    구간별 요청 수와 이전 구간의 가중 합으로 제한하는 throttle 테스트
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock(600.0)
+        self.request = APIRequestFactory().post('/')
+
+    def allow(self):
+        throttle = TestThrottle()
+        throttle.timer = self.clock
+        return throttle.allow_request(self.request, None), throttle
+
+    def test_sliding_window(self):
+        '''
+        1. 구간 안에서 비율만큼 허용하고 초과하면 기다릴 시간 리턴
+        2. 다음 구간에서는 이전 구간의 요청이 지난 시간 비율만큼 빠지면서 허용
+        '''
+        self.assertTrue(self.allow()[0])
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 90)
+
+        # 다음 구간 시작: 이전 구간의 요청 2개가 그대로 걸쳐 있음
+        self.clock.now = 660.0
+        self.assertFalse(self.allow()[0])
+        # 다음 구간의 절반: 이전 구간의 요청은 1개로 계산
+        self.clock.now = 690.0
+        self.assertTrue(self.allow()[0])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 30)
+
+    def test_rejected_not_counted(self):
+        '''
+        제한에 걸린 요청은 요청 수에 포함하지 않음
+        '''
+        self.allow()
+        self.allow()
+        for _ in range(5):
+            self.allow()
+        self.assertEqual(self.allow()[1].current, 2)
+
+
+class SmsSendThrottleViewTestCase(APITestCase):
+    '''
+    인증번호 발송 API의 전화번호별, IP별, 전체 요청 수 제한
+    '''
+
+    def setUp(self):
+        cache.clear()
+        sms.outbox = []
+        self.url = reverse('sms_auth_send')
+
+    def send(self, phone_number, url=None, **extra):
+        data = json.dumps({'phone_number': phone_number})
+        return self.client.post(url or self.url, data, content_type='application/json', **extra)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send_phone='2/hour'), OTP=NO_COOLDOWN)
+    def test_phone_number(self):
+        '''
+        같은 전화번호는 제한에 걸리면 DB 조회, outbox 저장 없이 429 + Retry-After
+        다른 전화번호는 그대로 발송
+        '''
+        self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.send('01000000000')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(SmsOutbox.objects.filter(phone_number='01000000000').count(), 2)
+        self.assertEqual(self.send('01000000001').status_code, status.HTTP_200_OK)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send_phone='2/hour'), OTP=dict(settings.OTP, RESEND_COOLDOWN=60))
+    def test_cooldown_not_counted(self):
+        '''
+        재발송 대기 시간 안에 여러 번 보낸 요청은 전화번호별 요청 수에 포함하지 않아서
+        대기 시간이 지난 뒤의 재발송은 그대로 허용
+        '''
+        for _ in range(5):
+            self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        self.assertEqual(SmsOutbox.objects.filter(phone_number='01000000000').count(), 1)
+        # 재발송 대기 시간이 지남
+        cache.delete(get_otp_store().get_cooldown_key('01000000000'))
+        response = self.send('01000000000')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('resend_after', response.json())
+        self.assertEqual(SmsOutbox.objects.filter(phone_number='01000000000').count(), 2)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send_ip='2/hour'))
+    def test_client_ip(self):
+        self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000001').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000002').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.send('01000000003', REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_200_OK)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send='2/min'))
+    def test_global(self):
+        self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000001', REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000002', REMOTE_ADDR='10.0.0.3').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send_ip='2/min', sms_send='5/min'))
+    def test_rejected_not_counted_globally(self):
+        '''
+        IP 제한에 걸린 요청은 전체 요청 수를 사용하지 않음(다른 IP의 요청은 그대로 발송)
+        '''
+        for i in range(10):
+            self.send(f'0100000000{i}')
+        for i, remote_addr in enumerate(['10.0.0.2', '10.0.0.3', '10.0.0.4']):
+            self.assertEqual(self.send(f'0100000001{i}', REMOTE_ADDR=remote_addr).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.send('01000000020', REMOTE_ADDR='10.0.0.5').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class AsyncSmsSendThrottleViewTestCase(APITransactionTestCase):
+    '''
+    비동기 발송 API의 요청 수 제한
+    View의 DB 작업은 테스트와 다른 스레드(다른 DB 연결)에서 실행되기 때문에 커밋된 데이터로 테스트
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('sms_auth_send_async')
+
+    def send(self, phone_number, url=None):
+        data = json.dumps({'phone_number': phone_number})
+        return self.client.post(url or self.url, data, content_type='application/json')
+
+    @override_settings(REST_FRAMEWORK=throttle_rates(sms_send_phone='1/hour'), OTP=NO_COOLDOWN)
+    def test_async_view(self):
+        '''
+        비동기 발송 API도 동기 API와 같은 제한 사용
+        '''
+        self.assertEqual(self.send('01000000000').status_code, status.HTTP_200_OK)
+        response = self.send('01000000000')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.send('01000000000', reverse('sms_auth_send')).status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,251 @@
+import json
+import time
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import User
+from ..serializers import CustomPasswordChangeSerializer
+from ..tokens import TOKEN_VERSION_CLAIM, VerifiedTokenCache, get_verified_token_cache
+
+SHARED_CACHE = {'CACHE_ALIAS': 'default', 'LOCAL_TTL': 60}
+
+
+def fake_token(jti, seconds=60):
+    # exp, jti만 사용하기 때문에 dict로 대신함
+    return {'exp': time.time() + seconds, 'jti': jti}
+
+
+class VerifiedTokenCacheTestCase(SimpleTestCase):
+    '''
+    검증 결과 LRU 캐시 테스트
+    '''
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(TOKEN_VERIFY_CACHE={'MAX_SIZE': 2})
+    def test_lru_eviction(self):
+        '''
+        가장 오래 사용하지 않은 토큰부터 삭제
+        '''
+        verified = VerifiedTokenCache()
+        verified.set('a', fake_token('a'))
+        verified.set('b', fake_token('b'))
+        self.assertTrue(verified.get('a'))
+        verified.set('c', fake_token('c'))
+        self.assertTrue(verified.get('a'))
+        self.assertFalse(verified.get('b'))
+        self.assertTrue(verified.get('c'))
+        stats = verified.stats()
+        self.assertEqual((stats['size'], stats['hits'], stats['misses'], stats['evictions']), (2, 3, 1, 1))
+
+    def test_expire_at_exp(self):
+        '''
+        토큰의 exp가 지나면 사용하지 않고, 이미 만료된 토큰은 저장하지 않음
+        '''
+        verified = VerifiedTokenCache()
+        verified.set('a', fake_token('a', 0.2))
+        verified.set('b', fake_token('b', -1))
+        self.assertTrue(verified.get('a'))
+        self.assertFalse(verified.get('b'))
+        time.sleep(0.3)
+        self.assertFalse(verified.get('a'))
+        self.assertEqual(verified.stats()['size'], 0)
+
+    def test_invalidate(self):
+        verified = VerifiedTokenCache()
+        verified.set('a', fake_token('jti-a'))
+        verified.set('b', fake_token('jti-b'))
+        verified.invalidate(raw_token='a')
+        verified.invalidate(jti='jti-b')
+        self.assertFalse(verified.get('a'))
+        self.assertFalse(verified.get('b'))
+        self.assertEqual(verified.stats()['invalidations'], 2)
+
+    @override_settings(TOKEN_VERIFY_CACHE=SHARED_CACHE)
+    def test_shared_cache(self):
+        '''
+        공유 캐시를 지정하면 다른 워커(새 VerifiedTokenCache)에서도 사용하고 삭제도 같이 반영
+        '''
+        VerifiedTokenCache().set('a', fake_token('a'))
+        other = VerifiedTokenCache()
+        self.assertTrue(other.get('a'))
+        self.assertEqual(other.stats()['shared_hits'], 1)
+        VerifiedTokenCache().invalidate(raw_token='a')
+        self.assertFalse(VerifiedTokenCache().get('a'))
+
+
+class CachedTokenVerifyViewTestCase(APITestCase):
+    '''
+    검증 결과를 캐시하는 token/verify/ 테스트
+    '''
+
+    def setUp(self):
+        get_verified_token_cache().clear()
+        self.user = User.objects.create_user(username='test', email='test@test.com', password='test123456',
+                                             nickname='test', phone_number='01000000000', name='테스트')
+        self.url = reverse('token_verify')
+
+    def verify(self, token):
+        return self.client.post(self.url, json.dumps({'token': token}), content_type='application/json')
+
+    def test_cached(self):
+        '''
+        같은 토큰은 두 번째부터 blacklist 조회 없이 응답
+        '''
+        token = str(RefreshToken.for_user(self.user).access_token)
+        before = get_verified_token_cache().stats()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.verify(token).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.verify(token).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.verify('ddd').status_code, status.HTTP_401_UNAUTHORIZED)
+        stats = get_verified_token_cache().stats()
+        self.assertEqual((stats['hits'] - before['hits'], stats['misses'] - before['misses']), (1, 2))
+
+    def test_blacklisted(self):
+        '''
+        blacklist에 추가하면 캐시에서 삭제되어 검증 실패(TokenVerifySerializer와 같이 400)
+        '''
+        refresh = RefreshToken.for_user(self.user)
+        self.assertEqual(self.verify(str(refresh)).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.verify(str(refresh)).status_code, status.HTTP_200_OK)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh['jti']))
+        self.assertEqual(self.verify(str(refresh)).status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TOKEN_VERIFY_CACHE={'ENABLED': False})
+    def test_disabled(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(self.verify(token).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.verify(token).status_code, status.HTTP_200_OK)
+
+    def test_metrics(self):
+        url = reverse('token_verify_metrics')
+        self.user.is_staff = True
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(RefreshToken.for_user(self.user).access_token))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data)
+
+
+class TokenVersionTestCase(APITestCase):
+    '''
+    User.token_version으로 이전에 발급한 토큰 모두 무효화(모든 기기에서 로그아웃)
+    '''
+
+    def setUp(self):
+        cache.clear()
+        get_verified_token_cache().clear()
+        self.password = 'test123456'
+        self.user = User.objects.create_user(username='test', email='test@test.com', password=self.password,
+                                             nickname='test', phone_number='01000000000', name='테스트')
+
+    def login(self):
+        data = json.dumps({'username': 'test', 'password': self.password})
+        response = self.client.post(reverse('token_obtain_pair'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['refresh'], response.data['access']
+
+    def refresh(self, refresh):
+        return self.client.post(reverse('token_refresh'), json.dumps({'refresh': refresh}),
+                                content_type='application/json')
+
+    def verify(self, token):
+        return self.client.post(reverse('token_verify'), json.dumps({'token': token}),
+                                content_type='application/json')
+
+    def get_user(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        response = self.client.get(reverse('rest_user_details'))
+        self.client.credentials()
+        return response
+
+    def test_login_without_outstanding_token(self):
+        '''
+        로그인할 때 OutstandingToken 행을 만들지 않고 refresh는 User 조회 한 번으로 blacklist도 확인
+        '''
+        refresh, _ = self.login()
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertEqual(RefreshToken(refresh)[TOKEN_VERSION_CLAIM], 0)
+        with self.assertNumQueries(1):
+            response = self.refresh(refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(RefreshToken(refresh)['user_id'], self.user.pk)
+
+    def test_revoke_tokens(self):
+        '''
+        revoke_tokens() 이후에는 이전 토큰으로 refresh, 인증, 검증(캐시된 토큰 포함) 모두 실패
+        '''
+        refresh, access = self.login()
+        self.assertEqual(self.verify(access).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_user(access).status_code, status.HTTP_200_OK)
+
+        self.user.revoke_tokens()
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 1)
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.verify(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_user(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        # claim이 없는 토큰은 DB에서 User를 조회하는 경로에서 확인
+        self.assertEqual(self.get_user(str(RefreshToken.for_user(self.user).access_token)).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+        # 다시 로그인한 토큰은 사용 가능
+        refresh, access = self.login()
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_user(access).status_code, status.HTTP_200_OK)
+
+    def test_revoke_without_cache(self):
+        '''
+        캐시가 비어 있으면 DB에서 현재 버전을 조회
+        '''
+        refresh, _ = self.login()
+        User.objects.filter(pk=self.user.pk).update(token_version=5)
+        cache.clear()
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change(self):
+        '''
+        비밀번호를 변경하면 이전 토큰은 사용할 수 없음
+        '''
+        refresh, access = self.login()
+        data = json.dumps({'username': 'test', 'old_password': self.password,
+                           'new_password1': 'new123456!', 'new_password2': 'new123456!'})
+        response = self.client.post(reverse('password_change'), data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 1)
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get_user(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_serializer_user(self):
+        '''
+        비밀번호를 변경한 뒤 serializer의 user에는 F() 식 대신 저장된 토큰 버전이 남음
+        '''
+        # view와 마찬가지로 request.user에 비밀번호를 변경할 User를 넣어서 전달
+        request = SimpleNamespace(user=User.objects.get(pk=self.user.pk))
+        serializer = CustomPasswordChangeSerializer(data={
+            'username': 'test', 'old_password': self.password,
+            'new_password1': 'new123456!', 'new_password2': 'new123456!'}, context={'request': request})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual(serializer.user.token_version, 1)
+        # 같은 인스턴스를 다시 저장해도 버전이 다시 올라가지 않음
+        serializer.user.save()
+        self.assertEqual(User.objects.get(pk=self.user.pk).token_version, 1)
+
+    def test_blacklisted_refresh(self):
+        '''
+        blacklist에 추가한 refresh token은 token/verify와 마찬가지로 token/refresh도 실패
+        '''
+        refresh, _ = self.login()
+        RefreshToken(refresh).blacklist()
+        self.assertNotEqual(self.verify(refresh).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh(refresh).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -2,4 +2,6 @@ from .tests_user_retrieve import *
 from .tests_password import *
 from .tests_sms_auth import *
 from .tests_login import *
-from .tests_signup import *
\ No newline at end of file
+from .tests_signup import *
+from .tests_sms_auth_async import *
+from .tests_phone_status import *
@@ -0,0 +1,105 @@
+import json
+
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from ...models import SmsAuth, User
+from ...otp import PhoneStatusResolver
+
+
+class PhoneStatusQueryTestCase(APITestCase):
+    '''
+    인증번호 확인, 임시 비밀번호, 비밀번호 변경 API가 전화번호 상태를 한 번만 조회하는지 테스트
+    (각 API 쿼리 2번 이하)
+    '''
+
+    def setUp(self):
+        self.phone_number = '01000000000'
+        self.auth_number = SmsAuth.objects.create(phone_number=self.phone_number).auth_number
+        self.registered_phone_number = '01000000001'
+        self.registered_auth_number = SmsAuth.objects.create(phone_number=self.registered_phone_number).auth_number
+        self.user = User.objects.create_user(username='test', email='test@test.com', password='test123456',
+                                             nickname='test', phone_number=self.registered_phone_number,
+                                             name='테스트')
+
+    def post(self, name, data):
+        return self.client.post(reverse(name), json.dumps(data), content_type='application/json')
+
+    def test_resolver_cache(self):
+        '''
+        같은 요청 안에서는 같은 전화번호를 다시 조회하지 않음
+        '''
+        resolver = PhoneStatusResolver()
+        with self.assertNumQueries(1):
+            phone = resolver.get(self.registered_phone_number)
+            self.assertIs(resolver.get(self.registered_phone_number), phone)
+        self.assertTrue(phone.issued)
+        self.assertTrue(phone.is_registered)
+        self.assertEqual(phone.user_id, self.user.id)
+        self.assertTrue(phone.check(self.registered_auth_number))
+
+    def test_resolver_not_issued(self):
+        with self.assertNumQueries(2):
+            phone = PhoneStatusResolver().get('01000000009')
+        self.assertFalse(phone.issued)
+        self.assertFalse(phone.has_user)
+        self.assertFalse(phone.check(1234))
+
+    def test_sms_confirm_queries(self):
+        '''
+        인증번호 확인 성공(User 생성) / 실패
+        '''
+        with self.assertNumQueries(2):
+            response = self.post('sms_auth_confirm', {'phone_number': self.phone_number,
+                                                      'auth_number': self.auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            response = self.post('sms_auth_confirm', {'phone_number': self.phone_number,
+                                                      'auth_number': self.auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            response = self.post('sms_auth_confirm', {'phone_number': self.registered_phone_number,
+                                                      'auth_number': self.registered_auth_number})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with self.assertNumQueries(2):
+            response = self.post('sms_auth_confirm', {'phone_number': '01000000009', 'auth_number': 1234})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_temp_password_queries(self):
+        with self.assertNumQueries(2):
+            response = self.post('sms_temp_password', {'phone_number': self.registered_phone_number,
+                                                       'auth_number': self.registered_auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(check_password(str(self.registered_auth_number), self.user.password))
+        with self.assertNumQueries(1):
+            response = self.post('sms_temp_password', {'phone_number': self.phone_number,
+                                                       'auth_number': self.auth_number})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_password_change_queries(self):
+        data = {'username': 'test', 'old_password': 'test123456',
+                'new_password1': 'new123456!', 'new_password2': 'new123456!'}
+        # User 조회, 비밀번호와 토큰 버전 UPDATE, 저장된 토큰 버전 다시 읽기
+        with self.assertNumQueries(3):
+            response = self.post('password_change', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            response = self.post('password_change', dict(data, username='nobody'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(OTP={'STORE': 'accounts.otp.CacheOtpStore'})
+    def test_cache_store_queries(self):
+        '''
+        캐시 저장소는 User 조회만 SQL 사용
+        '''
+        cache.clear()
+        self.post('sms_auth_send', {'phone_number': '01000000002'})
+        auth_number = cache.get('otp:01000000002')
+        with self.assertNumQueries(2):
+            response = self.post('sms_auth_confirm', {'phone_number': '01000000002', 'auth_number': auth_number})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -68,6 +68,8 @@ class SignupTestCase(APITestCase):
             'auth_number': auth_number2
         })
         self.client.post(url, user2_data, content_type='application/json')
+        # 인증번호 확인 후에는 인증 완료 상태
+        self.assertEqual(User.get_registration_state(phone_number), User.STATE_VERIFIED)
 
         user2_data_signup = json.dumps({
             'username': 'test2',
@@ -82,6 +84,8 @@ class SignupTestCase(APITestCase):
         response2 = self.client.post(self.url, user2_data_signup, content_type='application/json')
         self.assertEqual(response2.status_code, status.HTTP_201_CREATED)
         self.assertEqual(User.objects.all().count(), 3)
+        # 회원가입 후에는 가입 완료 상태
+        self.assertEqual(User.get_registration_state(phone_number), User.STATE_REGISTERED)
 
     def test_signup_user_create_fail_blink_fields(self):
         '''
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from ...models import SmsAuth, SmsOutbox, User
+from ...otp import get_otp_store
+
+
+class AsyncSmsAuthTestCase(TransactionTestCase):
+    '''
+    ASGI용 비동기 인증번호 발송 / 확인 테스트
+    View의 DB 작업은 테스트와 다른 스레드(다른 DB 연결)에서 실행되기 때문에 커밋된 데이터로 테스트
+    '''
+
+    def setUp(self):
+        # 다른 테스트에서 같은 번호로 발송한 재발송 대기 시간이 남지 않도록 초기화
+        cache.clear()
+        self.async_client = AsyncClient()
+        self.phone_number = '01000000000'
+        self.sms_auth = SmsAuth.objects.create(phone_number=self.phone_number)
+        self.auth_number = self.sms_auth.auth_number
+        self.sms_send_url = reverse('sms_auth_send_async')
+        self.sms_confirm_url = reverse('sms_auth_confirm_async')
+
+    async def test_async_sms_send_success(self):
+        '''
+        인증번호 발신 성공 - 인증번호 저장 후 outbox에 쌓임
+        '''
+        data = json.dumps({'phone_number': '01000000001'})
+        response = await self.async_client.post(self.sms_send_url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'message': ['인증번호가 전송되었습니다.']})
+        exists = await sync_to_async(SmsOutbox.objects.filter(phone_number='01000000001').exists)()
+        self.assertTrue(exists)
+
+    async def test_async_sms_send_fail_wrong_fields(self):
+        '''
+        인증번호 발신 실패 1. 전화번호 형식 틀림 2. 필드 이름 틀림 3. JSON이 아닌 경우
+        '''
+        for body in (json.dumps({'phone_number': '0000'}), json.dumps({'phone': self.phone_number}), 'zzz'):
+            response = await self.async_client.post(self.sms_send_url, body, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_sms_confirm_success(self):
+        '''
+        인증번호 확인 성공 - 가입하지 않은 번호라서 User 생성
+        '''
+        data = json.dumps({'phone_number': self.phone_number, 'auth_number': self.auth_number})
+        response = await self.async_client.post(self.sms_confirm_url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'message': ['인증에 성공하였습니다.']})
+
+    async def test_async_sms_confirm_fail(self):
+        '''
+        인증번호 확인 실패 1. 인증번호 틀림 2. 인증하지 않은 번호
+        '''
+        data = json.dumps({'phone_number': self.phone_number, 'auth_number': 1111 if self.auth_number != 1111 else 2222})
+        response = await self.async_client.post(self.sms_confirm_url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'auth_number': ['인증번호를 확인하세요.']})
+
+        data = json.dumps({'phone_number': '01000000009', 'auth_number': self.auth_number})
+        response = await self.async_client.post(self.sms_confirm_url, data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_async_sms_send_concurrent(self):
+        '''
+        동시에 들어온 두 요청의 DB 작업이 공유 스레드 하나에서 차례로 실행되지 않고 겹쳐서 실행됨
+        두 요청이 모두 issue_once()에 들어와야 barrier를 통과하기 때문에 차례로 실행되면 BrokenBarrierError
+        '''
+        store = get_otp_store()
+        issue_once = store.issue_once
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_issue_once(phone_number):
+            barrier.wait()
+            return issue_once(phone_number)
+
+        with mock.patch.object(store, 'issue_once', wait_issue_once):
+            responses = await asyncio.gather(*(
+                self.async_client.post(self.sms_send_url, json.dumps({'phone_number': phone_number}),
+                                       content_type='application/json')
+                for phone_number in ('01000000001', '01000000002')))
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * 2)
+        count = await sync_to_async(SmsOutbox.objects.filter(phone_number__in=['01000000001', '01000000002']).count)()
+        self.assertEqual(count, 2)
+
+    async def test_async_method_not_allowed(self):
+        response = await self.async_client.get(self.sms_send_url)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_async_sms_confirm_create_user(self):
+        '''
+        비동기 View에서 만든 User가 동기 ORM에서도 보이는지 확인
+        '''
+        data = json.dumps({'phone_number': self.phone_number, 'auth_number': self.auth_number})
+        response = async_to_sync(self.async_client.post)(self.sms_confirm_url, data,
+                                                         content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(User.objects.filter(phone_number=self.phone_number).exists())
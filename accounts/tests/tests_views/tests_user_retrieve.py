@@ -1,5 +1,6 @@
 import json
 
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.reverse import reverse
@@ -80,3 +81,94 @@ class UserRetrieveTestCase(APITestCase):
         user_serializer_data = UserSerializer(instance=self.user).data
         response_data = response.json()
         self.assertEqual(user_serializer_data, response_data)
+
+
+class StatelessUserRetrieveTestCase(APITestCase):
+    '''
+    토큰의 claim으로 응답하는 내 정보 보기 테스트
+    '''
+
+    def setUp(self):
+        cache.clear()
+        self.password = 'test123456'
+        self.user = User.objects.create_user(username='test', email='test@test.com', password=self.password,
+                                             nickname='test', phone_number='01000000000', name='테스트')
+        self.url = reverse('rest_user_details')
+
+    def login(self):
+        data = json.dumps({'username': 'test', 'password': self.password})
+        response = self.client.post(reverse('token_obtain_pair'), data, content_type='application/json')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.json()['access'])
+        return response.json()
+
+    def test_retrieve_without_query(self):
+        '''
+        로그인으로 발급한 토큰이면 DB 조회 없이 같은 내용으로 응답
+        '''
+        self.login()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), UserSerializer(instance=self.user).data)
+
+    def test_refreshed_token(self):
+        '''
+        refresh로 새로 발급한 access token에도 claim이 유지됨
+        '''
+        refresh = self.login()['refresh']
+        response = self.client.post(reverse('token_refresh'), json.dumps({'refresh': refresh}),
+                                    content_type='application/json')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + response.json()['access'])
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()['nickname'], 'test')
+
+    def test_token_without_claims(self):
+        '''
+        claim이 없는 토큰은 기존처럼 DB에서 User 조회
+        '''
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(RefreshToken.for_user(self.user).access_token))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json(), UserSerializer(instance=self.user).data)
+
+    def test_update_uses_database_user(self):
+        '''
+        수정 요청은 DB의 User로 처리
+        '''
+        self.login()
+        response = self.client.patch(self.url, json.dumps({'nickname': 'changed'}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.nickname, 'changed')
+
+    def test_retrieve_after_update(self):
+        '''
+        수정한 뒤에는 이전에 발급한 토큰으로 조회해도 수정한 정보로 응답(이전 claim 대신 DB 조회)
+        refresh로 새로 발급한 access token에는 수정한 정보가 들어있음
+        (수정한 시각과 같은 초에 발급한 토큰은 claim 대신 DB 조회)
+        '''
+        refresh = self.login()['refresh']
+        self.client.patch(self.url, json.dumps({'nickname': 'changed'}), content_type='application/json')
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['nickname'], 'changed')
+
+        response = self.client.post(reverse('token_refresh'), json.dumps({'refresh': refresh}),
+                                    content_type='application/json')
+        self.assertNotIn('nickname', RefreshToken(refresh).payload)
+        access = response.json()['access']
+        self.assertEqual(RefreshToken(refresh).access_token_class(access)['nickname'], 'changed')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + access)
+        self.assertEqual(self.client.get(self.url).json()['nickname'], 'changed')
+
+    def test_inactive_user(self):
+        '''
+        비활성화된 User의 토큰은 조회, refresh 모두 거절
+        '''
+        refresh = self.login()['refresh']
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('token_refresh'), json.dumps({'refresh': refresh}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
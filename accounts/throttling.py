@@ -0,0 +1,186 @@
+'''
+    인증번호 발송(sms/send/) 요청 수 제한
+
+    요청마다 유료 문자가 나가기 때문에 전화번호별, 클라이언트 IP별, 전체 요청 수를
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']의 sms_send_phone, sms_send_ip, sms_send 비율로 제한
+    제한에 걸리면 DB 조회나 문자 발송 전에 429와 Retry-After 헤더로 응답
+
+    DRF의 SimpleRateThrottle은 요청 시각 목록을 캐시에 저장해서 요청 수만큼 값이 커지기 때문에
+    구간(duration)마다 요청 수 하나만 저장하는 sliding window counter 방식 사용
+    (현재 구간의 요청 수 + 이전 구간의 요청 수 * 이전 구간이 아직 걸쳐 있는 비율)
+
+    DRF의 check_throttles()는 앞의 throttle이 거절해도 나머지 throttle을 모두 실행하기 때문에
+    세 제한을 하나의 throttle(SmsSendThrottle)로 묶어서 모두 허용할 때만 요청 수를 더함
+    (한 IP가 자기 제한을 넘겨서 보낸 요청이 전체 요청 수를 써버리지 않도록 함)
+'''
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+from .otp import get_otp_store
+from .phone import normalize_phone_number
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    '''
+        구간마다 요청 수를 캐시에 저장하고 이전 구간과 가중 합으로 요청 수를 추정
+        캐시 조회는 요청마다 get_many() 한 번(check), 허용한 요청은 incr() 한 번(record)
+    '''
+
+    @property
+    def THROTTLE_RATES(self):
+        # override_settings로 바꾼 비율도 반영되도록 요청마다 설정에서 읽기
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        return self.check(request, view) and self.record()
+
+    def check(self, request, view):
+        '''
+            요청 수를 늘리지 않고 이번 요청을 허용할 수 있는지만 확인
+        '''
+        self.key = None
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.current_key, previous_key = f'{self.key}:{window}', f'{self.key}:{window - 1}'
+        counts = self.cache.get_many([previous_key, self.current_key])
+        self.previous, self.current = counts.get(previous_key, 0), counts.get(self.current_key, 0)
+        # 이전 구간이 지금부터 duration초 전까지 걸쳐 있는 비율
+        self.weight = 1 - (self.now - window * self.duration) / self.duration
+        if self.previous * self.weight + self.current + 1 > self.num_requests:
+            return self.throttle_failure()
+        return True
+
+    def record(self):
+        '''
+            check()로 허용한 요청을 현재 구간의 요청 수에 더하기
+        '''
+        if self.key is None:
+            return True
+        self.current = self.increment(self.current_key)
+        if self.previous * self.weight + self.current > self.num_requests:
+            # 동시에 들어온 다른 요청이 먼저 남은 자리를 가져간 경우 되돌리기
+            self.rollback()
+            return self.throttle_failure()
+        return True
+
+    def rollback(self):
+        if self.key is None:
+            return
+        self.cache.decr(self.current_key)
+        self.current -= 1
+
+    def increment(self, key):
+        # 현재 구간의 값은 다음 구간에서 이전 구간 값으로 사용하기 때문에 두 구간 동안 저장
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def wait(self):
+        '''
+            다음 요청이 허용될 때까지 남은 시간(초)
+        '''
+        if not self.num_requests:
+            return None
+        if self.current + 1 <= self.num_requests:
+            # 이전 구간의 요청이 시간이 지나면서 빠지기를 기다리기
+            excess = self.previous * self.weight + self.current + 1 - self.num_requests
+            return excess * self.duration / self.previous
+        # 현재 구간만으로 가득 찼으면 다음 구간에서 현재 구간의 요청이 충분히 빠질 때까지 기다리기
+        remaining = self.duration * self.weight
+        return remaining + self.duration * (1 - (self.num_requests - 1) / self.current)
+
+
+def get_phone_number(request):
+    '''
+        요청 본문의 phone_number(정규화한 값), 없거나 형식이 다르면 None
+        request.data는 View에서도 그대로 사용하기 때문에 본문은 한 번만 파싱
+        (AsyncAPIView는 check_throttles() 전에 parse()로 request.data 저장)
+        JSON 형식이 틀리면 ParseError(400)로 응답
+    '''
+    data = request.data
+    # 010-1234-5678과 01012345678이 같은 요청 수를 사용하도록 정규화
+    return normalize_phone_number(data.get('phone_number')) if isinstance(data, dict) else None
+
+
+class PhoneNumberRateThrottle(SlidingWindowRateThrottle):
+    '''
+        같은 전화번호로 보내는 인증번호 수 제한
+        재발송 대기 시간(OTP['RESEND_COOLDOWN']) 안의 요청은 문자를 보내지 않고 기존 인증번호로 응답하기 때문에
+        요청 수에 포함하지 않음(여러 번 누른 요청 때문에 대기 시간 뒤의 재발송이 막히지 않도록 함)
+    '''
+    scope = 'sms_send_phone'
+
+    def check(self, request, view):
+        allowed = super().check(request, view)
+        if self.key is not None and get_otp_store().get_resend_after(get_phone_number(request)) is not None:
+            # record()에서 요청 수를 더하지 않도록 키를 비움
+            self.key = None
+            return True
+        return allowed
+
+    def get_cache_key(self, request, view):
+        phone_number = get_phone_number(request)
+        if phone_number is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': phone_number}
+
+
+class ClientIpRateThrottle(SlidingWindowRateThrottle):
+    '''
+        같은 클라이언트 IP(NUM_PROXIES 설정에 따라 X-Forwarded-For 사용)의 요청 수 제한
+    '''
+    scope = 'sms_send_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class SmsSendRateThrottle(SlidingWindowRateThrottle):
+    '''
+        전체 요청 수 제한(SENS 발송 한도 보호)
+    '''
+    scope = 'sms_send'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': 'global'}
+
+
+class SmsSendThrottle(BaseThrottle):
+    '''
+        전화번호별, IP별, 전체 요청 수 제한을 한 번에 확인
+        모든 제한을 먼저 확인(check)하고 모두 허용할 때만 각 구간에 요청 수를 더하기(record)
+        제한에 걸린 요청은 어느 구간의 요청 수에도 포함하지 않음
+    '''
+    throttle_classes = [PhoneNumberRateThrottle, ClientIpRateThrottle, SmsSendRateThrottle]
+
+    def allow_request(self, request, view):
+        throttles = [throttle() for throttle in self.throttle_classes]
+        self.rejected = [throttle for throttle in throttles if not throttle.check(request, view)]
+        if self.rejected:
+            return False
+        recorded = []
+        for throttle in throttles:
+            if not throttle.record():
+                # 동시에 들어온 요청 때문에 한 구간이라도 넘치면 이미 더한 구간도 되돌리기
+                for other in recorded:
+                    other.rollback()
+                self.rejected = [throttle]
+                return False
+            recorded.append(throttle)
+        return True
+
+    def wait(self):
+        durations = [duration for duration in (throttle.wait() for throttle in self.rejected) if duration is not None]
+        return max(durations, default=None)
+
+
+SMS_SEND_THROTTLES = [SmsSendThrottle]
@@ -0,0 +1,378 @@
+'''
+    JWT 토큰 관련 캐시
+
+    1. token/verify/ 검증 결과 캐시
+
+    다른 서비스가 요청마다 token/verify/를 호출하기 때문에 같은 토큰의 서명 확인과 blacklist 조회(DB)를 반복함
+    VerifiedTokenCache는 검증에 성공한 토큰을 토큰의 해시로 저장해두고 만료 시각(exp)까지 재사용
+
+    - 워커(프로세스)마다 크기가 정해진 LRU에 저장
+    - TOKEN_VERIFY_CACHE['CACHE_ALIAS']를 지정하면 공유 캐시에도 저장해서 다른 워커와 같이 사용
+      (이때 LRU는 LOCAL_TTL초만 사용해서 다른 워커에서 blacklist에 추가한 토큰도 곧 반영되도록 함)
+    - BlacklistedToken이 저장되면 해당 토큰을 캐시에서 삭제
+
+    검증에 실패한 토큰은 저장하지 않음
+
+    2. 토큰 버전(User.token_version)
+    토큰을 발급할 때 User의 token_version을 claim으로 넣고, 토큰을 사용할 때 캐시에 저장된 현재 버전과 비교
+    User.revoke_tokens()로 버전을 올리면 UPDATE 한 번으로 이전에 발급한 모든 토큰이 무효화되고
+    로그인(발급)할 때 OutstandingToken 행을 만들지 않고, refresh는 User 조회 한 번으로 blacklist도 같이 확인
+    캐시에는 버전과 함께 is_active, claims_updated_at(User 정보를 바꾼 시각)도 저장해서
+    비활성화된 User의 토큰과 이전 정보가 들어있는 access token의 claim을 DB 조회 없이 걸러냄
+    TOKEN_VERSION['CACHE_ALIAS']가 워커마다 따로인 캐시(locmem)면 다른 워커에는 TIMEOUT초 안에 반영
+'''
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models import Exists
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.translation import ugettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from .routers import pin_primary
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,
+    'CACHE_ALIAS': None,
+    'KEY_PREFIX': 'token-verify',
+    'LOCAL_TTL': 1,
+}
+
+
+VERSION_DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'token-version',
+    'TIMEOUT': 60,
+}
+
+# 검증 결과 캐시에 저장하는 토큰 정보(토큰 버전 확인에 사용)
+VerifiedToken = namedtuple('VerifiedToken', ['user_id', 'token_version'])
+# 토큰 버전 캐시에 저장하는 User의 현재 정보(claims_updated_at은 epoch 초)
+TokenState = namedtuple('TokenState', ['version', 'is_active', 'claims_updated_at'])
+
+
+def token_verify_setting(name):
+    return getattr(settings, 'TOKEN_VERIFY_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def token_version_setting(name):
+    return getattr(settings, 'TOKEN_VERSION', {}).get(name, VERSION_DEFAULTS[name])
+
+
+class VerifiedTokenCache:
+    '''
+        검증에 성공한 토큰의 LRU 캐시(+ 공유 캐시)
+        키는 토큰 원문 대신 sha256 해시를 사용
+    '''
+
+    def __init__(self):
+        self.max_size = token_verify_setting('MAX_SIZE')
+        alias = token_verify_setting('CACHE_ALIAS')
+        self.shared = caches[alias] if alias else None
+        self.prefix = token_verify_setting('KEY_PREFIX')
+        self.local_ttl = token_verify_setting('LOCAL_TTL')
+        # key -> (만료 시각(epoch 초), jti, VerifiedToken)
+        self._entries = OrderedDict()
+        self._keys_by_jti = {}
+        self._lock = threading.Lock()
+        # 지표
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def get_key(raw_token):
+        return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+    def get_shared_key(self, key):
+        return f'{self.prefix}:{key}'
+
+    def get(self, raw_token):
+        '''
+            만료되지 않은 검증 결과가 있으면 VerifiedToken, 없으면 None
+        '''
+        key = self.get_key(raw_token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._remove(key)
+
+        if self.shared is not None:
+            entry = self.shared.get(self.get_shared_key(key))
+            if entry is not None and entry[0] > now:
+                verified = VerifiedToken(*entry[2])
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(key, entry[0], entry[1], verified, now)
+                return verified
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, raw_token, token):
+        '''
+            검증한 토큰(rest_framework_simplejwt Token)의 exp까지 저장
+        '''
+        expires_at = token.get('exp')
+        now = time.time()
+        if expires_at is None or expires_at <= now:
+            return
+        jti = token.get(api_settings.JTI_CLAIM)
+        verified = VerifiedToken(token.get(api_settings.USER_ID_CLAIM), token.get(TOKEN_VERSION_CLAIM, 0))
+        key = self.get_key(raw_token)
+        with self._lock:
+            self._store(key, expires_at, jti, verified, now)
+        if self.shared is not None:
+            self.shared.set(self.get_shared_key(key), (expires_at, jti, tuple(verified)), int(expires_at - now) + 1)
+
+    def invalidate(self, raw_token=None, jti=None):
+        '''
+            토큰 원문 또는 jti로 저장된 검증 결과 삭제
+        '''
+        keys = set()
+        with self._lock:
+            if raw_token is not None:
+                keys.add(self.get_key(raw_token))
+            if jti is not None and jti in self._keys_by_jti:
+                keys.add(self._keys_by_jti[jti])
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+        if self.shared is not None and keys:
+            self.shared.delete_many([self.get_shared_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_jti.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'shared': self.shared is not None,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _store(self, key, expires_at, jti, verified, now):
+        # 공유 캐시를 사용하면 다른 워커의 blacklist 추가를 반영하기 위해 LRU에는 잠깐만 저장
+        if self.shared is not None:
+            expires_at = min(expires_at, now + self.local_ttl)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, jti, verified)
+        if jti is not None:
+            self._keys_by_jti[jti] = key
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, jti, _ = self._entries.pop(key)
+        if self._keys_by_jti.get(jti) == key:
+            del self._keys_by_jti[jti]
+
+
+def get_version_cache():
+    return caches[token_version_setting('CACHE_ALIAS')]
+
+
+def get_version_key(user_id):
+    return f'{token_version_setting("KEY_PREFIX")}:{user_id}'
+
+
+def get_token_state(user_id):
+    '''
+        User의 현재 토큰 정보(캐시에 없을 때만 DB 조회), User가 없으면 None
+    '''
+    from .models import User
+
+    version_cache = get_version_cache()
+    key = get_version_key(user_id)
+    state = version_cache.get(key)
+    if not isinstance(state, tuple):
+        state = User.objects.filter(pk=user_id).values_list('token_version', 'is_active', 'claims_updated_at').first()
+        if state is None:
+            return None
+        state = TokenState(state[0], state[1], state[2].timestamp() if state[2] else None)
+        version_cache.set(key, tuple(state), token_version_setting('TIMEOUT'))
+    return TokenState(*state)
+
+
+def get_token_version(user_id):
+    '''
+        User의 현재 토큰 버전, User가 없으면 None
+    '''
+    state = get_token_state(user_id)
+    return state.version if state is not None else None
+
+
+def prime_token_version(user):
+    # 토큰을 발급할 때 현재 버전을 미리 캐시에 저장해서 첫 요청에서 DB를 조회하지 않도록 함
+    claims_updated_at = user.claims_updated_at.timestamp() if user.claims_updated_at else None
+    get_version_cache().set(get_version_key(user.pk), (user.token_version, user.is_active, claims_updated_at),
+                            token_version_setting('TIMEOUT'))
+
+
+def invalidate_token_version(user_id):
+    get_version_cache().delete(get_version_key(user_id))
+
+
+def check_token_version(user_id, token_version):
+    '''
+        토큰의 버전이 User의 현재 버전과 다르면(revoke_tokens()로 무효화된 토큰) TokenError
+        비활성화된 User의 토큰도 TokenError
+        버전 claim이 없는 예전 토큰은 0으로 취급, 확인한 User의 토큰 정보(TokenState) 리턴
+    '''
+    if user_id is None:
+        return None
+    state = get_token_state(user_id)
+    if state is None or state.version != (token_version or 0):
+        raise TokenError(_('Token has been revoked'))
+    if not state.is_active:
+        raise TokenError(_('User is inactive'))
+    return state
+
+
+def check_token_payload(payload):
+    return check_token_version(payload.get(api_settings.USER_ID_CLAIM), payload.get(TOKEN_VERSION_CLAIM))
+
+
+def has_current_claims(payload, state):
+    '''
+        토큰의 User 정보 claim이 마지막으로 User 정보를 바꾼 뒤에 발급되었으면 True
+        (iat는 초 단위로 버림하기 때문에 같은 초에 바꾼 경우는 이전 정보로 취급)
+    '''
+    if state is None or payload.get('iat') is None:
+        return False
+    return state.claims_updated_at is None or state.claims_updated_at < payload['iat']
+
+
+def add_token_claims(token, user):
+    for claim in user.TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class VersionedRefreshToken(RefreshToken):
+    '''
+        토큰 버전으로 이전에 발급한 토큰을 한 번에 무효화하는 RefreshToken
+        - 발급할 때 OutstandingToken 행을 만들지 않고 token_version claim 추가
+        - refresh할 때 User를 읽는 쿼리 하나로 토큰 버전, is_active, blacklist(BlacklistedToken)를 같이 확인
+        refresh로 만드는 access token에도 token_version claim이 복사됨
+
+        User 정보 claim(User.TOKEN_CLAIMS)은 refresh token에 넣지 않고 access token을 만들 때마다
+        User의 현재 정보로 추가(refresh 요청으로 받은 토큰은 verify()에서 읽은 User 사용)
+        iat도 access token을 만든 시각으로 바꿔서 User.claims_updated_at과 비교할 수 있도록 함
+    '''
+    user = None
+
+    def verify(self, *args, **kwargs):
+        # BlacklistMixin.verify()의 blacklist 조회는 get_user()의 User 조회에 포함
+        Token.verify(self, *args, **kwargs)
+        self.issued_at = aware_utcnow()
+        self.user = self.get_user()
+
+    @classmethod
+    def for_user(cls, user):
+        # BlacklistMixin.for_user()의 OutstandingToken 저장을 건너뜀
+        token = Token.for_user.__func__(cls, user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        token.user = user
+        prime_token_version(user)
+        return token
+
+    @property
+    def access_token(self):
+        if self.user is None:
+            self.issued_at = aware_utcnow()
+            self.user = self.get_user()
+        access = super().access_token
+        # User를 읽기 전에 잰 시각(그 뒤에 바뀐 정보는 claims_updated_at이 더 늦음)
+        access.set_iat(at_time=getattr(self, 'issued_at', self.current_time))
+        return add_token_claims(access, self.user)
+
+    def get_user(self):
+        '''
+            토큰의 User, 없거나 토큰 버전이 다르거나 비활성화되었거나 blacklist에 추가된 토큰이면 TokenError
+        '''
+        from .models import User
+
+        blacklisted = BlacklistedToken.objects.filter(token__jti=self.payload.get(api_settings.JTI_CLAIM))
+        user = (User.objects.annotate(blacklisted=Exists(blacklisted))
+                .filter(pk=self.payload.get(api_settings.USER_ID_CLAIM)).first())
+        if user is None or user.token_version != self.payload.get(TOKEN_VERSION_CLAIM, 0):
+            raise TokenError(_('Token has been revoked'))
+        if user.blacklisted:
+            raise TokenError(_('Token is blacklisted'))
+        if not user.is_active:
+            raise TokenError(_('User is inactive'))
+        prime_token_version(user)
+        return user
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verified_token_cache():
+    '''
+        설정에서 사용하지 않도록 하면 None
+    '''
+    global _cache
+    if not token_verify_setting('ENABLED'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = VerifiedTokenCache()
+    return _cache
+
+
+@receiver(setting_changed)
+def reset_cache(*, setting, **kwargs):
+    global _cache
+    if setting in ('TOKEN_VERIFY_CACHE', 'CACHES'):
+        _cache = None
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def invalidate_blacklisted_token(sender, instance, created, **kwargs):
+    '''
+        blacklist에 추가된 토큰은 검증 결과 캐시에서 삭제
+    '''
+    cache = get_verified_token_cache()
+    if created and cache is not None:
+        cache.invalidate(raw_token=instance.token.token, jti=instance.token.jti)
+    if created:
+        # blacklist 확인을 복제가 늦은 replica에서 하지 않도록 primary로 고정
+        pin_primary(user_id=instance.token.user_id)
@@ -1,15 +1,22 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenVerifyView
 from django.conf.urls import (
     handler400, handler403, handler404, handler500)
-from .views import SMSAuthSendView, SMSAuthConfirmView, TempPasswordView, CustomPasswordChangeView
+from .views import SMSAuthSendView, SMSAuthConfirmView, TempPasswordView, CustomPasswordChangeView, \
+    AsyncSMSAuthSendView, AsyncSMSAuthConfirmView, HashingMetricsView, TokenVerifyMetricsView, \
+    CachedTokenVerifyView, SmsCampaignView, SmsCampaignDetailView
 
 urlpatterns = [
     path('sms/send/', SMSAuthSendView.as_view(), name='sms_auth_send'),  # sms 인증 문자 보내기
     path('sms/confirm/', SMSAuthConfirmView.as_view(), name='sms_auth_confirm'),  # sms 인증번호 확인
+    path('async/sms/send/', AsyncSMSAuthSendView.as_view(), name='sms_auth_send_async'),  # ASGI용 비동기 버전
+    path('async/sms/confirm/', AsyncSMSAuthConfirmView.as_view(), name='sms_auth_confirm_async'),
     path('sms/temp-password/', TempPasswordView.as_view(), name='sms_temp_password'),  # sms인증 확인 후 인증번호 임시 비밀번호로 설정
     path('password/change/', CustomPasswordChangeView.as_view(), name='password_change'),  # 비밀번호 변경
+    path('sms/campaigns/', SmsCampaignView.as_view(), name='sms_campaign'),  # 공지 문자 등록, 목록(관리자)
+    path('sms/campaigns/<int:pk>/', SmsCampaignDetailView.as_view(), name='sms_campaign_detail'),  # 공지 문자 진행 상황(관리자)
+    path('metrics/hashing/', HashingMetricsView.as_view(), name='hashing_metrics'),  # 비밀번호 해시 풀 지표(관리자)
+    path('metrics/token-verify/', TokenVerifyMetricsView.as_view(), name='token_verify_metrics'),  # 토큰 검증 캐시 지표(관리자)
 
     # simple-jwt
-    path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('token/verify/', CachedTokenVerifyView.as_view(), name='token_verify'),  # 검증 결과를 캐시하는 버전
 ]
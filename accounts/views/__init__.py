@@ -1,4 +1,8 @@
 from .sms_auth import SMSAuthConfirmView, SMSAuthSendView
+from .sms_auth_async import AsyncSMSAuthConfirmView, AsyncSMSAuthSendView
 from .password import TempPasswordView, CustomPasswordChangeView
 from .errors import custom404, custom500
-from .login import MyTokenObtainPairView
\ No newline at end of file
+from .login import MyTokenObtainPairView, CustomTokenRefreshView, CachedTokenVerifyView
+from .metrics import HashingMetricsView, TokenVerifyMetricsView
+from .user import StatelessUserDetailsView
+from .campaign import SmsCampaignView, SmsCampaignDetailView
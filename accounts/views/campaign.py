@@ -0,0 +1,38 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import SmsCampaign
+from ..serializers import SmsCampaignSerializer
+from ..sms.campaign import get_recipient_queryset
+
+
+class SmsCampaignView(APIView):
+    '''
+        조건에 맞는 회원 전체에게 보낼 공지 문자 등록(관리자만 가능)
+        요청에서는 저장만 하고 바로 응답, 실제 전송은 send_sms_campaigns 워커가 진행
+    '''
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        campaigns = SmsCampaign.objects.order_by('-pk')[:20]
+        return Response(SmsCampaignSerializer(campaigns, many=True).data)
+
+    def post(self, request):
+        serializer = SmsCampaignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data.get('filters', {}))
+        campaign = serializer.save(created_by=request.user, total=get_recipient_queryset(filters).count())
+        return Response(SmsCampaignSerializer(campaign).data, status=status.HTTP_202_ACCEPTED)
+
+
+class SmsCampaignDetailView(APIView):
+    '''
+        공지 문자 전송 진행 상황(관리자만 조회 가능)
+    '''
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        return Response(SmsCampaignSerializer(get_object_or_404(SmsCampaign, pk=pk)).data)
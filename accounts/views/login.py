@@ -1,7 +1,20 @@
-from rest_framework_simplejwt.views import TokenObtainPairView
-from ..serializers import CustomTokenObtainPairSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
+from ..serializers import CachedTokenVerifySerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
+
+class CustomTokenRefreshView(TokenRefreshView):
+    '''
+    User 조회 한 번으로 토큰 버전, blacklist를 확인하는 token/refresh/
+    '''
+    serializer_class = CustomTokenRefreshSerializer
+
+
+class CachedTokenVerifyView(TokenVerifyView):
+    '''
+    검증에 성공한 토큰은 exp까지 캐시된 결과로 응답하는 token/verify/
+    '''
+    serializer_class = CachedTokenVerifySerializer
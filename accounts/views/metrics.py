@@ -0,0 +1,27 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..hashers import get_hashing_service
+from ..tokens import get_verified_token_cache
+
+
+class HashingMetricsView(APIView):
+    '''
+        비밀번호 해시 프로세스 풀의 대기열 깊이, 해시 계산 시간 지표(관리자만 조회 가능)
+    '''
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_hashing_service().stats())
+
+
+class TokenVerifyMetricsView(APIView):
+    '''
+        token/verify/ 검증 결과 캐시의 hit / miss 지표(관리자만 조회 가능)
+    '''
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        cache = get_verified_token_cache()
+        return Response(cache.stats() if cache is not None else {'enabled': False})
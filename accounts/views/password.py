@@ -1,10 +1,13 @@
-import json
-
+from django.contrib.auth.hashers import make_password
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
 from django.utils.datastructures import MultiValueDictKeyError
 from rest_framework.response import Response
 
-from ..models import User, SmsAuth
+from ..models import User
+from ..otp import PhoneStatusResolver
+from ..routers import pin_primary
+from ..tokens import invalidate_token_version
 from rest_framework import status
 from ..serializers import PasswordSmsConfirmSerializer, CustomPasswordChangeFieldsSerializer
 from rest_framework.views import APIView
@@ -23,21 +26,27 @@ class TempPasswordView(APIView):
 
     def post(self, request):
         try:
-            data = json.loads(request.body)
+            data = request.data
             # 등록한 회원인지 확인하기 & 전화번호 형식 확인하기
-            serializer = PasswordSmsConfirmSerializer(data=data)
+            # 인증번호 발송 내역과 가입 상태는 serializer에서 한 번만 조회하고 view에서 재사용
+            phone_statuses = PhoneStatusResolver()
+            serializer = PasswordSmsConfirmSerializer(data=data, context={'phone_status': phone_statuses})
             if not serializer.is_valid():
                 return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
-            phone_number, auth_number = data['phone_number'], data['auth_number']
-            # 사용자가 입력한 인증번호랑 db에 저장된 인증번호랑 같은지 비교
-            result = SmsAuth.check_auth_number(phone_number, auth_number)
-            # 사용자가 입력한 인증번호 == db에 저장된 인증번호
-            if result:
+            # 정규화한 전화번호(010-1234-5678 -> 01012345678) 사용
+            validated_data = serializer.validated_data
+            phone_number, auth_number = validated_data['phone_number'], validated_data['auth_number']
+            phone = phone_statuses.get(phone_number)
+            # 사용자가 입력한 인증번호 == 저장된 인증번호
+            if phone.check(auth_number):
                 # 사용자가 입력한 휴대전화번호로 가입된 User가 있을 경우 입력한 인증번호로 임시 비밀번호 변경
-                if User.objects.filter(phone_number=phone_number).exists():
-                    user = User.objects.get(phone_number=phone_number)
-                    user.set_password(str(auth_number))
-                    user.save()
+                # User 객체를 불러오지 않고 비밀번호 컬럼만 UPDATE
+                # 같은 UPDATE에서 토큰 버전도 올려서 이전에 발급한 토큰을 모두 무효화(모든 기기에서 로그아웃)
+                if phone.has_user:
+                    User.objects.filter(pk=phone.user_id).update(password=make_password(str(auth_number)),
+                                                                 token_version=F('token_version') + 1)
+                    invalidate_token_version(phone.user_id)
+                    pin_primary(phone_number=phone_number, user_id=phone.user_id)
                     return Response({'message': ['인증번호로 임시 비밀번호가 변경되었습니다.']}, status.HTTP_200_OK)
             # 입력한 번호랑 저장된 인증번호가 다른 경우 확인 메시지 반환
             return Response({'auth_number': ['인증번호를 확인하세요.']}, status.HTTP_400_BAD_REQUEST)
@@ -55,14 +64,13 @@ class CustomPasswordChangeView(PasswordChangeView):
             # id로 user 객체 찾기
             # 기존 PasswordChangeView은 로그인 한 상태에서 진행해서 user가 request에 있지만
             # 지금은 로그인 하지 않았기 때문에 user객체를 직접 request에 지정해줘야 한다.
-            data = json.loads(request.body)
-            serializer = CustomPasswordChangeFieldsSerializer(data=data)
+            # 본문은 한 번만 파싱하고 아래 비밀번호 변경 serializer에서도 같은 request.data 사용
+            serializer = CustomPasswordChangeFieldsSerializer(data=request.data)
             if not serializer.is_valid():
                 return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
-            # User 객체 가져오기
-            user = User.objects.get(username=data['username'])
+            # 유효성 확인에서 가져온 User 객체 사용
             # request에 user를 지정하여 다음 로직에서 user의 비빌번호를 변경할 수 있도록 한다.
-            request.user = user
+            request.user = serializer.user
             serializer = self.get_serializer(data=request.data)
             serializer.is_valid(raise_exception=True)
             serializer.save()
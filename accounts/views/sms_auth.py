@@ -1,24 +1,41 @@
-import json
-
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from accounts.models import SmsAuth, User
+from accounts.models import User
+from accounts.otp import PhoneStatusResolver, get_otp_store
+from accounts.throttling import SMS_SEND_THROTTLES
 from ..serializers import SMSSendSerializer, SmsConfirmSerializer
 from rest_framework.permissions import AllowAny
 
 
+def issue_response(result):
+    '''
+        issue_once() 결과에 따른 (응답 데이터, 상태 코드)
+    '''
+    if result.issued:
+        # 전송완료 되었으면 200 응답
+        return {'message': ['인증번호가 전송되었습니다.']}, status.HTTP_200_OK
+    # 이미 보낸 인증번호를 그대로 사용하도록 200 응답과 다시 보낼 수 있을 때까지 남은 시간(초)
+    return {'message': ['이미 전송된 인증번호가 있습니다. 문자를 확인해주세요.'],
+            'resend_after': result.resend_after}, status.HTTP_200_OK
+
+
 class SMSAuthSendView(APIView):
     '''
         전화번호 인증하기
         전화번호 인증 메시지 보내는 view
+        전화번호별, IP별, 전체 요청 수를 제한(accounts/throttling.py)
     '''
     permission_classes = [AllowAny]
+    # 로그인 전에 사용하는 API라서 토큰을 확인하지 않음(요청 수 제한 전에 DB 조회가 생기지 않도록)
+    authentication_classes = []
+    throttle_classes = SMS_SEND_THROTTLES
 
     def post(self, request):
         try:
-            data = json.loads(request.body)
+            # 본문은 REST_FRAMEWORK의 Parser로 한 번만 읽고 요청 수 제한(throttle)에서 읽은 결과 재사용
+            data = request.data
             # 만약 키 값에 phone_number이 없을 경우
             # 전화번호가 11자리 숫자가 맞는지 확인하기
             serializer = SMSSendSerializer(data=data)
@@ -27,9 +44,9 @@ class SMSAuthSendView(APIView):
                 return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
             # 형식에 맞을 경우
             # 전화번호와 인증번호를 저장하거나 업데이트 하기
-            SmsAuth.objects.update_or_create(phone_number=data['phone_number'])
-            # 전송완료 되었으면 200 응답
-            return Response({'message': ['인증번호가 전송되었습니다.']}, status.HTTP_200_OK)
+            # 재발송 대기 시간 안이거나 같은 번호로 발송 중이면 새로 보내지 않고 기존 인증번호 유지
+            result = get_otp_store().issue_once(serializer.validated_data['phone_number'])
+            return Response(*issue_response(result))
         # 전송하지 못했을 경우 400 응답
         except KeyError:
             return Response({'message': ['필드 이름을 확인하세요.']}, status.HTTP_400_BAD_REQUEST)
@@ -43,23 +60,26 @@ class SMSAuthConfirmView(APIView):
 
     def post(self, request):
         try:
-            data = json.loads(request.body)
-            serializer = SmsConfirmSerializer(data=data)
+            data = request.data
+            # 인증번호 발송 내역과 가입 상태는 serializer에서 한 번만 조회하고 view에서 재사용
+            phone_statuses = PhoneStatusResolver()
+            serializer = SmsConfirmSerializer(data=data, context={'phone_status': phone_statuses})
             # 가입 진행을 위한 유효성 확인
             if not serializer.is_valid():
                 return Response(serializer.errors, status.HTTP_400_BAD_REQUEST)
-            phone_number, auth_number = data['phone_number'], data['auth_number']
-            # 사용자가 입력한 인증번호랑 db에 저장된 인증번호랑 같은지 비교
-            result = SmsAuth.check_auth_number(phone_number, auth_number)
-            # 사용자가 입력한 인증번호 == db에 저장된 인증번호
-            if result:
-                user = User.objects.filter(phone_number=phone_number)
+            # 정규화한 전화번호(010-1234-5678 -> 01012345678) 사용
+            validated_data = serializer.validated_data
+            phone_number, auth_number = validated_data['phone_number'], validated_data['auth_number']
+            phone = phone_statuses.get(phone_number)
+            # 사용자가 입력한 인증번호 == 저장된 인증번호
+            if phone.check(auth_number):
                 # 사용자가 입력한 휴대전화번호로 가입된 User가 없거나
                 # 이미 인증 확인을 진행했었지만 가입하지 않은 경우
-                if not user.exists() or (user.exists() and len(user[0].email) == 0):
+                if not phone.is_registered:
                     # User가 없다면 User 생성
-                    if not user.exists():
-                        User.objects.create(username=phone_number, phone_number=phone_number)
+                    if not phone.has_user:
+                        User.objects.create(username=phone_number, phone_number=phone_number,
+                                            registration_state=User.STATE_VERIFIED)
                     return Response({'message': ['인증에 성공하였습니다.']}, status.HTTP_200_OK)
             # 입력한 번호랑 저장된 인증번호가 다른 경우 확인 메시지 반환
             return Response({'auth_number': ['인증번호를 확인하세요.']}, status.HTTP_400_BAD_REQUEST)
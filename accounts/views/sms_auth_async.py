@@ -0,0 +1,156 @@
+import asyncio
+import json
+from functools import update_wrapper, wraps
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+
+from accounts.models import User
+from accounts.otp import PhoneStatusResolver, get_otp_store
+from accounts.throttling import SMS_SEND_THROTTLES
+from ..serializers import SMSSendSerializer, SmsConfirmSerializer
+from .sms_auth import issue_response
+
+
+def response(data, status_code):
+    # DRF JSONRenderer처럼 한글을 이스케이프하지 않고 응답
+    return JsonResponse(data, status=status_code, json_dumps_params={'ensure_ascii': False})
+
+
+def db_sync_to_async(func):
+    '''
+        ORM을 사용하는 동기 함수를 요청마다 다른 스레드에서 실행하는 sync_to_async
+        Django 3.2의 ASGIHandler는 요청마다 ThreadSensitiveContext를 만들지 않아서
+        기본값(thread_sensitive=True)으로는 모든 요청의 DB 작업이 공유 스레드 하나에서 차례로 실행됨
+        스레드 풀의 스레드는 request_finished에서 연결을 정리하지 않기 때문에 호출이 끝나면 DB 연결을 닫음
+        (호출 하나로 끝나는 DB 작업에만 사용)
+    '''
+    @wraps(func)
+    def inner(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+
+    return sync_to_async(inner, thread_sensitive=False)
+
+
+class AsyncAPIView(View):
+    '''
+        ASGI에서 이벤트 루프를 막지 않고 처리하는 비동기 View의 기본 클래스
+        DRF APIView는 비동기 핸들러를 지원하지 않기 때문에 Django View를 사용하고
+        ORM이 필요한 부분만 db_sync_to_async로 처리한다.
+    '''
+    throttle_classes = []
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        # Django 3.2의 View.as_view()는 동기 함수를 리턴하기 때문에
+        # 비동기 View로 인식되도록 코루틴 함수로 감싸기
+        async def async_view(request, *args, **kwargs):
+            result = view(request, *args, **kwargs)
+            # 허용되지 않은 메소드, OPTIONS 요청은 동기 응답이 리턴됨
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+
+        update_wrapper(async_view, view)
+        # APIView처럼 세션 인증을 사용하지 않는 API이므로 CSRF 검사 제외
+        async_view.csrf_exempt = True
+        return async_view
+
+    def check_throttles(self, request):
+        '''
+            APIView.check_throttles()와 같이 throttle_classes를 모두 확인하고
+            제한에 걸리면 429 응답(Retry-After 헤더 포함), 통과하면 None 리턴
+        '''
+        self.parse(request)
+        throttles = [throttle() for throttle in self.throttle_classes]
+        durations = [throttle.wait() for throttle in throttles if not throttle.allow_request(request, self)]
+        if not durations:
+            return None
+        durations = [duration for duration in durations if duration is not None]
+        exc = Throttled(max(durations, default=None))
+        throttled = response({'detail': exc.detail}, exc.status_code)
+        if exc.wait is not None:
+            throttled['Retry-After'] = '%d' % exc.wait
+        return throttled
+
+    def parse(self, request):
+        '''
+            본문 JSON(dict), 형식이 다르면 None
+            요청 수 제한(throttle)과 View가 같이 사용하도록 DRF Request처럼 request.data에 저장해서 한 번만 파싱
+        '''
+        if not hasattr(request, 'data'):
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                data = None
+            request.data = data if isinstance(data, dict) else None
+        return request.data
+
+
+class AsyncSMSAuthSendView(AsyncAPIView):
+    '''
+        SMSAuthSendView의 비동기 버전
+        전화번호와 인증번호를 저장하면 문자는 outbox 워커가 전송하기 때문에 SENS 응답을 기다리지 않음
+    '''
+    throttle_classes = SMS_SEND_THROTTLES
+
+    async def post(self, request):
+        # 요청 수 제한은 캐시만 사용하기 때문에 이벤트 루프에서 바로 확인
+        throttled = self.check_throttles(request)
+        if throttled is not None:
+            return throttled
+        data = self.parse(request)
+        if data is None:
+            return response({'message': ['필드 타입을 확인하세요']}, status.HTTP_400_BAD_REQUEST)
+        serializer = SMSSendSerializer(data=data)
+        # 전화번호 형식만 확인하기 때문에 DB 접근 없음
+        if not serializer.is_valid():
+            return response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        result = await db_sync_to_async(get_otp_store().issue_once)(serializer.validated_data['phone_number'])
+        return response(*issue_response(result))
+
+
+class AsyncSMSAuthConfirmView(AsyncAPIView):
+    '''
+        SMSAuthConfirmView의 비동기 버전
+    '''
+
+    async def post(self, request):
+        data = self.parse(request)
+        if data is None:
+            return response({'message': ['필드 타입을 확인하세요']}, status.HTTP_400_BAD_REQUEST)
+        phone_statuses = PhoneStatusResolver()
+        serializer = SmsConfirmSerializer(data=data, context={'phone_status': phone_statuses})
+        # 가입 진행을 위한 유효성 확인(가입 내역 확인에 DB 접근)
+        if not await db_sync_to_async(serializer.is_valid)():
+            return response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        # 정규화한 전화번호(010-1234-5678 -> 01012345678) 사용
+        validated_data = serializer.validated_data
+        phone_number, auth_number = validated_data['phone_number'], validated_data['auth_number']
+        # 유효성 확인에서 읽은 발송 내역, 가입 상태 재사용
+        phone = phone_statuses.get(phone_number)
+        if await db_sync_to_async(self.confirm)(phone, auth_number):
+            return response({'message': ['인증에 성공하였습니다.']}, status.HTTP_200_OK)
+        return response({'auth_number': ['인증번호를 확인하세요.']}, status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def confirm(phone, auth_number):
+        '''
+            인증번호를 확인하고 가입하지 않은 번호면 User 생성
+            DB 접근을 한 번의 db_sync_to_async 호출로 묶기 위해 따로 분리
+        '''
+        if not phone.check(auth_number) or phone.is_registered:
+            return False
+        if not phone.has_user:
+            User.objects.create(username=phone.phone_number, phone_number=phone.phone_number,
+                                registration_state=User.STATE_VERIFIED)
+        return True
@@ -0,0 +1,12 @@
+from rest_auth.views import UserDetailsView
+
+from ..authentication import StatelessJWTAuthentication
+
+
+class StatelessUserDetailsView(UserDetailsView):
+    '''
+        rest-auth의 내 정보 보기(rest-auth/user/)
+        조회(GET)는 access token의 claim으로 응답해서 User를 DB에서 다시 읽지 않음
+        수정(PUT, PATCH)은 기존처럼 DB의 User로 처리
+    '''
+    authentication_classes = [StatelessJWTAuthentication]
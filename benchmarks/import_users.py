@@ -0,0 +1,117 @@
+'''
+    회원 가져오기 처리량 비교
+
+    --rows명의 JSONL 파일을 만들고 빈 User 테이블에 가져오면서 행/초를 측정
+    - bulk: UserImporter(배치마다 중복 조회 한 번 + 프로세스 풀 해시 + bulk_create)
+    - bulk_prehashed: password_hash 컬럼(이미 해시한 값)으로 가져오기, 해시 계산 없이 확인과 저장 비용만 측정
+    - per_row: 행마다 확인, 중복 조회, 현재 프로세스에서 해시, save()(--per-row-rows명만 측정)
+
+    해시 비용은 PASSWORD_HASHING 설정 값, --time-cost / --memory-cost로 낮춰서 확인과 저장 비용의 비중을 볼 수 있음
+
+    실행: python benchmarks/import_users.py --rows 20000 --batch-size 1000 --workers 4
+    결과는 JSON으로 출력
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from accounts.importing import UserImporter, read_rows, row_to_data  # noqa: E402
+from accounts.models import User  # noqa: E402
+from accounts.serializers import ImportUserSerializer  # noqa: E402
+
+PASSWORD = 'import-pass-1234!'
+
+
+def write_rows(path, rows, password_hash=None):
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(rows):
+            row = {'username': f'user{i}', 'email': f'user{i}@example.com', 'nickname': f'닉네임{i}',
+                   'name': '홍길동', 'phone_number': f'010-{i // 10000 % 10000:04d}-{i % 10000:04d}'}
+            row.update({'password_hash': password_hash} if password_hash else {'password': PASSWORD})
+            file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def run_bulk(path, batch_size, workers):
+    User.objects.all()._raw_delete(connection.alias)
+    with open(path, encoding='utf-8') as file:
+        progress = UserImporter(batch_size, workers).run(read_rows(file, 'jsonl'))
+    return {key: progress[key] for key in ('imported', 'failed', 'seconds', 'rows_per_second')}
+
+
+def run_per_row(path, rows):
+    '''
+        가져오기 명령어가 없을 때처럼 행마다 가입 API와 같은 순서로 처리
+    '''
+    User.objects.all()._raw_delete(connection.alias)
+    imported = 0
+    start = time.perf_counter()
+    with open(path, encoding='utf-8') as file:
+        for _, row in read_rows(file, 'jsonl'):
+            if imported >= rows:
+                break
+            serializer = ImportUserSerializer(data=row_to_data(row))
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+            if any(User.objects.filter(**{field: data[field]}).exists()
+                   for field in ('username', 'email', 'nickname', 'phone_number')):
+                continue
+            with transaction.atomic():
+                User.objects.create(username=data['username'], email=data['email'], nickname=data['nickname'],
+                                    name=data['name'], phone_number=data['phone_number'],
+                                    registration_state=User.STATE_REGISTERED,
+                                    password=make_password(data['password1']))
+            imported += 1
+    seconds = time.perf_counter() - start
+    return {'imported': imported, 'seconds': round(seconds, 2), 'rows_per_second': round(imported / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000, help='가져올 회원 수')
+    parser.add_argument('--batch-size', type=int, default=1000, help='한 트랜잭션에 저장할 행 수')
+    parser.add_argument('--workers', type=int, default=None, help='비밀번호 해시 프로세스 수(기본값: CPU 코어 수)')
+    parser.add_argument('--per-row-rows', type=int, default=500, help='per_row로 측정할 회원 수')
+    parser.add_argument('--time-cost', type=int, default=None, help='Argon2 time_cost(기본값: 설정 값)')
+    parser.add_argument('--memory-cost', type=int, default=None, help='Argon2 memory_cost(KiB, 기본값: 설정 값)')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    costs = {'TIME_COST': args.time_cost, 'MEMORY_COST': args.memory_cost}
+    override_settings(PASSWORD_HASHING={**settings.PASSWORD_HASHING,
+                                        **{key: value for key, value in costs.items() if value}}).enable()
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        plain = os.path.join(directory, 'users.jsonl')
+        hashed = os.path.join(directory, 'users_hashed.jsonl')
+        write_rows(plain, args.rows)
+        write_rows(hashed, args.rows, password_hash=make_password(PASSWORD))
+        results = {'rows': args.rows, 'batch_size': args.batch_size, 'workers': args.workers or os.cpu_count(),
+                   'password_hashing': {key: settings.PASSWORD_HASHING.get(key) for key in costs}}
+        results['bulk'] = run_bulk(plain, args.batch_size, args.workers)
+        results['bulk_prehashed'] = run_bulk(hashed, args.batch_size, args.workers)
+        results['per_row'] = run_per_row(plain, min(args.per_row_rows, args.rows))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+    요청 본문 파싱 + 응답 직렬화 비용 비교(요청당 마이크로초)
+
+    accounts API에서 주고받는 본문/응답(--payload)마다 Parser.parse() + Renderer.render()를 반복
+    - stdlib: DRF JSONParser, JSONRenderer(json 모듈)
+    - orjson: accounts.parsers.OrjsonParser, accounts.renderers.OrjsonRenderer
+    두 Renderer의 결과가 같은지도 같이 확인(same_output)
+
+    실행: python benchmarks/json_codec.py --requests 20000
+    결과는 JSON으로 출력
+'''
+import argparse
+import datetime
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from django.utils.translation import gettext_lazy as _  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from accounts.parsers import OrjsonParser  # noqa: E402
+from accounts.renderers import OrjsonRenderer  # noqa: E402
+
+TOKEN = 'eyJ0eXAiOiJKV1QiLCJhbGciOiJIUzI1NiJ9.' + 'a' * 300 + '.' + 'b' * 43
+
+# (요청 본문, 응답 데이터)
+PAYLOADS = {
+    'sms_send': ({'phone_number': '01012345678'}, {'message': ['인증번호가 전송되었습니다.']}),
+    'signup': (
+        {'username': 'user01', 'password1': 'password123!', 'password2': 'password123!', 'nickname': '닉네임',
+         'email': 'user01@example.com', 'name': '홍길동', 'phone_number': '01012345678'},
+        {'message': ['회원가입에 성공하였습니다.']},
+    ),
+    'token': ({'username': 'user01', 'password': 'password123!'}, {'refresh': TOKEN, 'access': TOKEN}),
+    'user': (
+        {},
+        {'pk': 1, 'username': 'user01', 'email': 'user01@example.com', 'nickname': '닉네임', 'name': '홍길동',
+         'phone_number': '01012345678', 'date_joined': timezone.now() - datetime.timedelta(days=1)},
+    ),
+    'error': (
+        {'phone_number': '0101234'},
+        {'phone_number': [_('This field is required.'), '전화번호는 11자리 숫자로 입력해주세요.']},
+    ),
+}
+
+
+def bench(parser, renderer, body, data, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        parser.parse(io.BytesIO(body))
+        renderer.render(data)
+    return round((time.perf_counter() - start) / count * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000, help='payload마다 반복할 요청 수')
+    parser.add_argument('--payload', choices=list(PAYLOADS), action='append', help='측정할 payload(여러 번 지정 가능)')
+    args = parser.parse_args()
+
+    codecs = {'stdlib': (JSONParser(), JSONRenderer()), 'orjson': (OrjsonParser(), OrjsonRenderer())}
+    results = {}
+    for name in args.payload or PAYLOADS:
+        request, data = PAYLOADS[name]
+        body = json.dumps(request, ensure_ascii=False).encode()
+        result = {codec: bench(*codecs[codec], body, data, args.requests) for codec in codecs}
+        result['speedup'] = round(result['stdlib'] / result['orjson'], 2)
+        result['same_output'] = codecs['stdlib'][1].render(data) == codecs['orjson'][1].render(data)
+        results[name] = result
+
+    print(json.dumps({'requests': args.requests, 'us_per_request': results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
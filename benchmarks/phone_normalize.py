@@ -0,0 +1,70 @@
+'''
+    전화번호 정규화 처리량 비교(가져오기 등에서 전화번호 --count개를 한 번에 확인)
+
+    - regex: 기존 방식(RegexValidator 정규식을 값마다 컴파일된 패턴으로 확인, 정규화 없음)
+    - list: normalize_phone_numbers(list), 값마다 구분자를 지우고 확인
+    - numpy: normalize_phone_numbers(NumPy 배열), 문자 코드 행렬로 한 번에 처리(numpy가 있을 때만)
+
+    입력은 01012345678, 010-1234-5678, +82 10-1234-5678, 형식이 틀린 값을 섞어서 생성
+    실행: python benchmarks/phone_normalize.py --count 1000000
+    결과는 JSON으로 출력
+'''
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from accounts.phone import normalize_phone_numbers, np  # noqa: E402
+
+LEGACY_RE = re.compile(r"^010?[0-9]\d{3}?\d{4}$")
+FORMATS = ['010{0}{1}', '010-{0}-{1}', '+82 10-{0}-{1}', '010 {0} {1}', '010-{0}-{1}x']
+
+
+def make_numbers(count, seed=0):
+    rand = random.Random(seed)
+    return [rand.choice(FORMATS).format(f'{rand.randrange(10000):04d}', f'{rand.randrange(10000):04d}')
+            for _ in range(count)]
+
+
+def measure(func, values):
+    start = time.perf_counter()
+    valid = func(values)
+    seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 3), 'numbers_per_second': round(len(values) / seconds),
+            'valid': int(sum(valid))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000, help='정규화할 전화번호 수')
+    args = parser.parse_args()
+
+    values = make_numbers(args.count)
+    results = {
+        'count': args.count,
+        'regex': measure(lambda values: [LEGACY_RE.match(value) is not None for value in values], values),
+        'list': measure(lambda values: normalize_phone_numbers(values)[1], values),
+    }
+    if np is not None:
+        array = np.array(values)
+        results['numpy'] = measure(lambda values: normalize_phone_numbers(values)[1], array)
+        # list -> 배열 변환까지 포함한 시간
+        results['numpy_from_list'] = measure(lambda values: normalize_phone_numbers(np.array(values))[1], values)
+        same = normalize_phone_numbers(array)[0].tolist() == [number or '' for number in
+                                                              normalize_phone_numbers(values)[0]]
+        results['numpy']['same_as_list'] = same
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
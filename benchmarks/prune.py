@@ -0,0 +1,152 @@
+'''
+    만료된 토큰 정리 방식 비교
+
+    OutstandingToken 테이블에 --rows개(그중 --expired-ratio 비율은 만료)를 넣고 만료된 행을 지우는 동안
+    다른 스레드에서 토큰을 계속 저장(로그인)하면서 저장이 기다린 시간을 측정
+    - batched: Pruner(기본 키 범위마다 짧은 트랜잭션)로 삭제
+    - single: DELETE 한 번으로 삭제(--compare를 지정할 때만, 테이블을 다시 채워서 측정)
+
+    SQLite는 잠금을 기다리는 쓰기가 다시 시도하는 사이에 다음 범위가 잠금을 가져가기 때문에 --sleep으로 틈을 두고 비교
+
+    실행: python benchmarks/prune.py --rows 10000000 --batch-size 1000 --sleep 0.005 --compare
+    결과는 JSON으로 출력
+'''
+import argparse
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import OperationalError, close_old_connections, connection, transaction  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken  # noqa: E402
+
+from accounts.pruning import Pruner  # noqa: E402
+
+CHUNK = 50000
+
+
+def seed(rows, expired_ratio):
+    '''
+        rows개의 토큰 저장, 만료된 토큰이 기본 키 범위마다 고르게 섞이도록 저장
+    '''
+    table = OutstandingToken._meta.db_table
+    now = timezone.now()
+    expired_at = (now - datetime.timedelta(days=1)).isoformat(' ')
+    valid_at = (now + datetime.timedelta(days=1)).isoformat(' ')
+    every = max(1, round(1 / (1 - expired_ratio))) if expired_ratio < 1 else None
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for offset in range(0, rows, CHUNK):
+            values = [(f'seed-{i}', 'token', valid_at if every and i % every == 0 else expired_at)
+                      for i in range(offset, min(offset + CHUNK, rows))]
+            with transaction.atomic():
+                cursor.executemany(f'INSERT INTO {table} (jti, token, expires_at) VALUES (%s, %s, %s)', values)
+    return round(time.perf_counter() - start, 2)
+
+
+class Writer(threading.Thread):
+    '''
+        정리하는 동안 토큰을 계속 저장하면서 저장 한 번에 걸린 시간 기록
+    '''
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.stop_event = threading.Event()
+        self.durations = []
+        self.errors = 0
+
+    def run(self):
+        i = 0
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            try:
+                OutstandingToken.objects.create(jti=f'writer-{time.time_ns()}-{i}', token='token',
+                                                expires_at=timezone.now() + datetime.timedelta(days=1))
+            except OperationalError:
+                self.errors += 1
+            self.durations.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(0.01)
+        close_old_connections()
+
+    def summary(self):
+        durations = sorted(self.durations)
+        return {
+            'writes': len(durations),
+            'errors': self.errors,
+            'p99_ms': round(durations[int(len(durations) * 0.99)] * 1000, 2) if durations else None,
+            'max_ms': round(durations[-1] * 1000, 2) if durations else None,
+        }
+
+
+def measure(func):
+    writer = Writer()
+    writer.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+    finally:
+        seconds = time.perf_counter() - start
+        writer.stop_event.set()
+        writer.join()
+    return seconds, result, writer.summary()
+
+
+def run_batched(batch_size, sleep):
+    pruner = Pruner(['outstanding_token'], batch_size=batch_size, sleep=sleep)
+    seconds, (result,), writes = measure(pruner.run)
+    return {'seconds': round(seconds, 2), 'rows': result['rows'], 'rows_per_second': result['rows_per_second'],
+            'batches': result['batches'], 'max_batch_ms': result['max_batch_ms'], 'concurrent_writes': writes}
+
+
+def run_single():
+    def delete():
+        with transaction.atomic():
+            return OutstandingToken.objects.filter(expires_at__lt=timezone.now())._raw_delete(connection.alias)
+
+    seconds, rows, writes = measure(delete)
+    return {'seconds': round(seconds, 2), 'rows': rows, 'rows_per_second': round(rows / seconds, 1),
+            'concurrent_writes': writes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='미리 저장할 토큰 수')
+    parser.add_argument('--expired-ratio', type=float, default=0.9, help='만료된 토큰 비율')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Pruner의 범위 크기')
+    parser.add_argument('--sleep', type=float, default=0.005, help='Pruner의 범위 사이에 쉬는 시간(초)')
+    parser.add_argument('--compare', action='store_true', help='DELETE 한 번으로 지우는 경우도 측정')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # 저장하는 스레드가 커넥션을 따로 열기 때문에 메모리 DB 대신 임시 파일 DB 사용
+    connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = {'rows': args.rows, 'expired_ratio': args.expired_ratio, 'batch_size': args.batch_size,
+                   'sleep': args.sleep, 'seed_seconds': seed(args.rows, args.expired_ratio)}
+        results['batched'] = run_batched(args.batch_size, args.sleep)
+        if args.compare:
+            OutstandingToken.objects.all()._raw_delete(connection.alias)
+            seed(args.rows, args.expired_ratio)
+            results['single'] = run_single()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
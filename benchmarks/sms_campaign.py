@@ -0,0 +1,87 @@
+'''
+    공지 문자(SmsCampaign) 전송 처리량 측정
+
+    --recipients명의 User를 만들고 가짜 SENS 서버(요청마다 --latency초 지연)로 전송
+    --concurrency 값마다 같은 캠페인을 처음부터 다시 보내면서 수신자/초와 SENS 요청 수를 비교
+
+    실행: python benchmarks/sms_campaign.py --recipients 100000 --latency 0.05 --concurrency 1 4 8
+    결과는 JSON으로 출력
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+
+from accounts.models import SmsCampaign, User  # noqa: E402
+from accounts.sms.campaign import claim_campaign, run_campaign  # noqa: E402
+from accounts.sms.fake_sens import FakeSensServer  # noqa: E402
+
+CHUNK = 50000
+
+
+def seed(recipients):
+    table = User._meta.db_table
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        for offset in range(0, recipients, CHUNK):
+            values = [(f'user{i}', f'010{i:08d}') for i in range(offset, min(offset + CHUNK, recipients))]
+            with transaction.atomic():
+                cursor.executemany(
+                    f"INSERT INTO {table} (username, phone_number, password, is_superuser, is_staff, is_active, "
+                    f"first_name, last_name, email, date_joined, nickname, name, registration_state, token_version) "
+                    f"VALUES (%s, %s, '', 0, 0, 1, '', '', '', '2022-01-01', '', '', 'registered', 0)", values)
+    return round(time.perf_counter() - start, 2)
+
+
+def run(sens, chunk_size, concurrency):
+    sens.reset()
+    SmsCampaign.objects.create(content='공지 문자 처리량 측정')
+    start = time.perf_counter()
+    campaign = claim_campaign()
+    run_campaign(campaign, chunk_size=chunk_size, concurrency=concurrency)
+    seconds = time.perf_counter() - start
+    return {'concurrency': concurrency, 'sent': campaign.sent, 'failed': campaign.failed,
+            'requests': len(sens.requests), 'seconds': round(seconds, 2),
+            'recipients_per_second': round(campaign.sent / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=20000, help='수신자(User) 수')
+    parser.add_argument('--latency', type=float, default=0.05, help='가짜 SENS 서버의 요청당 지연 시간(초)')
+    parser.add_argument('--chunk-size', type=int, default=100, help='SENS 요청 하나에 담을 수신자 수')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='동시에 보낼 요청 수')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = {'recipients': args.recipients, 'latency': args.latency, 'chunk_size': args.chunk_size,
+                   'seed_seconds': seed(args.recipients), 'runs': []}
+        with FakeSensServer(latency=args.latency) as sens, \
+                override_settings(SENS_API_URL=sens.url, SMS_BACKEND='accounts.sms.backends.sens.SmsBackend',
+                                  SMS_BATCH={'MAX_SIZE': args.chunk_size},
+                                  SENS_CLIENT={'POOL_MAXSIZE': max(args.concurrency)}):
+            for concurrency in args.concurrency:
+                results['runs'].append(run(sens, args.chunk_size, concurrency))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+'''
+    인증번호 발송 요청 수 제한(throttle)의 요청당 비용
+
+    1. throttle: 전화번호별, IP별, 전체 throttle 세 개를 확인하는 시간(요청당 마이크로초)
+       - sliding_window: accounts.throttling(구간마다 요청 수 하나만 저장)
+       - drf_sliding_log: DRF SimpleRateThrottle(요청 시각 목록 저장, 허용 수가 크면 목록도 커짐)
+    2. view: sms/send/ 요청 시간(요청당 밀리초)
+       - no_throttle: 요청 수 제한 없이 발송
+       - throttle: 요청 수 제한을 확인하고 발송
+       - rejected: 제한에 걸려서 429로 응답(DB, 문자 발송 없음)
+
+    실행: python benchmarks/sms_throttle.py --requests 2000
+    결과는 JSON으로 출력
+'''
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+
+from accounts import sms  # noqa: E402
+from accounts.throttling import SMS_SEND_THROTTLES, get_phone_number  # noqa: E402
+
+SCOPES = ['sms_send_phone', 'sms_send_ip', 'sms_send']
+
+
+def rest_framework(rate):
+    return dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={scope: rate for scope in SCOPES})
+
+
+class SlidingLogThrottle(SimpleRateThrottle):
+    '''
+        비교용 DRF 기본 방식(scope마다 같은 키 사용)
+    '''
+
+    def __init__(self, scope, rate):
+        self.scope, self.rate = scope, rate
+        super().__init__()
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': get_phone_number(request) or 'global'}
+
+
+def bench_throttles(make_throttles, count):
+    request = Request(APIRequestFactory().post('/', json.dumps({'phone_number': '01000000000'}),
+                                               content_type='application/json'), parsers=[JSONParser()])
+    cache.clear()
+    start = time.perf_counter()
+    for _ in range(count):
+        for throttle in make_throttles():
+            throttle.allow_request(request, None)
+    return round((time.perf_counter() - start) / count * 1e6, 1)
+
+
+def bench_view(count, rate, distinct=True):
+    url = reverse('sms_auth_send')
+    client = Client()
+    cache.clear()
+    codes = {}
+    with override_settings(REST_FRAMEWORK=rest_framework(rate)):
+        start = time.perf_counter()
+        for i in range(count):
+            phone_number = f'010{i % 100000000:08d}' if distinct else '01000000000'
+            response = client.post(url, json.dumps({'phone_number': phone_number}), content_type='application/json')
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        seconds = time.perf_counter() - start
+    sms.outbox = []
+    return {'ms_per_request': round(seconds / count * 1000, 3), 'status': codes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='측정할 요청 수')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    settings.SMS_BACKEND = 'accounts.sms.backends.locmem.SmsBackend'
+    sms.outbox = []
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        # 허용 수가 커서 요청이 모두 허용되는 상태의 비용
+        limit = f'{args.requests * 2}/hour'
+        with override_settings(REST_FRAMEWORK=rest_framework(limit)):
+            sliding_window = bench_throttles(lambda: [throttle() for throttle in SMS_SEND_THROTTLES], args.requests)
+        sliding_log = bench_throttles(lambda: [SlidingLogThrottle(scope, limit) for scope in SCOPES], args.requests)
+        view = {
+            'no_throttle': bench_view(args.requests, None),
+            'throttle': bench_view(args.requests, limit),
+            'rejected': bench_view(args.requests, '1/hour', distinct=False),
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps({
+        'requests': args.requests,
+        'throttle_us_per_request': {'sliding_window': sliding_window, 'drf_sliding_log': sliding_log},
+        'view': view,
+        'overhead_ms': round(view['throttle']['ms_per_request'] - view['no_throttle']['ms_per_request'], 3),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+'''
+    비동기(ASGI) / 동기(WSGI) 인증번호 발송 경로 비교
+
+    1. View: 동시에 들어온 요청을 한 프로세스에서 처리하는 시간
+       - WSGI: 동기 View를 스레드 풀(--threads)로 처리
+       - ASGI: 비동기 View를 하나의 이벤트 루프에서 asyncio.gather로 처리
+    2. Outbox 전송: 지연이 있는 가짜 SENS 서버로 outbox를 비우는 시간
+       - 스레드 워커(drain_outbox) / 비동기 워커(adrain_outbox)
+
+    SQLite는 동시 쓰기에서 잠금 에러가 날 수 있어서 응답 코드별 개수도 함께 기록
+
+    실행: python benchmarks/sms_views.py --requests 200 --threads 8 --latency 0.2
+    결과는 JSON으로 출력
+'''
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import AsyncClient, Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from accounts.models import SmsOutbox  # noqa: E402
+from accounts.sms import get_connection  # noqa: E402
+from accounts.sms.fake_sens import FakeSensServer  # noqa: E402
+from accounts.sms.worker import adrain_outbox, drain_outbox  # noqa: E402
+
+
+def phone_numbers(count, prefix):
+    return [f'010{prefix}{i:07d}'[:11] for i in range(count)]
+
+
+def bench_wsgi(count, threads):
+    url = reverse('sms_auth_send')
+
+    def send(phone_number):
+        return Client(raise_request_exception=False).post(url, {'phone_number': phone_number}, content_type='application/json').status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        codes = list(executor.map(send, phone_numbers(count, 1)))
+    return time.perf_counter() - start, codes
+
+
+async def bench_asgi(count):
+    url = reverse('sms_auth_send_async')
+    client = AsyncClient()
+
+    async def send(phone_number):
+        body = json.dumps({'phone_number': phone_number})
+        return (await client.post(url, body, content_type='application/json')).status_code
+
+    start = time.perf_counter()
+    codes = await asyncio.gather(*(send(phone_number) for phone_number in phone_numbers(count, 2)))
+    return time.perf_counter() - start, codes
+
+
+def bench_drain(latency, threads):
+    backend = 'accounts.sms.backends.sens.SmsBackend'
+    results = {}
+    with FakeSensServer(latency=latency) as sens, override_settings(SENS_API_URL=sens.url, SMS_BACKEND=backend,
+                                                                     SMS_BATCH={'MAX_SIZE': 10}):
+        queued = SmsOutbox.objects.filter(status=SmsOutbox.STATUS_PENDING).count()
+        start = time.perf_counter()
+        drain_outbox(batch_size=queued, workers=threads)
+        results['threaded'] = time.perf_counter() - start
+
+        SmsOutbox.objects.update(status=SmsOutbox.STATUS_PENDING, next_attempt_at=timezone.now())
+
+        async def run():
+            sms_connection = get_connection()
+            try:
+                return await adrain_outbox(sms_connection, batch_size=queued)
+            finally:
+                await sms_connection.aclose()
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        results['async'] = time.perf_counter() - start
+        results['requests'] = len(sens.requests)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='동시 요청 수')
+    parser.add_argument('--threads', type=int, default=8, help='WSGI 스레드 수 / 스레드 워커 수')
+    parser.add_argument('--latency', type=float, default=0.2, help='가짜 SENS 응답 지연(초)')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # 스레드마다 커넥션을 따로 열기 때문에 메모리 DB 대신 임시 파일 DB 사용
+    connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    # SQLite는 쓰기가 직렬화되므로 동시 쓰기 때 잠금을 기다리도록 설정
+    connection.settings_dict['OPTIONS']['timeout'] = 30
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        # 요청 수 제한(IP별 30/hour)에 걸리지 않도록 끄고 View 처리 시간만 비교
+        no_throttle = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={
+            'sms_send_phone': None, 'sms_send_ip': None, 'sms_send': None})
+        with override_settings(SMS_BACKEND='accounts.sms.backends.locmem.SmsBackend', REST_FRAMEWORK=no_throttle):
+            wsgi_seconds, wsgi_codes = bench_wsgi(args.requests, args.threads)
+            asgi_seconds, asgi_codes = asyncio.run(bench_asgi(args.requests))
+        drain = bench_drain(args.latency, args.threads)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps({
+        'requests': args.requests,
+        'threads': args.threads,
+        'views': {
+            'wsgi': {'seconds': round(wsgi_seconds, 3), 'rps': round(args.requests / wsgi_seconds, 1),
+                     'ok': wsgi_codes.count(200), 'errors': len(wsgi_codes) - wsgi_codes.count(200)},
+            'asgi': {'seconds': round(asgi_seconds, 3), 'rps': round(args.requests / asgi_seconds, 1),
+                     'ok': asgi_codes.count(200), 'errors': len(asgi_codes) - asgi_codes.count(200)},
+        },
+        'outbox': {
+            'latency': args.latency,
+            'sens_requests': drain['requests'],
+            'threaded_seconds': round(drain['threaded'], 3),
+            'async_seconds': round(drain['async'], 3),
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
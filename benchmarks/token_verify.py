@@ -0,0 +1,88 @@
+'''
+    token/verify/ 검증 결과 캐시 사용 여부에 따른 처리량 비교
+
+    같은 토큰 여러 개(--tokens)를 돌아가며 검증 요청을 보내고 초당 처리 수(QPS)를 측정
+    - no_cache: 요청마다 서명 확인 + blacklist 조회(DB)
+    - cache: 처음 한 번만 검증하고 이후에는 워커의 LRU에서 응답
+
+    실행: python benchmarks/token_verify.py --requests 2000 --tokens 50 --threads 4
+    결과는 JSON으로 출력
+'''
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from accounts.tokens import get_verified_token_cache  # noqa: E402
+
+
+def make_tokens(count):
+    user = User.objects.create_user(username='bench', password='bench123456!')
+    return [str(RefreshToken.for_user(user).access_token) for _ in range(count)]
+
+
+def bench(tokens, count, threads):
+    url = reverse('token_verify')
+    bodies = [json.dumps({'token': token}) for token in tokens]
+
+    def verify(i):
+        return Client().post(url, bodies[i % len(bodies)], content_type='application/json').status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        codes = list(executor.map(verify, range(count)))
+    seconds = time.perf_counter() - start
+    return {'seconds': round(seconds, 3), 'qps': round(count / seconds, 1),
+            'ok': codes.count(200), 'errors': len(codes) - codes.count(200)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='검증 요청 수')
+    parser.add_argument('--tokens', type=int, default=50, help='돌아가며 검증할 토큰 수')
+    parser.add_argument('--threads', type=int, default=4, help='동시에 요청하는 스레드 수')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    # 스레드마다 커넥션을 따로 열기 때문에 메모리 DB 대신 임시 파일 DB 사용
+    connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        tokens = make_tokens(args.tokens)
+        with override_settings(TOKEN_VERIFY_CACHE={'ENABLED': False}):
+            no_cache = bench(tokens, args.requests, args.threads)
+        with override_settings(TOKEN_VERIFY_CACHE={'ENABLED': True}):
+            cache = bench(tokens, args.requests, args.threads)
+            stats = get_verified_token_cache().stats()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(json.dumps({
+        'requests': args.requests,
+        'tokens': args.tokens,
+        'threads': args.threads,
+        'no_cache': no_cache,
+        'cache': dict(cache, hits=stats['hits'], misses=stats['misses']),
+        'speedup': round(cache['qps'] / no_cache['qps'], 2),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
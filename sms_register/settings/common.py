@@ -16,6 +16,7 @@ from pathlib import Path
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 import os
 import sys
+import tempfile
 
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 from secrets_get import secret_get
@@ -70,6 +71,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # DRF 밖(관리자 로그인 등)에서 해시 대기열이 가득 차면 503 + Retry-After로 응답
+    'accounts.middleware.HashingUnavailableMiddleware',
 ]
 
 ROOT_URLCONF = 'sms_register.urls'
@@ -99,7 +102,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / '../db.sqlite3',
+        # 테스트 DB를 메모리(shared cache)에 만들면 여러 스레드에서 동시에 쓸 때 잠금 대기 없이
+        # 'database table is locked' 에러가 나기 때문에 동시성 테스트를 위해 파일로 생성
+        # 저장소 안에 남지 않도록 임시 디렉터리에 생성(테스트가 끝나면 삭제됨)
+        'TEST': {
+            'NAME': Path(tempfile.gettempdir()) / 'sms_register_test_db.sqlite3',
+        },
+    }
+}
+
+# 운영 환경에서는 환경변수로 DB 설정(DB_ENGINE이 없으면 위의 SQLite 사용)
+if os.environ.get('DB_ENGINE'):
+    DATABASES['default'] = {
+        'ENGINE': os.environ['DB_ENGINE'],
+        'NAME': os.environ.get('DB_NAME', ''),
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', ''),
+        'PORT': os.environ.get('DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
     }
+
+# 읽기 전용 replica(accounts/routers.py)
+# DB_REPLICAS: 쉼표로 구분한 replica 호스트(SQLite는 파일 경로), 나머지 접속 정보는 default와 같음
+# 별칭은 replica1, replica2, ... 이고 테스트에서는 default를 그대로 사용(MIRROR)
+_replica_key = 'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+for _index, _replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{_index}'] = dict(DATABASES['default'], **{_replica_key: _replica.strip()},
+                                         TEST={'MIRROR': 'default'})
+
+DATABASE_ROUTERS = ['accounts.routers.PrimaryReplicaRouter']
+
+# ALIASES: 읽기 전용 조회를 보낼 replica 별칭(비어 있으면 모든 조회를 default로)
+# PIN_SECONDS: 전화번호나 User에 쓰기를 한 뒤 그 전화번호, User의 조회를 primary로 보내는 시간(초)
+#              replica의 최대 복제 지연보다 길게 설정
+# pin은 CACHE_ALIAS 캐시에 저장하기 때문에 워커가 여러 개면 공유 캐시를 설정해야 함
+DATABASE_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias.startswith('replica')],
+    'PIN_SECONDS': int(os.environ.get('DB_REPLICA_PIN_SECONDS', 10)),
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'db-pin',
 }
 
 # Password validation
@@ -153,6 +195,8 @@ ACCOUNT_EMAIL_VERIFICATION = 'none'
 
 # DRF 설정
 REST_FRAMEWORK = {
+    # orjson을 설치하면 'accounts.renderers.OrjsonRenderer', 'accounts.parsers.OrjsonParser'로
+    # 바꿔서 요청 본문 파싱과 응답 직렬화 비용을 줄일 수 있음(benchmarks/json_codec.py)
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
     ),
@@ -164,8 +208,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWTAuthentication + 토큰 버전(User.token_version) 확인
+        "accounts.authentication.VersionedJWTAuthentication",
     ),
+    # 인증번호 발송(sms/send/) 요청 수 제한(accounts/throttling.py)
+    # sms_send_phone: 전화번호별, sms_send_ip: 클라이언트 IP별, sms_send: 전체(SENS 발송 한도)
+    'DEFAULT_THROTTLE_RATES': {
+        'sms_send_phone': '5/hour',
+        'sms_send_ip': '30/hour',
+        'sms_send': '300/min',
+    },
 }
 
 # JWT 관리
@@ -175,6 +227,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=15),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': True,
+    # StatelessJWTAuthentication이 토큰의 claim으로 만드는 User 클래스
+    'TOKEN_USER_CLASS': 'accounts.authentication.AccountsTokenUser',
 }
 REST_USE_JWT = True
 # rest-auth 유저 생성 커스텀
@@ -190,6 +244,141 @@ REST_AUTH_SERIALIZERS = {
 OLD_PASSWORD_FIELD_ENABLED = True
 
 # 비밀번호 알고리즘 Argon2으로 교체
+# 요청 스레드 대신 프로세스 풀에서 계산하는 Argon2 hasher(accounts/hashers.py 참고)
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'accounts.hashers.PooledArgon2PasswordHasher',
 ]
+
+# 비밀번호 해시 프로세스 풀 설정
+# WORKERS: 풀 프로세스 수(None이면 CPU 코어 수), QUEUE_SIZE: 실행 중인 작업 외에 기다릴 수 있는 작업 수
+# 대기열이 가득 차면 QUEUE_TIMEOUT초 기다려보고 그래도 자리가 없으면 503 + Retry-After(RETRY_AFTER초)로 응답
+# TIME_COST, MEMORY_COST(KiB), PARALLELISM: Argon2 비용(None이면 Django 기본값)
+# 서버마다 `python manage.py calibrate_hasher --target-ms 50`으로 측정한 값을 사용
+PASSWORD_HASHING = {
+    'WORKERS': None,
+    'QUEUE_SIZE': 16,
+    'QUEUE_TIMEOUT': 0,
+    'RETRY_AFTER': 1,
+    'TIME_COST': None,
+    'MEMORY_COST': None,
+    'PARALLELISM': None,
+}
+
+# 문자 발송 백엔드(accounts/sms/__init__.py 참고)
+SMS_BACKEND = 'accounts.sms.backends.sens.SmsBackend'
+# filebased 백엔드를 사용할 때 문자를 저장할 파일
+SMS_FILE_PATH = BASE_DIR / '../sms-messages.jsonl'
+# latency 백엔드 설정(단위: 초)
+SMS_LATENCY = {
+    'P50': 0.05,
+    'P99': 0.5,
+    'ERROR_RATE': 0.0,
+}
+
+# 테스트 중에는 locmem 백엔드로 교체하는 테스트 러너
+TEST_RUNNER = 'accounts.sms.testing.SmsTestRunner'
+
+# NAVER SENS API 주소(테스트에서는 로컬 가짜 SENS 서버 주소로 교체)
+SENS_API_URL = os.environ.get('SENS_API_URL', 'https://sens.apigw.ntruss.com')
+
+# SENS 클라이언트 설정(timeout 단위: 초, POOL_MAXSIZE: 워커당 keep-alive 커넥션 수)
+SENS_CLIENT = {
+    'CONNECT_TIMEOUT': 3,
+    'READ_TIMEOUT': 10,
+    'POOL_MAXSIZE': 10,
+}
+
+# 여러 문자를 한 번의 SENS 요청으로 묶어서 보내는 설정
+# MAX_SIZE: 한 요청에 담을 최대 수신자 수, WINDOW: 디스패처가 문자를 모으는 시간(초)
+SMS_BATCH = {
+    'MAX_SIZE': 100,
+    'WINDOW': 0.05,
+}
+
+# SMS outbox 워커 설정
+# 전송에 실패하면 BACKOFF_BASE * 2^(시도 횟수 - 1)초 뒤에 다시 시도(최대 BACKOFF_MAX초)
+SMS_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'WORKERS': 4,
+    'POLL_INTERVAL': 1,
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 2,
+    'BACKOFF_MAX': 300,
+    'SENDING_TIMEOUT': 60,
+}
+
+# 공지 문자(SmsCampaign) 전송 설정(accounts/sms/campaign.py, python manage.py send_sms_campaigns)
+# CHUNK_SIZE: SENS 요청 하나에 담을 수신자 수, CONCURRENCY: 동시에 보낼 요청 수
+# ITERATOR_CHUNK_SIZE: 수신자(User)를 DB에서 한 번에 읽을 행 수
+# 실패한 수신자는 RETRY_DELAY * 2^(시도 횟수 - 1)초 뒤에 MAX_ATTEMPTS번까지 다시 전송
+# LEASE: 워커가 캠페인을 선점하는 시간(초), 배치마다 연장하고 워커가 죽으면 이 시간이 지난 뒤 다른 워커가 이어서 전송
+SMS_CAMPAIGN = {
+    'CHUNK_SIZE': 100,
+    'CONCURRENCY': 4,
+    'ITERATOR_CHUNK_SIZE': 2000,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 1,
+    'LEASE': 300,
+    'POLL_INTERVAL': 5,
+}
+
+# token/verify/ 검증 결과 캐시 설정(accounts/tokens.py 참고)
+# MAX_SIZE: 워커마다 저장할 최대 토큰 수(LRU)
+# CACHE_ALIAS: 여러 워커가 같이 사용할 공유 캐시(None이면 워커마다 따로 저장)
+#              워커가 여러 개면 다른 워커에서 blacklist에 추가한 토큰을 반영하기 위해 공유 캐시를 지정하는 것을 권장
+# LOCAL_TTL: 공유 캐시를 사용할 때 워커의 LRU에 저장하는 시간(초)
+TOKEN_VERIFY_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 10000,
+    'CACHE_ALIAS': None,
+    'KEY_PREFIX': 'token-verify',
+    'LOCAL_TTL': 1,
+}
+
+# 토큰 버전 설정(accounts/tokens.py 참고)
+# User.revoke_tokens()로 버전을 올리면 이전에 발급한 모든 토큰이 무효화됨
+# CACHE_ALIAS: 현재 버전을 저장할 캐시, 워커가 여러 개면 공유 캐시(Redis 등)를 지정해야 바로 반영됨
+# TIMEOUT: 캐시에 저장하는 시간(초), 공유 캐시가 아니면 다른 워커에는 최대 이 시간 뒤에 반영
+TOKEN_VERSION = {
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'token-version',
+    'TIMEOUT': 60,
+}
+
+# 만료된 행 정리 설정(accounts/pruning.py, python manage.py prune_expired)
+# BATCH_SIZE: 한 트랜잭션에서 확인할 기본 키 범위의 행 수
+# SLEEP: 범위 사이에 쉬는 시간(초), 잠금을 기다리던 다른 쓰기(로그인 등)가 먼저 진행할 수 있도록 틈을 둠
+# SCHEDULER: 서버 프로세스 안에서 INTERVAL초마다 정리(cron 등으로 명령어를 실행하면 끄기)
+PRUNING = {
+    'BATCH_SIZE': 1000,
+    'SLEEP': 0.005,
+    'INTERVAL': 3600,
+    'SCHEDULER': False,
+}
+
+# 회원 가져오기 설정(accounts/importing.py, python manage.py import_users)
+# BATCH_SIZE: 한 트랜잭션에서 bulk_create로 저장할 행 수
+# WORKERS: 비밀번호 해시 프로세스 수(None이면 CPU 코어 수)
+# HASH_CHUNK_SIZE: 프로세스에 한 번에 넘기는 비밀번호 수
+USER_IMPORT = {
+    'BATCH_SIZE': 1000,
+    'WORKERS': None,
+    'HASH_CHUNK_SIZE': 32,
+}
+
+# 인증번호(OTP) 저장소 설정
+# STORE: accounts.otp.DatabaseOtpStore(sms_auth 테이블) 또는 accounts.otp.CacheOtpStore(캐시, SQL 사용 x)
+# CacheOtpStore를 여러 프로세스에서 사용하려면 CACHES에 Redis, Memcached 같은 공유 캐시를 설정해야 함
+# CacheOtpStore의 키는 모두 TTL 안에 만료되고, 가입, 비밀번호 찾기의 인증 내역은 인증을 마친 User(DB)로 확인
+# TTL: 인증번호 유효시간(초)
+# RESEND_COOLDOWN: 같은 번호로 다시 발송할 수 있을 때까지 기다리는 시간(초), 그 전 요청은 기존 인증번호 유지
+# LOCK_TIMEOUT: 같은 번호의 동시 발송을 한 번으로 묶는 잠금의 최대 유지 시간(초)
+# 재발송 대기 시간과 잠금은 CACHE_ALIAS 캐시에 저장하기 때문에 워커가 여러 개면 공유 캐시를 설정해야 함
+OTP = {
+    'STORE': 'accounts.otp.DatabaseOtpStore',
+    'TTL': 300,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'otp',
+    'RESEND_COOLDOWN': 60,
+    'LOCK_TIMEOUT': 10,
+}
@@ -15,13 +15,10 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
 from django.conf.urls import (
     handler400, handler403, handler404, handler500)
-from accounts.views import custom404, custom500, MyTokenObtainPairView
+from accounts.views import custom404, custom500, MyTokenObtainPairView, CustomTokenRefreshView, \
+    StatelessUserDetailsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -31,12 +28,14 @@ urlpatterns = [
     path('api-auth/', include('rest_framework.urls')),
 
     # rest-auth
+    # 내 정보 보기는 토큰의 claim으로 응답하는 View로 교체(rest_auth.urls보다 먼저 등록)
+    path('accounts/v1/rest-auth/user/', StatelessUserDetailsView.as_view(), name='rest_user_details'),
     path('accounts/v1/rest-auth/', include('rest_auth.urls')),  # login, logout, user를 담당하는 url
     path('accounts/v1/rest-auth/signup/', include('rest_auth.registration.urls')),  # 회원가입 url
 
     # simple-jwt
     path('accounts/v1/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('accounts/v1/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('accounts/v1/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
 ]
 
 handler404 = custom404
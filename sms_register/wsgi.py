@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sms_register.settings.dev')
 
 application = get_wsgi_application()
+
+# PRUNING['SCHEDULER']가 켜져 있으면 서버 프로세스 안에서 만료된 행 정리 시작(accounts/pruning.py 참고)
+from accounts.pruning import start_scheduler  # noqa: E402
+
+start_scheduler()